@@ -1,7 +1,15 @@
 # app/__init__.py
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import Config
 from .extensions import init_extensions
+from .utils.json_provider import init_json_provider
+from .utils.compression import init_compression
+from .utils.identity_map import init_identity_map
+from .utils.query_log import init_query_log
+from .utils.profiling import init_profiling
+from .utils.memory import init_memory_diagnostics
+from .utils.metrics import init_metrics
 from .api.user import bp as users_bp
 
 # from .extensions import jwt
@@ -14,7 +22,19 @@ def create_app(config=None):
     else:
         app.config.from_object(Config)
 
+    # Behind a load balancer: take the client address from X-Forwarded-For (rate limits, idempotency keys)
+    trusted_proxies = app.config.get("TRUSTED_PROXY_COUNT", 0)
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+    
     init_extensions(app)
+    init_query_log(app)
+    init_metrics(app)  # first request hooks, so latency covers the others
+    init_json_provider(app)
+    init_compression(app)
+    init_identity_map(app)
+    init_profiling(app)
+    init_memory_diagnostics(app)
 
     # Import models after extensions are initialized to avoid circular imports
     from . import models
@@ -25,11 +45,16 @@ def create_app(config=None):
     # Import and register other blueprints
     from .api.products import bp as products_bp
     from .api.sales import bp as sales_bp
+    from .api.admin import bp as admin_bp
     app.register_blueprint(products_bp)
     app.register_blueprint(sales_bp)
+    app.register_blueprint(admin_bp)
     
     from .security import jwt_handlers, jwt_blocklist_check
 
+    from .cli import register_commands
+    register_commands(app)
+    
     # later: register_blueprints(app), error handlers, etc.
     @app.get("/health")
     def health():
@@ -0,0 +1,129 @@
+from flask import Blueprint, jsonify, request, send_file
+from app.security.decorators import admin_only
+from app.services import diagnostics_service
+from app.utils.decorators import handle_errors
+
+bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+# ===== DIAGNOSTICS ENDPOINTS (per worker process) =====
+
+@bp.get("/slow-queries")
+@admin_only
+@handle_errors("getting slow query report")
+def get_slow_queries():
+    """
+    Top SQL statement fingerprints by total time (Admin only)
+    
+    Query Parameters:
+        - limit (optional): Number of fingerprints to return (default: 20, max: 200)
+    
+    Returns:
+        HTTP 200: {"enabled", "threshold_ms", "queries": [{fingerprint, calls, total_ms, mean_ms, max_ms,
+                   slow_calls, caller, last_statement, parameter_shapes, plan}]}
+    """
+    try:
+        limit = min(int(request.args.get('limit', 20)), 200)
+    except ValueError:
+        return jsonify({"message": "Invalid limit format"}), 400
+    return jsonify(diagnostics_service.get_slow_query_report(limit)), 200
+
+@bp.delete("/slow-queries")
+@admin_only
+@handle_errors("resetting slow query stats")
+def reset_slow_queries():
+    """
+    Clear the aggregated statement stats of this worker (Admin only)
+    """
+    diagnostics_service.reset_slow_query_stats()
+    return jsonify({"message": "Slow query stats reset"}), 200
+
+@bp.get("/profiles")
+@admin_only
+@handle_errors("listing request profiles")
+def list_profiles():
+    """
+    Stored request profiles of this host, newest first (Admin only)
+    
+    Profiles are recorded for admin requests sent with the PROFILING_HEADER header
+    (default "X-Profile: 1"); the profiled response carries its id in "X-Profile-Id".
+    """
+    return jsonify({"profiles": diagnostics_service.list_profiles()}), 200
+
+@bp.get("/profiles/<profile_id>")
+@admin_only
+@handle_errors("getting request profile")
+def get_profile(profile_id: str):
+    """
+    Download a request profile (Admin only)
+    
+    Query Parameters:
+        - format (optional): "pstats" (binary dump for pstats/snakeviz, default) or "text"
+        - sort (optional): pstats sort key for text output (default: cumulative)
+        - limit (optional): Functions listed in text output (default: 50)
+    
+    Returns:
+        HTTP 200: Profile file or text report
+        HTTP 404: Profile not found (or profiling disabled)
+    """
+    if request.args.get('format', 'pstats') == 'text':
+        try:
+            limit = int(request.args.get('limit', 50))
+        except ValueError:
+            return jsonify({"message": "Invalid limit format"}), 400
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls', 'ncalls', 'time'):
+            return jsonify({"message": "Invalid sort key"}), 400
+        text = diagnostics_service.get_profile_text(profile_id, sort, limit)
+        return text, 200, {"Content-Type": "text/plain; charset=utf-8"}
+    path = diagnostics_service.get_profile_path(profile_id)
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                     download_name=f"profile-{profile_id}.prof")
+
+@bp.get("/memory")
+@admin_only
+@handle_errors("getting memory report")
+def get_memory():
+    """
+    Memory usage of the worker serving this request (Admin only)
+    
+    Query Parameters:
+        - objects (optional): Number of most common object types to count (default: 0 = skip,
+          counting walks every live object)
+    
+    Returns:
+        HTTP 200: {"pid", "rss_mb", "peak_rss_mb", "requests_served", "session_identity_map": {last, max, mean},
+                   "request_identity_map": {last, max}, "recycle_pending", "objects"}
+    """
+    try:
+        object_types = min(int(request.args.get('objects', 0)), 200)
+    except ValueError:
+        return jsonify({"message": "Invalid objects format"}), 400
+    return jsonify(diagnostics_service.get_memory_report(object_types)), 200
+
+@bp.post("/memory/snapshots")
+@admin_only
+@handle_errors("taking memory snapshot")
+def take_memory_snapshot():
+    """
+    Take a tracemalloc snapshot and return the allocation growth since the previous one (Admin only)
+    
+    The first call starts tracemalloc (slower allocations until DELETE) and returns a baseline.
+    
+    Query Parameters:
+        - limit (optional): Source lines to return (default: 20)
+    """
+    try:
+        limit = min(int(request.args.get('limit', 20)), 200)
+    except ValueError:
+        return jsonify({"message": "Invalid limit format"}), 400
+    return jsonify(diagnostics_service.take_memory_snapshot(limit)), 200
+
+@bp.delete("/memory/snapshots")
+@admin_only
+@handle_errors("stopping memory tracing")
+def stop_memory_tracing():
+    """
+    Stop tracemalloc and drop the stored snapshot (Admin only)
+    """
+    diagnostics_service.stop_memory_tracing()
+    return jsonify({"message": "Memory tracing stopped"}), 200
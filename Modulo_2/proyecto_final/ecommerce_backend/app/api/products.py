@@ -2,8 +2,10 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt
 from app.security.decorators import admin_only, roles_required
 from app.schemas.product import ProductCreateSchema, ProductReadSchema, ProductUpdateSchema
-from app.services import product_service
+from app.schemas.fast import fast_dump
+from app.services import product_service, leaderboard_service, recommendation_service
 from app.utils.decorators import handle_errors
+from app.utils.cache_decorators import conditional_get
 
 bp = Blueprint("products", __name__, url_prefix="/products")
 
@@ -21,20 +23,70 @@ def create_product():
 @bp.get("/")
 @jwt_required()
 @roles_required("admin", "customer")
+@conditional_get(product_service.get_products_validator)
 @handle_errors("getting products")
 def get_products():
     """
     Get all products - CACHED (30 min TTL)
     
+    Query Parameters:
+        - ids (optional): Comma-separated product ids (at most 100), e.g. ids=3,1,2.
+          Returns {"products": [...], "missing": [...]} in request order, served
+          from the per-product cache with the misses loaded in one query.
+    
     Cache: Response is cached for 30 minutes. Cache is automatically 
            invalidated when admin creates, updates, or deletes products.
+    Conditional GET: ETag/Last-Modified headers; If-None-Match or
+           If-Modified-Since return 304 without building the list.
     """
+    if "ids" in request.args:
+        try:
+            product_ids = [int(value) for value in request.args["ids"].split(",") if value.strip()]
+        except ValueError:
+            return jsonify({"message": "Invalid ids format. Use comma-separated integers"}), 400
+        if not product_ids:
+            return jsonify({"message": "ids must contain at least one product id"}), 400
+        if len(product_ids) > product_service.MULTI_GET_MAX_IDS:
+            return jsonify({"message": f"At most {product_service.MULTI_GET_MAX_IDS} ids per request"}), 400
+        products, missing = product_service.get_products_by_ids(product_ids)
+        return jsonify({
+            "products": fast_dump(ProductReadSchema, products, many=True),
+            "missing": missing
+        }), 200
+    
     products = product_service.get_all_products()
-    return jsonify(ProductReadSchema().dump(products, many=True)), 200
+    return jsonify(fast_dump(ProductReadSchema, products, many=True)), 200
+
+@bp.get("/best-sellers")
+@jwt_required()
+@roles_required("admin", "customer")
+@handle_errors("getting best sellers")
+def get_best_sellers():
+    """
+    Top sellers of the current day or ISO week, from Redis sorted sets updated at checkout
+    
+    Query Parameters:
+        - period (optional): day (default) or week
+        - by (optional): units (default) or revenue
+        - limit (optional): 1-100, default 10
+    """
+    period = request.args.get("period", "day")
+    metric = request.args.get("by", "units")
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    entries = leaderboard_service.get_best_sellers(period, metric, limit)
+    return jsonify({
+        "period": period,
+        "by": metric,
+        "products": [{**entry, "product": ProductReadSchema().dump(entry["product"])} for entry in entries]
+    }), 200
 
 @bp.get("/<int:product_id>")
 @jwt_required()
 @roles_required("admin", "customer")
+@conditional_get(product_service.get_product_validator)
 @handle_errors("getting product")
 def get_product(product_id: int):
     """
@@ -42,10 +94,32 @@ def get_product(product_id: int):
     
     Cache: Response is cached for 1 hour. Cache is automatically 
            invalidated when admin updates or deletes this product.
+    Conditional GET: ETag/Last-Modified headers, 304 when unchanged.
     """
     product = product_service.get_product_by_id(product_id)
     return jsonify(ProductReadSchema().dump(product)), 200
 
+@bp.get("/<int:product_id>/related")
+@jwt_required()
+@roles_required("admin", "customer")
+@handle_errors("getting related products")
+def get_related_products(product_id: int):
+    """
+    Products frequently bought together with this one, from the precomputed co-occurrence index
+    
+    Query Parameters:
+        - limit (optional): at most RECOMMENDATIONS_TOP_K (default 10) entries
+    """
+    try:
+        limit = int(request.args["limit"]) if "limit" in request.args else None
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    related = recommendation_service.get_related(product_id, limit)
+    return jsonify({
+        "product_id": product_id,
+        "related": [{"product": ProductReadSchema().dump(entry["product"]), "count": entry["count"]} for entry in related]
+    }), 200
+
 @bp.put("/<int:product_id>")
 @admin_only
 @handle_errors("updating product", handle_validation=True)
@@ -1,17 +1,24 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, url_for
 from datetime import datetime
-from app.schemas.cart import CartCreateSchema, CartReadSchema, CartUpdateSchema, CartListSchema
+from app.schemas.cart import CartCreateSchema, CartReadSchema, CartUpdateSchema, CartListSchema, CART_STATUSES
 from app.schemas.cart_product import AddToCartSchema, UpdateCartProductSchema, CartProductReadSchema
 from app.schemas.sale import SaleCreateSchema, SaleReadSchema, SaleUpdateSchema, SaleListSchema, SaleFromCartSchema
 from app.schemas.invoice import InvoiceCreateSchema, InvoiceReadSchema, InvoiceUpdateSchema, InvoiceListSchema, InvoiceDetailSchema
-from app.services import cart_service, sale_service, invoice_service
+from app.schemas.checkout_order import CheckoutOrderReadSchema
+from app.schemas.fast import fast_dump
+from app.schemas.fieldsets import sparse_fieldset
+from app.services import cart_service, sale_service, invoice_service, checkout_queue_service, order_history_service
 from app.utils.decorators import handle_errors
-from app.utils.cache_decorators import cached_response
+from app.utils.cache_decorators import cached_response, conditional_get, idempotent
+from app.extensions import read_replica
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.security.decorators import cart_owner_required, customer_only, admin_only, roles_required
+from app.security.decorators import cart_owner_required, customer_only, admin_only, roles_required, rate_limit
 
 bp = Blueprint("sales", __name__, url_prefix="/sales")
 
+def _analytics_requested():
+    return request.args.get('analytics') == 'true'
+
 # ===== CART ENDPOINTS =====
 
 @bp.get("/cart")
@@ -45,12 +52,46 @@ def get_cart(cart_id: int):
 @handle_errors("getting user carts")
 def get_user_carts():
     """
-    Get all carts for the current user
+    Get carts for the current user
+    
+    Query Parameters:
+        - status (optional): Filter by cart status
+        - start_date (optional): Carts created from this date (YYYY-MM-DD)
+        - end_date (optional): Carts created until this date (YYYY-MM-DD)
+        - page (optional): Page number (default: 1)
+        - per_page (optional): Carts per page (default: 50, max: 100)
     """
     user_id = int(get_jwt_identity())
     status = request.args.get('status')  # Optional filter by status
-    carts = cart_service.get_user_carts(user_id, status)
-    return jsonify([CartListSchema().dump(cart) for cart in carts]), 200
+    if status and status not in CART_STATUSES:
+        return jsonify({"message": f"Invalid status. Must be one of: {CART_STATUSES}"}), 400
+    
+    start_date = None
+    end_date = None
+    
+    if request.args.get('start_date'):
+        try:
+            start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d')
+        except ValueError:
+            return jsonify({"message": "Invalid start_date format. Use YYYY-MM-DD"}), 400
+    
+    if request.args.get('end_date'):
+        try:
+            end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d')
+        except ValueError:
+            return jsonify({"message": "Invalid end_date format. Use YYYY-MM-DD"}), 400
+    
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 50))
+    except ValueError:
+        return jsonify({"message": "Invalid pagination parameters"}), 400
+    
+    if page < 1 or per_page < 1 or per_page > 100:
+        return jsonify({"message": "page must be >= 1 and per_page between 1 and 100"}), 400
+    
+    carts = cart_service.get_user_carts(user_id, status, start_date, end_date, page, per_page)
+    return jsonify(CartListSchema(many=True).dump(carts)), 200
 
 @bp.post("/cart/add")
 @jwt_required()
@@ -242,6 +283,8 @@ def admin_update_cart_status(cart_id: int):
 @bp.post("/checkout")
 @jwt_required()
 @customer_only
+@idempotent("checkout")  # outermost: replays of a stored response do not spend rate-limit tokens
+@rate_limit(10, 60)
 @handle_errors("processing checkout", handle_validation=True)
 def checkout():
     """
@@ -258,13 +301,35 @@ def checkout():
     
     Returns:
         HTTP 201: Sale created successfully with sale details and optional invoice
+        HTTP 202: Async mode (CHECKOUT_ASYNC_ENABLED): order queued, poll the Location/status_url
         HTTP 400: Validation errors or cart issues
         HTTP 404: Cart or delivery address not found
         HTTP 403: Access denied to cart or delivery address
+        HTTP 409: Same Idempotency-Key still in progress
+        HTTP 422: Idempotency-Key reused with a different body
+    
+    Retries sending the same Idempotency-Key header replay the first response.
     """
     user_id = int(get_jwt_identity())
     data = SaleFromCartSchema().load(request.get_json() or {})
     
+    if current_app.config.get("CHECKOUT_ASYNC_ENABLED", False):
+        # Queue the order; `flask checkout worker` turns it into a sale
+        order = checkout_queue_service.enqueue_checkout(
+            user_id=user_id,
+            cart_id=data['cart_id'],
+            delivery_address_id=data['delivery_address_id'],
+            payment_method=data.get('payment_method'),
+            payment_reference=data.get('payment_reference'),
+            generate_invoice=data.get('generate_invoice', False)
+        )
+        status_url = url_for("sales.get_checkout_order", order_id=order.id)
+        return jsonify({
+            "message": "Checkout accepted and queued",
+            "order": CheckoutOrderReadSchema().dump(order),
+            "status_url": status_url
+        }), 202, {"Location": status_url}
+    
     # Create sale from cart
     sale = sale_service.create_sale_from_cart(
         user_id=user_id,
@@ -299,6 +364,34 @@ def checkout():
     
     return jsonify(response_data), 201
 
+@bp.get("/checkout/orders/<int:order_id>")
+@jwt_required()
+@customer_only
+@handle_errors("getting checkout order")
+def get_checkout_order(order_id: int):
+    """
+    Status of a checkout queued in async mode
+    
+    Authentication: JWT token with customer role required
+    
+    Returns:
+        HTTP 200: Order with status queued | completed | failed (and the sale once completed).
+                  Queued orders carry Retry-After with a suggested polling delay.
+        HTTP 404: Order not found
+        HTTP 403: Access denied (order belongs to another user)
+    """
+    user_id = int(get_jwt_identity())
+    order = checkout_queue_service.get_order(order_id, user_id)
+    
+    response_data = {"order": CheckoutOrderReadSchema().dump(order)}
+    if order.status == "completed" and order.sale:
+        response_data["sale"] = SaleReadSchema().dump(order.sale)
+    if order.invoice:
+        response_data["invoice"] = InvoiceReadSchema().dump(order.invoice)
+    
+    headers = {"Retry-After": "1"} if order.status == "queued" else {}
+    return jsonify(response_data), 200, headers
+
 @bp.get("/sales")
 @jwt_required()
 @customer_only
@@ -313,6 +406,7 @@ def get_user_sales():
         - start_date (optional): Filter sales from this date (YYYY-MM-DD)
         - end_date (optional): Filter sales until this date (YYYY-MM-DD)
         - summary (optional): Include summary statistics if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
         HTTP 200: List of user's sales
@@ -335,11 +429,12 @@ def get_user_sales():
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Use YYYY-MM-DD"}), 400
     
-    # Get user sales
-    sales = sale_service.get_user_sales(user_id, start_date, end_date)
+    # Get user sales, loading only the relationships the requested fields read
+    fieldset = sparse_fieldset(SaleListSchema)
+    sales = sale_service.get_user_sales(user_id, start_date, end_date, fieldset.paths)
     
     response_data = {
-        "sales": SaleListSchema(many=True).dump(sales),
+        "sales": fast_dump(SaleListSchema, sales, many=True, only=fieldset.only),
         "count": len(sales)
     }
     
@@ -349,9 +444,29 @@ def get_user_sales():
     
     return jsonify(response_data), 200
 
+@bp.get("/order-history")
+@jwt_required()
+@customer_only
+@handle_errors("getting order history")
+def get_order_history():
+    """
+    "My orders" in one read: every sale of the current user with its items and invoices
+    
+    Authentication: JWT token with customer role required
+    
+    Served from the user's denormalized order history document, which checkout and
+    invoice changes keep up to date (built on first read).
+    
+    Returns:
+        HTTP 200: {"orders": [...], "count": n, "updated_at": ...}, newest order first
+    """
+    user_id = int(get_jwt_identity())
+    return jsonify(order_history_service.get_order_history(user_id)), 200
+
 @bp.get("/sales/<int:sale_id>")
 @jwt_required()
 @customer_only
+@conditional_get(sale_service.get_sale_validator, include_user=True)
 @handle_errors("getting sale")
 def get_sale(sale_id: int):
     """
@@ -364,19 +479,22 @@ def get_sale(sale_id: int):
     
     Query Parameters:
         - include_summary (optional): Include detailed summary if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
-        HTTP 200: Sale details
+        HTTP 200: Sale details (with ETag/Last-Modified)
+        HTTP 304: Not modified (If-None-Match / If-Modified-Since)
         HTTP 404: Sale not found
         HTTP 403: Access denied (sale belongs to another user)
     """
     user_id = int(get_jwt_identity())
     
     # Get sale with ownership validation
-    sale = sale_service.get_sale_by_id(sale_id, user_id)
+    fieldset = sparse_fieldset(SaleReadSchema)
+    sale = sale_service.get_sale_by_id(sale_id, user_id, fieldset.paths)
     
     response_data = {
-        "sale": SaleReadSchema().dump(sale)
+        "sale": SaleReadSchema(only=fieldset.only).dump(sale)
     }
     
     # Include detailed summary if requested
@@ -390,6 +508,7 @@ def get_sale(sale_id: int):
 @bp.post("/invoices")
 @jwt_required()
 @customer_only
+@idempotent("invoices")
 @handle_errors("creating invoice", handle_validation=True)
 def create_invoice():
     """
@@ -406,6 +525,8 @@ def create_invoice():
         HTTP 400: Validation errors
         HTTP 404: Sale or delivery address not found
         HTTP 403: Access denied to sale or delivery address
+        HTTP 409: Same Idempotency-Key still in progress
+        HTTP 422: Idempotency-Key reused with a different body
     """
     user_id = int(get_jwt_identity())
     data = InvoiceCreateSchema().load(request.get_json() or {})
@@ -425,6 +546,7 @@ def create_invoice():
 @bp.get("/invoices/<int:invoice_id>")
 @jwt_required()
 @customer_only
+@conditional_get(invoice_service.get_invoice_validator, include_user=True)
 @handle_errors("getting invoice")
 def get_invoice(invoice_id: int):
     """
@@ -437,9 +559,11 @@ def get_invoice(invoice_id: int):
     
     Query Parameters:
         - include_details (optional): Include detailed summary if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
-        HTTP 200: Invoice details
+        HTTP 200: Invoice details (with ETag/Last-Modified)
+        HTTP 304: Not modified (If-None-Match / If-Modified-Since)
         HTTP 404: Invoice not found
         HTTP 403: Access denied (invoice belongs to another user)
     """
@@ -447,14 +571,16 @@ def get_invoice(invoice_id: int):
     
     # Get invoice with ownership validation
     if request.args.get('include_details') == 'true':
+        fieldset = sparse_fieldset(InvoiceDetailSchema)
         invoice = invoice_service.get_invoice_with_details(invoice_id, user_id)
         response_data = {
-            "invoice": InvoiceDetailSchema().dump(invoice)
+            "invoice": InvoiceDetailSchema(only=fieldset.only).dump(invoice)
         }
     else:
-        invoice = invoice_service.get_invoice_by_id(invoice_id, user_id)
+        fieldset = sparse_fieldset(InvoiceReadSchema)
+        invoice = invoice_service.get_invoice_by_id(invoice_id, user_id, load=fieldset.paths)
         response_data = {
-            "invoice": InvoiceReadSchema().dump(invoice)
+            "invoice": InvoiceReadSchema(only=fieldset.only).dump(invoice)
         }
     
     # Include detailed summary if requested
@@ -477,6 +603,7 @@ def get_user_invoices():
         - start_date (optional): Filter invoices from this date (YYYY-MM-DD)
         - end_date (optional): Filter invoices until this date (YYYY-MM-DD)
         - summary (optional): Include summary statistics if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
         HTTP 200: List of user's invoices
@@ -499,11 +626,12 @@ def get_user_invoices():
         except ValueError:
             return jsonify({"message": "Invalid end_date format. Use YYYY-MM-DD"}), 400
     
-    # Get user invoices
-    invoices = invoice_service.get_user_invoices(user_id, start_date, end_date)
+    # Get user invoices, loading only the relationships the requested fields read
+    fieldset = sparse_fieldset(InvoiceListSchema)
+    invoices = invoice_service.get_user_invoices(user_id, start_date, end_date, fieldset.paths)
     
     response_data = {
-        "invoices": InvoiceListSchema(many=True).dump(invoices),
+        "invoices": fast_dump(InvoiceListSchema, invoices, many=True, only=fieldset.only),
         "count": len(invoices)
     }
     
@@ -526,6 +654,9 @@ def get_sale_invoices(sale_id: int):
     Path Parameters:
         - sale_id: ID of the sale
     
+    Query Parameters:
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
+    
     Returns:
         HTTP 200: List of invoices for the sale
         HTTP 404: Sale not found
@@ -534,11 +665,12 @@ def get_sale_invoices(sale_id: int):
     user_id = int(get_jwt_identity())
     
     # Get invoices for sale with ownership validation
-    invoices = invoice_service.get_invoices_for_sale(sale_id, user_id)
+    fieldset = sparse_fieldset(InvoiceListSchema)
+    invoices = invoice_service.get_invoices_for_sale(sale_id, user_id, fieldset.paths)
     
     return jsonify({
         "sale_id": sale_id,
-        "invoices": InvoiceListSchema(many=True).dump(invoices),
+        "invoices": fast_dump(InvoiceListSchema, invoices, many=True, only=fieldset.only),
         "count": len(invoices)
     }), 200
 
@@ -604,7 +736,9 @@ def delete_invoice(invoice_id: int):
 
 @bp.get("/admin/sales")
 @admin_only
+@rate_limit(30, 60, when=_analytics_requested)  # aggregation is the expensive path
 @cached_response(timeout=600, key_prefix="admin.sales")  # 10 min TTL
+@read_replica
 @handle_errors("getting all sales")
 def get_all_sales():
     """
@@ -617,6 +751,7 @@ def get_all_sales():
         - date_from (optional): Filter by date range (YYYY-MM-DD)
         - date_to (optional): Filter by date range (YYYY-MM-DD)
         - analytics (optional): Include analytics if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Cache: Response is cached for 10 minutes. Especially beneficial when
            analytics=true due to expensive aggregation operations.
@@ -648,10 +783,11 @@ def get_all_sales():
             return jsonify({"message": "Invalid date_to format. Use YYYY-MM-DD"}), 400
     
     # Get sales with filters
-    sales = sale_service.get_all_sales(user_id, start_date, end_date)
+    fieldset = sparse_fieldset(SaleListSchema)
+    sales = sale_service.get_all_sales(user_id, start_date, end_date, fieldset.paths)
     
     response_data = {
-        "sales": SaleListSchema(many=True).dump(sales),
+        "sales": fast_dump(SaleListSchema, sales, many=True, only=fieldset.only),
         "count": len(sales),
         "filters": {
             "user_id": user_id,
@@ -680,16 +816,18 @@ def admin_get_sale(sale_id: int):
     
     Query Parameters:
         - include_summary (optional): Include detailed summary if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
         HTTP 200: Sale details
         HTTP 404: Sale not found
     """
     # Admin can access any sale without ownership validation
-    sale = sale_service.get_sale_by_id(sale_id)
+    fieldset = sparse_fieldset(SaleReadSchema)
+    sale = sale_service.get_sale_by_id(sale_id, load=fieldset.paths)
     
     response_data = {
-        "sale": SaleReadSchema().dump(sale)
+        "sale": SaleReadSchema(only=fieldset.only).dump(sale)
     }
     
     # Include detailed summary if requested
@@ -732,6 +870,8 @@ def admin_update_sale(sale_id: int):
 
 @bp.get("/admin/invoices")
 @admin_only
+@rate_limit(30, 60, when=_analytics_requested)
+@read_replica
 @handle_errors("getting all invoices")
 def get_all_invoices():
     """
@@ -744,6 +884,7 @@ def get_all_invoices():
         - date_from (optional): Filter by date range (YYYY-MM-DD)
         - date_to (optional): Filter by date range (YYYY-MM-DD)
         - analytics (optional): Include analytics if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
         HTTP 200: List of all invoices with optional analytics
@@ -772,10 +913,11 @@ def get_all_invoices():
             return jsonify({"message": "Invalid date_to format. Use YYYY-MM-DD"}), 400
     
     # Get invoices with filters
-    invoices = invoice_service.get_all_invoices(start_date, end_date, user_id)
+    fieldset = sparse_fieldset(InvoiceListSchema)
+    invoices = invoice_service.get_all_invoices(start_date, end_date, user_id, fieldset.paths)
     
     response_data = {
-        "invoices": InvoiceListSchema(many=True).dump(invoices),
+        "invoices": fast_dump(InvoiceListSchema, invoices, many=True, only=fieldset.only),
         "count": len(invoices),
         "filters": {
             "user_id": user_id,
@@ -805,6 +947,7 @@ def admin_get_invoice(invoice_id: int):
     Query Parameters:
         - include_details (optional): Include detailed summary if true
         - include_summary (optional): Include comprehensive summary if true
+        - fields, include (optional): Sparse fieldset, e.g. fields=id,total&include=user
     
     Returns:
         HTTP 200: Invoice details
@@ -812,14 +955,16 @@ def admin_get_invoice(invoice_id: int):
     """
     # Admin can access any invoice without ownership validation
     if request.args.get('include_details') == 'true':
+        fieldset = sparse_fieldset(InvoiceDetailSchema)
         invoice = invoice_service.get_invoice_with_details(invoice_id)
         response_data = {
-            "invoice": InvoiceDetailSchema().dump(invoice)
+            "invoice": InvoiceDetailSchema(only=fieldset.only).dump(invoice)
         }
     else:
-        invoice = invoice_service.get_invoice_by_id(invoice_id)
+        fieldset = sparse_fieldset(InvoiceReadSchema)
+        invoice = invoice_service.get_invoice_by_id(invoice_id, load=fieldset.paths)
         response_data = {
-            "invoice": InvoiceReadSchema().dump(invoice)
+            "invoice": InvoiceReadSchema(only=fieldset.only).dump(invoice)
         }
     
     # Include detailed summary if requested
@@ -912,6 +1057,7 @@ def admin_create_invoice():
 
 @bp.get("/admin/invoices/search")
 @admin_only
+@read_replica
 @handle_errors("searching invoices")
 def admin_search_invoices():
     """
@@ -947,7 +1093,7 @@ def admin_search_invoices():
     invoices = invoice_service.search_invoices(min_total, max_total)
     
     return jsonify({
-        "invoices": InvoiceListSchema(many=True).dump(invoices),
+        "invoices": fast_dump(InvoiceListSchema, invoices, many=True),
         "count": len(invoices),
         "search_criteria": {
             "min_total": min_total,
@@ -4,7 +4,7 @@ from app.utils.decorators import handle_errors
 from app.utils.exceptions import json_error
 from flask import Blueprint, jsonify, request, g
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
-from app.security.decorators import admin_only, optional_roles, owner_or_admin_required, delivery_address_access_required
+from app.security.decorators import admin_only, optional_roles, owner_or_admin_required, delivery_address_access_required, rate_limit
 from app.services import user_service, auth_service, delivery_address_service
 from app.schemas.delivery_address import DeliveryAddressCreateSchema, DeliveryAddressReadSchema, DeliveryAddressUpdateSchema
 from app.security.blocklist import block_token
@@ -75,6 +75,7 @@ def register():
 
 
 @bp.post("/login")
+@rate_limit(10, 60)  # password hashing is deliberately slow
 @handle_errors("logging in", handle_validation=True)
 def login():
     """
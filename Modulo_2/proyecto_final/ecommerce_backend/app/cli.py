@@ -0,0 +1,317 @@
+# app/cli.py
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+carts_cli = AppGroup("carts", help="Cart maintenance commands")
+
+@carts_cli.command("sweep")
+@click.option("--abandon-after", type=int, default=None, help="Days idle before an active cart is abandoned")
+@click.option("--expire-after", type=int, default=None, help="Days idle before an abandoned cart expires")
+@click.option("--purge-after", type=int, default=None, help="Days idle before abandoned/expired cart products are deleted")
+@click.option("--batch-size", type=int, default=None, help="Rows touched per statement")
+@click.option("--pause", type=float, default=None, help="Seconds to sleep between batches")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches")
+def sweep_carts(abandon_after, expire_after, purge_after, batch_size, pause, max_batches):
+    """
+    Mark stale carts abandoned/expired and optionally purge their products.
+    
+    Safe to schedule (cron, systemd timer, k8s CronJob):
+        */15 * * * * cd /srv/ecommerce_backend && flask carts sweep
+    """
+    from app.services import cart_service
+    
+    config = current_app.config
+    
+    def report(stage, affected, total):
+        click.echo(f"  {stage}: +{affected} (total {total})")
+    
+    result = cart_service.sweep_stale_carts(
+        abandon_after_days=abandon_after if abandon_after is not None else config.get("CART_ABANDON_AFTER_DAYS", 7),
+        expire_after_days=expire_after if expire_after is not None else config.get("CART_EXPIRE_AFTER_DAYS", 30),
+        purge_after_days=purge_after if purge_after is not None else config.get("CART_PURGE_AFTER_DAYS"),
+        batch_size=batch_size or config.get("CART_SWEEP_BATCH_SIZE", 1000),
+        pause_seconds=pause if pause is not None else config.get("CART_SWEEP_PAUSE_SECONDS", 0),
+        max_batches=max_batches,
+        progress=report
+    )
+    
+    click.echo(
+        f"Cart sweep finished: {result['abandoned']} abandoned, {result['expired']} expired, "
+        f"{result['purged_cart_products']} cart products purged "
+        f"({result['batches']} batches in {result['elapsed_seconds']}s)"
+    )
+
+checkout_cli = AppGroup("checkout", help="Asynchronous checkout commands")
+
+@checkout_cli.command("worker")
+@click.option("--batch-size", type=int, default=None, help="Orders applied per transaction")
+@click.option("--poll-interval", type=float, default=None, help="Seconds to sleep while the queue is empty")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches")
+@click.option("--once", is_flag=True, help="Drain the queue and exit instead of polling")
+def checkout_worker(batch_size, poll_interval, max_batches, once):
+    """
+    Turn queued checkouts (CHECKOUT_ASYNC_ENABLED) into sales, in micro-batches.
+    
+    Run one or more long-lived workers next to the web processes:
+        flask checkout worker --batch-size 200
+    """
+    from app.services import checkout_queue_service
+    
+    config = current_app.config
+    
+    def report(result):
+        click.echo(f"  batch: {result['claimed']} orders, {result['completed']} completed, {result['failed']} failed")
+    
+    try:
+        totals = checkout_queue_service.run_worker(
+            batch_size=batch_size or config.get("CHECKOUT_WORKER_BATCH_SIZE", 100),
+            poll_seconds=poll_interval if poll_interval is not None else config.get("CHECKOUT_WORKER_POLL_SECONDS", 0.2),
+            max_batches=max_batches,
+            stop_when_empty=once,
+            progress=report
+        )
+    except KeyboardInterrupt:
+        click.echo("Checkout worker interrupted")
+        return
+    click.echo(
+        f"Checkout worker finished: {totals['completed']} completed, {totals['failed']} failed "
+        f"({totals['batches']} batches)"
+    )
+
+inventory_cli = AppGroup("inventory", help="Sharded stock counters for hot products")
+
+@inventory_cli.command("shard")
+@click.argument("product_id", type=int)
+@click.option("--shards", type=int, default=None, help="Number of stock counters (default INVENTORY_DEFAULT_SHARDS)")
+def inventory_shard(product_id, shards):
+    """
+    Split a hot product's stock across several counters so concurrent checkouts
+    do not queue on its row lock; run again with another --shards to resize.
+    """
+    from app.services import inventory_service
+    from app.services.cache_service import invalidate_product_cache
+    from app.utils.exceptions import AppError
+    
+    try:
+        result = inventory_service.shard_product(product_id, shards or current_app.config.get("INVENTORY_DEFAULT_SHARDS", 8))
+    except AppError as e:
+        raise click.ClickException(str(e))
+    invalidate_product_cache()
+    click.echo(f"Product {result['product_id']}: {result['stock']} units across {result['shards']} shards")
+
+@inventory_cli.command("unshard")
+@click.argument("product_id", type=int)
+def inventory_unshard(product_id):
+    """Fold a product's shards back into products.stock"""
+    from app.services import inventory_service
+    from app.services.cache_service import invalidate_product_cache
+    from app.utils.exceptions import AppError
+    
+    try:
+        result = inventory_service.unshard_product(product_id)
+    except AppError as e:
+        raise click.ClickException(str(e))
+    invalidate_product_cache()
+    click.echo(f"Product {result['product_id']}: {result['stock']} units, no longer sharded")
+
+@inventory_cli.command("rebalance")
+@click.option("--product-id", type=int, default=None, help="Only this product (default: every sharded product)")
+def inventory_rebalance(product_id):
+    """
+    Spread each sharded product's stock evenly over its shards again and
+    refresh the products.stock snapshot. Meant for cron, e.g. every minute:
+        flask inventory rebalance
+    """
+    from app.services import inventory_service
+    
+    results = inventory_service.rebalance(product_id)
+    for result in results:
+        click.echo(
+            f"  product {result['product_id']}: {result['stock']} units over {result['shards']} shards "
+            f"(spread was {result['spread_before']})"
+        )
+    click.echo(f"Rebalanced {len(results)} sharded products")
+
+leaderboard_cli = AppGroup("leaderboard", help="Best-seller leaderboard commands")
+
+@leaderboard_cli.command("rebuild")
+@click.option("--period", type=click.Choice(["day", "week", "all"]), default="all", show_default=True)
+def leaderboard_rebuild(period):
+    """
+    Recompute the current day/week best-seller sets from sale_products, e.g.
+    after a Redis flush or restore:
+        flask leaderboard rebuild
+    """
+    from app.services import leaderboard_service
+    
+    periods = leaderboard_service.PERIODS if period == "all" else (period,)
+    result = leaderboard_service.rebuild(periods)
+    for name, products in result.items():
+        click.echo(f"  {name}: {products} products ranked")
+    click.echo("Leaderboards rebuilt")
+
+recommendations_cli = AppGroup("recommendations", help="Frequently-bought-together index commands")
+
+@recommendations_cli.command("rebuild")
+@click.option("--chunk-size", type=int, default=50_000, show_default=True, help="sale_products rows streamed per fetch")
+def recommendations_rebuild(chunk_size):
+    """
+    Recompute the product co-occurrence index from the whole sales history.
+    Checkouts keep it current incrementally; run this after imports or deletes:
+        flask recommendations rebuild
+    """
+    from app.services import recommendation_service
+    
+    def report(sales, pairs):
+        click.echo(f"  {sales:,} sales read, {pairs:,} product pairs")
+    
+    result = recommendation_service.rebuild_index(chunk_size=chunk_size, progress=report)
+    click.echo(
+        f"Co-occurrence index rebuilt: {result['pairs']:,} pairs from {result['sales']:,} sales "
+        f"in {result['elapsed_seconds']}s"
+    )
+
+order_history_cli = AppGroup("order-history", help="Per-user order history read model commands")
+
+@order_history_cli.command("check")
+@click.option("--repair", is_flag=True, help="Rewrite the documents that are missing or differ")
+@click.option("--user-id", type=int, default=None, help="Only this user")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Users fetched per query")
+def order_history_check(repair, user_id, batch_size):
+    """
+    Compare stored order history documents with the normalized tables and the sales archive.
+    Exits with status 1 when inconsistencies are left unrepaired, e.g. for cron:
+        flask order-history check || alert
+    """
+    from app.services import order_history_service
+    
+    def report(uid, problem):
+        click.echo(f"  user {uid}: {problem}")
+    
+    result = order_history_service.check_consistency(repair=repair, user_id=user_id, batch_size=batch_size,
+                                                     progress=report)
+    click.echo(
+        f"Order history check: {result['checked']} users, {result['missing']} missing, "
+        f"{result['stale']} stale, {result['repaired']} repaired"
+    )
+    if result["missing"] + result["stale"] > result["repaired"]:
+        raise SystemExit(1)
+
+@order_history_cli.command("rebuild")
+@click.option("--user-id", type=int, default=None, help="Only this user")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Users fetched per query")
+def order_history_rebuild(user_id, batch_size):
+    """Rewrite every user's order history document from the normalized tables and the sales archive"""
+    from app.services import order_history_service
+    
+    rebuilt = order_history_service.rebuild(user_id=user_id, batch_size=batch_size)
+    click.echo(f"Order history rebuilt for {rebuilt} users")
+
+partitions_cli = AppGroup("partitions", help="Monthly partitions of sales and invoices (PostgreSQL)")
+
+@partitions_cli.command("ensure")
+@click.option("--months-ahead", type=int, default=None, help="Months to create in advance (default: PARTITION_MONTHS_AHEAD)")
+def partitions_ensure(months_ahead):
+    """
+    Create the missing monthly partitions up to N months ahead. Idempotent, run it daily, e.g.:
+        15 3 * * * cd /app && flask partitions ensure
+    """
+    from app.services import partition_service
+    
+    created = partition_service.ensure_partitions(months_ahead=months_ahead)
+    for name in created:
+        click.echo(f"  created {name}")
+    click.echo(f"Partitions ensured: {len(created)} created")
+
+@partitions_cli.command("list")
+def partitions_list():
+    """List the partitions of sales and invoices with estimated row counts"""
+    from app.services import partition_service
+    
+    for table, partitions in partition_service.get_partitions().items():
+        if not partitions:
+            click.echo(f"{table}: not partitioned")
+            continue
+        click.echo(f"{table}: {len(partitions)} partitions")
+        for partition in partitions:
+            click.echo(f"  {partition['name']}: {partition['bounds']} (~{partition['rows']:,} rows)")
+
+archive_cli = AppGroup("archive", help="Columnar cold-data archive of closed sales periods")
+
+@archive_cli.command("run")
+@click.option("--older-than-months", type=click.IntRange(min=1), default=None,
+              help="Archive months that ended more than N months ago (default: ARCHIVE_AFTER_MONTHS)")
+def archive_run(older_than_months):
+    """
+    Move closed months of sales, sale products and invoices to ARCHIVE_DIR. Idempotent, e.g. monthly:
+        30 3 1 * * cd /app && flask archive run
+    """
+    from app.services import archive_service
+    
+    def report(result):
+        click.echo(f"  {result['period']}: {result['sales']} sales, {result['sale_products']} sale products, "
+                   f"{result['invoices']} invoices -> {result['bytes']:,} bytes")
+    
+    results = archive_service.archive_closed_periods(older_than_months=older_than_months, progress=report)
+    click.echo(f"Archive finished: {len(results)} periods, {sum(r['sales'] for r in results)} sales moved")
+
+@archive_cli.command("list")
+def archive_list():
+    """List the archived periods with their row counts"""
+    from app.services import archive_service
+    
+    periods = archive_service.list_periods()
+    if not periods:
+        click.echo(f"No archived periods in {archive_service.archive_dir()}")
+    for manifest in periods:
+        rows = manifest["rows"]
+        status = "" if manifest["status"] == "complete" else f" [{manifest['status']}]"
+        click.echo(f"{manifest['period']}: {rows['sales']} sales, {rows['sale_products']} sale products, "
+                   f"{rows['invoices']} invoices, {manifest['bytes']:,} bytes{status}")
+
+@click.command("seed")
+@click.option("--users", type=int, default=1000, show_default=True, help="Customers to create")
+@click.option("--products", type=int, default=500, show_default=True, help="Products to create")
+@click.option("--sales", type=int, default=5000, show_default=True, help="Sales to create (with sale products)")
+@click.option("--carts", type=int, default=2000, show_default=True, help="Carts to create (with cart products)")
+@click.option("--invoice-ratio", type=float, default=0.7, show_default=True, help="Share of sales that get an invoice")
+@click.option("--seed", "seed_value", type=int, default=42, show_default=True, help="Random seed (same seed = same data)")
+@click.option("--chunk-size", type=int, default=50_000, show_default=True, help="Rows per COPY/executemany batch")
+@click.option("--start-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First sale date (default: end date - 2 years)")
+@click.option("--end-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last sale date (default: 2025-01-01)")
+def seed(users, products, sales, carts, invoice_ratio, seed_value, chunk_size, start_date, end_date):
+    """
+    Bulk-load a synthetic dataset with realistic skew for benchmarks.
+    
+    Product popularity and customer activity are Zipfian, sale dates are
+    seasonal. Rows are appended after the current max ids, e.g.:
+        flask seed --users 1000000 --products 50000 --sales 3000000 --carts 1000000
+    """
+    from app.services import seed_service
+    
+    def report(table, rows, seconds):
+        rate = rows / seconds if seconds else rows
+        click.echo(f"  {table}: +{rows} rows ({rate:,.0f} rows/s)")
+    
+    result = seed_service.seed_database(
+        users=users, products=products, sales=sales, carts=carts,
+        invoice_ratio=invoice_ratio, seed=seed_value, chunk_size=chunk_size,
+        start_date=start_date, end_date=end_date, progress=report
+    )
+    elapsed = result.pop("elapsed_seconds")
+    total = sum(result.values())
+    click.echo(f"Seed finished: {total:,} rows in {elapsed}s ({total / elapsed if elapsed else total:,.0f} rows/s)")
+    for table, rows in result.items():
+        click.echo(f"  {table}: {rows:,}")
+
+def register_commands(app):
+    app.cli.add_command(carts_cli)
+    app.cli.add_command(checkout_cli)
+    app.cli.add_command(inventory_cli)
+    app.cli.add_command(leaderboard_cli)
+    app.cli.add_command(recommendations_cli)
+    app.cli.add_command(order_history_cli)
+    app.cli.add_command(partitions_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(seed)
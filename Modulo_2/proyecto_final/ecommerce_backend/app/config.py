@@ -1,5 +1,6 @@
 # app/config.py
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()  # carga .env si existe
@@ -15,6 +16,59 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # JSON encoding: "orjson" (fast, used when installed) or "default" (Flask's stdlib provider)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+    # Response compression (gzip, plus brotli when installed)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "True").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # bytes, smaller bodies are sent as-is
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", 4))
+    COMPRESS_CACHE_TIMEOUT = int(os.getenv("COMPRESS_CACHE_TIMEOUT", 300))  # 0 = do not cache compressed variants
+    
+    # Idempotency-Key store for POST /sales/checkout and POST /sales/invoices
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 86400))  # seconds a stored response is replayed
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 30))  # in-progress marker lifetime
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))  # max wait for a concurrent duplicate
+    
+    # Token-bucket rate limiting (login, checkout, admin analytics)
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "True").lower() == "true"
+    RATELIMIT_STORAGE = os.getenv("RATELIMIT_STORAGE", "auto")  # auto | redis | memory
+    
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted (0 = none, use the socket address)
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+    
+    # Slow-query log and statement fingerprint stats (GET /admin/slow-queries)
+    SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "True").lower() == "true"
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+    SLOW_QUERY_LOG_PER_MINUTE = int(os.getenv("SLOW_QUERY_LOG_PER_MINUTE", 30))
+    SLOW_QUERY_EXPLAIN_COOLDOWN = int(os.getenv("SLOW_QUERY_EXPLAIN_COOLDOWN", 300))  # seconds between EXPLAINs per fingerprint
+    SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", 500))
+    
+    # On-demand request profiling (admin requests with the X-Profile header)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "True").lower() == "true"
+    PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+    PROFILE_STORE_DIR = os.getenv("PROFILE_STORE_DIR", os.path.join(tempfile.gettempdir(), "ecommerce_profiles"))
+    PROFILE_STORE_MAX = int(os.getenv("PROFILE_STORE_MAX", 20))  # newest profiles kept per host
+    
+    # Memory diagnostics (GET /admin/memory) and worker self-recycling
+    MEMORY_DIAGNOSTICS_ENABLED = os.getenv("MEMORY_DIAGNOSTICS_ENABLED", "True").lower() == "true"
+    MEMORY_MAX_REQUESTS = int(os.getenv("MEMORY_MAX_REQUESTS", 0))  # 0 = never recycle by request count
+    MEMORY_MAX_RSS_MB = int(os.getenv("MEMORY_MAX_RSS_MB", 0))  # 0 = never recycle by RSS
+    MEMORY_RSS_CHECK_INTERVAL = int(os.getenv("MEMORY_RSS_CHECK_INTERVAL", 100))  # requests between RSS reads
+    MEMORY_RECYCLE_SIGNAL = os.getenv("MEMORY_RECYCLE_SIGNAL", "SIGTERM")
+    
+    # Prometheus /metrics (multi-worker: export PROMETHEUS_MULTIPROC_DIR before starting the server)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN")  # optional bearer token required to scrape
+    
+    # Optional read replica: read-only repo calls and marked endpoints are routed here
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    SQLALCHEMY_BINDS = {"replica": REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    # Seconds a user keeps reading from the primary after their own write
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+    
     # Cache Configuration - Use Redis for both development and production
     CACHE_TYPE = "RedisCache"  # Always use Redis for consistency
     CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", 300))  # 5 minutes
@@ -41,3 +95,27 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", 15 * 60))  # 15 min
     JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", 7 * 24 * 3600))  # 7 días
     
+    # Stale cart sweeper (flask carts sweep)
+    CART_ABANDON_AFTER_DAYS = int(os.getenv("CART_ABANDON_AFTER_DAYS", 7))
+    CART_EXPIRE_AFTER_DAYS = int(os.getenv("CART_EXPIRE_AFTER_DAYS", 30))
+    CART_PURGE_AFTER_DAYS = int(os.getenv("CART_PURGE_AFTER_DAYS", 0)) or None  # 0 = never purge
+    CART_SWEEP_BATCH_SIZE = int(os.getenv("CART_SWEEP_BATCH_SIZE", 1000))
+    CART_SWEEP_PAUSE_SECONDS = float(os.getenv("CART_SWEEP_PAUSE_SECONDS", 0.05))
+    
+    # Async checkout: POST /sales/checkout queues the order (202) and `flask checkout worker` applies it
+    CHECKOUT_ASYNC_ENABLED = os.getenv("CHECKOUT_ASYNC_ENABLED", "False").lower() == "true"
+    CHECKOUT_WORKER_BATCH_SIZE = int(os.getenv("CHECKOUT_WORKER_BATCH_SIZE", 100))  # orders per transaction
+    CHECKOUT_WORKER_POLL_SECONDS = float(os.getenv("CHECKOUT_WORKER_POLL_SECONDS", 0.2))  # sleep when the queue is empty
+    
+    # Sharded stock for hot products (flask inventory shard <product_id>)
+    INVENTORY_DEFAULT_SHARDS = int(os.getenv("INVENTORY_DEFAULT_SHARDS", 8))
+    
+    # Frequently bought together (GET /products/<id>/related): neighbours kept per product
+    RECOMMENDATIONS_TOP_K = int(os.getenv("RECOMMENDATIONS_TOP_K", 10))
+    
+    # Monthly partitions of sales/invoices on PostgreSQL (cron `flask partitions ensure`)
+    PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+    
+    # Cold-data archive of closed sales months (flask archive run), merged into sales/invoice analytics
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", 12))
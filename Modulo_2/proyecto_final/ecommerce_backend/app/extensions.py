@@ -1,14 +1,107 @@
 # app/extensions.py
+import sqlite3
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_app_context, current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_caching import Cache
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-db = SQLAlchemy()
+REPLICA_BIND = "replica"
+PRIMARY_STICKY_PREFIX = "db.primary_sticky_user_"
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs issued inside `read_replica`/`use_replica` to the
+    replica bind (SQLALCHEMY_BINDS["replica"]). Everything else - flushes, bulk
+    UPDATE/DELETE and reads outside a marked block - uses the primary. Once the
+    current request or user has written, reads stick to the primary.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, "is_select", False) and _replica_allowed():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate(compare_type=True, compare_server_default=True)
 jwt = JWTManager()
 cache = Cache()
 
+def _current_user_id():
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        return None  # No JWT verified in this context
+
+def _replica_allowed() -> bool:
+    if not has_app_context() or not g.get("_replica_depth"):
+        return False
+    if g.get("_primary_pinned"):
+        return False
+    if REPLICA_BIND not in current_app.config.get("SQLALCHEMY_BINDS", {}):
+        return False
+    
+    # Read-your-writes: a user that wrote recently keeps reading from the primary
+    if "_primary_sticky" not in g:
+        user_id = _current_user_id()
+        try:
+            g._primary_sticky = bool(user_id) and cache.get(f"{PRIMARY_STICKY_PREFIX}{user_id}") is not None
+        except Exception:
+            g._primary_sticky = True  # Cache unavailable, play safe
+    return not g._primary_sticky
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_primary_after_write(session, flush_context):
+    """Reads after a write in this request (and from this user, for a while) use the primary"""
+    if not has_app_context():
+        return
+    g._primary_pinned = True
+    if REPLICA_BIND not in current_app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    user_id = _current_user_id()
+    if user_id:
+        try:
+            cache.set(f"{PRIMARY_STICKY_PREFIX}{user_id}", "1",
+                      timeout=current_app.config.get("REPLICA_STICKY_SECONDS", 5))
+        except Exception as e:
+            print(f"Error pinning user {user_id} to primary: {e}")
+
+@contextmanager
+def use_replica():
+    """Route SELECTs inside this block to the read replica (if one is configured)"""
+    if not has_app_context():
+        yield
+        return
+    g._replica_depth = g.get("_replica_depth", 0) + 1
+    try:
+        yield
+    finally:
+        g._replica_depth -= 1
+
+def read_replica(fn):
+    """Decorator for read-only repo functions and endpoints that may be served by the replica"""
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        with use_replica():
+            return fn(*args, **kwargs)
+    return decorated
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only honours ON DELETE CASCADE when foreign keys are enabled per connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 def init_extensions(app):
     db.init_app(app)
     migrate.init_app(app, db)
@@ -5,4 +5,8 @@ from .cart import Cart
 from .cart_product import CartProduct
 from .sale import Sale
 from .sale_product import SaleProduct
-from .invoice import Invoice
\ No newline at end of file
+from .invoice import Invoice
+from .checkout_order import CheckoutOrder
+from .product_stock_shard import ProductStockShard
+from .product_cooccurrence import ProductCooccurrence
+from .user_order_history import UserOrderHistory
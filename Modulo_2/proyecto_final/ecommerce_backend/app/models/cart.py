@@ -3,16 +3,20 @@ from sqlalchemy import func
 
 class Cart(db.Model):
     __tablename__ = "carts"
+    __table_args__ = (
+        db.Index("ix_carts_user_id_status_created_at", "user_id", "status", "created_at"),
+        db.Index("ix_carts_status_updated_at", "status", "updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     creation_date = db.Column(db.DateTime, nullable=False, server_default=func.now())
     status = db.Column(db.String(20), nullable=False, default="active")
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
 
     # Relationships
-    cart_products = db.relationship('CartProduct', backref='cart', lazy=True, cascade='all, delete-orphan')
+    cart_products = db.relationship('CartProduct', backref='cart', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f"<Cart {self.id} - User: {self.user_id}>"
@@ -0,0 +1,36 @@
+from app.extensions import db
+from sqlalchemy import func
+
+CHECKOUT_ORDER_STATUSES = ["queued", "completed", "failed"]
+
+class CheckoutOrder(db.Model):
+    """Checkout accepted in async mode, waiting for `flask checkout worker` to turn it into a sale"""
+    __tablename__ = "checkout_orders"
+    __table_args__ = (
+        db.Index("ix_checkout_orders_status_id", "status", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    cart_id = db.Column(db.Integer, db.ForeignKey('carts.id', ondelete='CASCADE'), nullable=False, index=True)
+    delivery_address_id = db.Column(db.Integer, db.ForeignKey('delivery_addresses.id'), nullable=False)
+    # [{"product_id": 1, "quantity": 2}, ...] as the cart was when the order was accepted
+    items = db.Column(db.JSON, nullable=False)
+    payment_method = db.Column(db.String(20), nullable=True)
+    payment_reference = db.Column(db.String(120), nullable=True)
+    generate_invoice = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    error = db.Column(db.Text, nullable=True)
+    # PostgreSQL: no real FKs to the partitioned sales/invoices tables, triggers enforce them (migration d2f8a4c61e07)
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id', ondelete='SET NULL'), nullable=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id', ondelete='SET NULL'), nullable=True)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+
+    # Relationships
+    sale = db.relationship('Sale', lazy=True)
+    invoice = db.relationship('Invoice', lazy=True)
+
+    def __repr__(self):
+        return f"<CheckoutOrder {self.id} - User: {self.user_id}, Status: {self.status}>"
@@ -4,8 +4,10 @@ from sqlalchemy import func
 class Invoice(db.Model):
     __tablename__ = "invoices"
 
+    # PostgreSQL: PRIMARY KEY (id, issue_date) and monthly partitions (migration d2f8a4c61e07)
     id = db.Column(db.Integer, primary_key=True)
-    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False, index=True)
+    # PostgreSQL: no real FK to the partitioned sales table, triggers enforce it (migration d2f8a4c61e07)
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id', ondelete='CASCADE'), nullable=False, index=True)
     delivery_address_id = db.Column(db.Integer, db.ForeignKey('delivery_addresses.id'), nullable=False, index=True)
     issue_date = db.Column(db.DateTime, nullable=False, server_default=func.now())
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
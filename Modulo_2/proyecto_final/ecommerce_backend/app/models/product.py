@@ -9,13 +9,16 @@ class Product(db.Model):
     description = db.Column(db.Text, nullable=True)
     price = db.Column(db.Numeric(10, 2), nullable=False, index=True)
     stock = db.Column(db.Integer, nullable=False, default=0)
+    # Hot products keep their stock in product_stock_shards; `stock` is then loaded as the shard sum
+    stock_sharded = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    cart_products = db.relationship('CartProduct', backref='product', lazy=True, cascade='all, delete-orphan')
-    sale_products = db.relationship('SaleProduct', backref='product', lazy=True, cascade='all, delete-orphan')
+    cart_products = db.relationship('CartProduct', backref='product', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    sale_products = db.relationship('SaleProduct', backref='product', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    stock_shards = db.relationship('ProductStockShard', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def update(self, data: dict):
         """Update product fields from dictionary"""
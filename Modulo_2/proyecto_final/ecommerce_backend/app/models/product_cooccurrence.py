@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class ProductCooccurrence(db.Model):
+    """How many sales contained both products (sparse, symmetric: one row per direction)"""
+    __tablename__ = "product_cooccurrences"
+    __table_args__ = (
+        db.Index("ix_product_cooccurrences_product_count", "product_id", "count"),
+    )
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    related_product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductCooccurrence {self.product_id} -> {self.related_product_id}: {self.count}>"
@@ -0,0 +1,34 @@
+from app.extensions import db
+from sqlalchemy import event, func, select
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.product import Product
+
+class ProductStockShard(db.Model):
+    """One of the N sub-counters holding the stock of a hot product (Product.stock_sharded)"""
+    __tablename__ = "product_stock_shards"
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True)
+    stock = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductStockShard {self.product_id}/{self.shard} - Stock: {self.stock}>"
+
+
+@event.listens_for(Product, "load")
+def _load_sharded_stock(product, context):
+    """Sharded products read `stock` as the sum of their shards (products.stock is only a snapshot)"""
+    if not product.stock_sharded:
+        return
+    session = context.session
+    with session.no_autoflush:
+        total = session.execute(
+            select(func.coalesce(func.sum(ProductStockShard.stock), 0)).where(ProductStockShard.product_id == product.id)
+        ).scalar()
+    set_committed_value(product, "stock", total)
+
+
+@event.listens_for(Product, "refresh")
+def _refresh_sharded_stock(product, context, attrs):
+    if attrs is None or "stock" in attrs:
+        _load_sharded_stock(product, context)
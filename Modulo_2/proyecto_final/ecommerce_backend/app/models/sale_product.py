@@ -5,8 +5,9 @@ class SaleProduct(db.Model):
     __tablename__ = "sale_products"
 
     # Composite Primary Key
-    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    # PostgreSQL: no real FK to the partitioned sales table, triggers enforce it (migration d2f8a4c61e07)
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id', ondelete='CASCADE'), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     price = db.Column(db.Numeric(10, 2), nullable=False)  # Price at time of sale
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
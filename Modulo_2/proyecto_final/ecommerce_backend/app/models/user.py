@@ -17,9 +17,9 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    delivery_addresses = db.relationship('DeliveryAddress', backref='user', lazy=True, cascade='all, delete-orphan')
-    carts = db.relationship('Cart', backref='user', lazy=True, cascade='all, delete-orphan')
-    sales = db.relationship('Sale', backref='user', lazy=True, cascade='all, delete-orphan')
+    delivery_addresses = db.relationship('DeliveryAddress', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    carts = db.relationship('Cart', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    sales = db.relationship('Sale', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def set_password(self, password):
         """Set password hash from plain text password"""
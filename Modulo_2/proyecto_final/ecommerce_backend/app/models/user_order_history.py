@@ -0,0 +1,15 @@
+from app.extensions import db
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import JSONB
+
+class UserOrderHistory(db.Model):
+    """Denormalized "My orders" document of one user, kept in sync on checkout and invoice changes"""
+    __tablename__ = "user_order_histories"
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    # [{"id": sale_id, "sale_date": ..., "total": "54.99", "items": [...], "invoices": [...]}, ...] newest first
+    orders = db.Column(db.JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=list)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserOrderHistory {self.user_id} - Orders: {len(self.orders or [])}>"
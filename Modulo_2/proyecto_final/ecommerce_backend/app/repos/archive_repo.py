@@ -0,0 +1,76 @@
+# app/repos/archive_repo.py
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.checkout_order import CheckoutOrder
+from app.models.invoice import Invoice
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.utils.exceptions import RepoError
+
+def _period_sale_ids(start: datetime, end: datetime):
+    """Ids of the sales with start <= sale_date < end (prunes to one partition on PostgreSQL)"""
+    return select(Sale.id).where(Sale.sale_date >= start, Sale.sale_date < end)
+
+def get_oldest_sale_date() -> Optional[datetime]:
+    return db.session.query(func.min(Sale.sale_date)).scalar()
+
+def get_period_sales(start: datetime, end: datetime) -> List[Tuple[int, int, datetime, Decimal]]:
+    """(id, user_id, sale_date, total) of the period's sales, in id order"""
+    return db.session.execute(
+        select(Sale.id, Sale.user_id, Sale.sale_date, Sale.total)
+        .where(Sale.sale_date >= start, Sale.sale_date < end)
+        .order_by(Sale.id)
+    ).all()
+
+def get_period_sale_products(start: datetime, end: datetime) -> List[Tuple[int, int, int, Decimal]]:
+    """(sale_id, product_id, quantity, price) of the period's sales"""
+    return db.session.execute(
+        select(SaleProduct.sale_id, SaleProduct.product_id, SaleProduct.quantity, SaleProduct.price)
+        .join(Sale, Sale.id == SaleProduct.sale_id)
+        .where(Sale.sale_date >= start, Sale.sale_date < end)
+        .order_by(SaleProduct.sale_id, SaleProduct.product_id)
+    ).all()
+
+def get_period_invoices(start: datetime, end: datetime) -> List[Tuple[int, int, int, datetime, Decimal, int]]:
+    """(id, sale_id, delivery_address_id, issue_date, sale total, sale user_id) of the period's sales' invoices"""
+    return db.session.execute(
+        select(Invoice.id, Invoice.sale_id, Invoice.delivery_address_id, Invoice.issue_date, Sale.total, Sale.user_id)
+        .join(Sale, Sale.id == Invoice.sale_id)
+        .where(Sale.sale_date >= start, Sale.sale_date < end)
+        .order_by(Invoice.id)
+    ).all()
+
+def delete_period(start: datetime, end: datetime, expected_sales: int) -> Dict[str, int]:
+    """
+    Remove the period's sales with their sale products and invoices in one
+    transaction. Children are deleted explicitly (and queued checkout orders
+    unlinked) so it does not depend on ON DELETE actions being enforced.
+    Rolls back when the period no longer holds exactly the archived sales.
+    """
+    sale_ids = _period_sale_ids(start, end)
+    try:
+        db.session.execute(
+            update(CheckoutOrder)
+            .where(CheckoutOrder.sale_id.in_(sale_ids))
+            .values(sale_id=None, invoice_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = {}
+        for table, statement in (
+            ("sale_products", delete(SaleProduct).where(SaleProduct.sale_id.in_(sale_ids))),
+            ("invoices", delete(Invoice).where(Invoice.sale_id.in_(sale_ids))),
+            ("sales", delete(Sale).where(Sale.sale_date >= start, Sale.sale_date < end)),
+        ):
+            deleted[table] = db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+        if deleted["sales"] != expected_sales:
+            db.session.rollback()
+            raise RepoError(f"Period changed while archiving: {deleted['sales']} sales to delete, {expected_sales} archived")
+        db.session.commit()
+        return deleted
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error deleting archived sales: {str(e)}")
@@ -0,0 +1,50 @@
+# app/repos/bulk_repo.py
+import csv
+import io
+from typing import Iterable, Sequence
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.utils.exceptions import RepoError
+
+def next_id(model) -> int:
+    """First free primary key value, so bulk loads can append to existing data"""
+    with db.engine.connect() as connection:
+        return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def bulk_insert(table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """
+    Insert plain tuples (values already rendered as str/int/None) as fast as the
+    driver allows: COPY ... FROM STDIN on PostgreSQL, a single executemany elsewhere.
+    Runs in its own transaction and returns the number of rows written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    column_list = ", ".join(columns)
+    try:
+        with db.engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor = connection.connection.cursor()
+                cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+                placeholders = ", ".join([placeholder] * len(columns))
+                connection.exec_driver_sql(f"INSERT INTO {table.name} ({column_list}) VALUES ({placeholders})", rows)
+        return len(rows)
+    except (SQLAlchemyError, db.engine.dialect.dbapi.Error) as e:
+        # COPY runs on the raw DBAPI cursor, so driver errors are not wrapped by SQLAlchemy
+        raise RepoError(str(e))
+
+def reset_sequence(table):
+    """Move a PostgreSQL serial sequence past explicitly inserted ids (no-op elsewhere)"""
+    if db.engine.dialect.name != "postgresql":
+        return
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
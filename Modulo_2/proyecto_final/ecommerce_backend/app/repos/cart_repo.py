@@ -1,6 +1,7 @@
 # app/repos/cart_repo.py
 from typing import Optional, List
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.models.cart import Cart
 from app.models.cart_product import CartProduct
@@ -23,6 +24,35 @@ def get_by_status(status: str) -> List[Cart]:
     """Get all carts by status"""
     return Cart.query.filter_by(status=status).order_by(Cart.created_at.desc()).all()
 
+def query_carts(user_id: int = None, status: str = None, start_date: datetime = None,
+                end_date: datetime = None, page: int = None, per_page: int = None) -> List[Cart]:
+    """
+    Get carts combining user, status and date filters with pagination in a single query.
+    Filters map onto the (user_id, status, created_at) index so per-user lookups never
+    scan other users' carts.
+    """
+    query = Cart.query.options(selectinload(Cart.cart_products))
+    
+    if user_id:
+        query = query.filter(Cart.user_id == user_id)
+    
+    if status:
+        query = query.filter(Cart.status == status)
+    
+    if start_date:
+        query = query.filter(Cart.created_at >= start_date)
+    
+    if end_date:
+        query = query.filter(Cart.created_at <= end_date)
+    
+    query = query.order_by(Cart.created_at.desc(), Cart.id.desc())
+    
+    if per_page:
+        page = max(page or 1, 1)
+        query = query.limit(per_page).offset((page - 1) * per_page)
+    
+    return query.all()
+
 def create_cart(user_id: int, status: str = "active") -> Cart:
     """Create a new cart"""
     try:
@@ -66,6 +96,10 @@ def delete_cart(cart_id: int) -> Optional[Cart]:
         db.session.rollback()
         raise RepoError(f"Error deleting cart: {str(e)}")
 
+def _touch_cart(cart_id: int):
+    """Content changes count as cart activity for the stale cart sweeper (it reads Cart.updated_at)"""
+    Cart.query.filter_by(id=cart_id).update({"updated_at": datetime.now()}, synchronize_session=False)
+
 def add_product_to_cart(cart_id: int, product_id: int, quantity: int = 1) -> Optional[CartProduct]:
     """Add a product to cart or update quantity if exists"""
     try:
@@ -88,6 +122,7 @@ def add_product_to_cart(cart_id: int, product_id: int, quantity: int = 1) -> Opt
             )
             db.session.add(cart_product)
         
+        _touch_cart(cart_id)
         db.session.commit()
         return cart_product
     except SQLAlchemyError as e:
@@ -107,6 +142,7 @@ def update_product_quantity(cart_id: int, product_id: int, quantity: int) -> Opt
         
         cart_product.quantity = quantity
         cart_product.updated_at = datetime.now()
+        _touch_cart(cart_id)
         db.session.commit()
         return cart_product
     except SQLAlchemyError as e:
@@ -125,6 +161,7 @@ def remove_product_from_cart(cart_id: int, product_id: int) -> Optional[CartProd
             return None
         
         db.session.delete(cart_product)
+        _touch_cart(cart_id)
         db.session.commit()
         return cart_product
     except SQLAlchemyError as e:
@@ -139,8 +176,57 @@ def clear_cart(cart_id: int) -> bool:
     """Remove all products from cart"""
     try:
         CartProduct.query.filter_by(cart_id=cart_id).delete()
+        _touch_cart(cart_id)
         db.session.commit()
         return True
     except SQLAlchemyError as e:
         db.session.rollback()
         raise RepoError(f"Error clearing cart: {str(e)}")
+
+def mark_stale_carts(from_status: str, to_status: str, older_than: datetime, batch_size: int = 1000) -> int:
+    """
+    Move one bounded batch of carts idle since `older_than` from one status to another.
+    Runs as a single set-based UPDATE ... WHERE id IN (SELECT ... LIMIT n) on the
+    (status, updated_at) index and returns the number of carts updated.
+    """
+    try:
+        stale_ids = (
+            db.select(Cart.id)
+            .where(Cart.status == from_status, Cart.updated_at < older_than)
+            .limit(batch_size)
+        )
+        result = db.session.execute(
+            db.update(Cart)
+            .where(Cart.id.in_(stale_ids))
+            .values(status=to_status, updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error marking stale carts: {str(e)}")
+
+def purge_cart_products(statuses: List[str], older_than: datetime, batch_size: int = 1000) -> int:
+    """
+    Delete the products of one bounded batch of carts in the given statuses idle since
+    `older_than`. Returns the number of cart_products rows deleted.
+    """
+    try:
+        cart_ids = (
+            db.select(CartProduct.cart_id)
+            .join(Cart, Cart.id == CartProduct.cart_id)
+            .where(Cart.status.in_(statuses), Cart.updated_at < older_than)
+            .distinct()
+            .limit(batch_size)
+        )
+        result = db.session.execute(
+            db.delete(CartProduct)
+            .where(CartProduct.cart_id.in_(cart_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error purging cart products: {str(e)}")
@@ -0,0 +1,84 @@
+# app/repos/checkout_order_repo.py
+from typing import Optional, List
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.checkout_order import CheckoutOrder
+from app.models.cart import Cart
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.invoice import Invoice
+from app.utils.exceptions import RepoError
+
+def get_by_id(order_id: int) -> Optional[CheckoutOrder]:
+    return db.session.get(CheckoutOrder, order_id)
+
+def get_queued_for_cart(cart_id: int) -> Optional[CheckoutOrder]:
+    """Order already waiting for this cart (a second checkout of the same cart reuses it)"""
+    return CheckoutOrder.query.filter_by(cart_id=cart_id, status="queued").first()
+
+def create_order(**data) -> CheckoutOrder:
+    try:
+        order = CheckoutOrder(**data)
+        db.session.add(order)
+        db.session.commit()
+        return order
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error queueing checkout: {str(e)}")
+
+def claim_queued(limit: int, order_id: int = None) -> List[CheckoutOrder]:
+    """
+    Oldest queued orders, row-locked until the caller commits. SKIP LOCKED lets
+    several workers drain the queue without waiting on each other (PostgreSQL;
+    SQLite has no row locks and runs a single writer anyway).
+    """
+    query = CheckoutOrder.query.filter_by(status="queued")
+    if order_id is not None:
+        query = query.filter_by(id=order_id)
+    return query.order_by(CheckoutOrder.id).limit(limit).with_for_update(skip_locked=True).all()
+
+def lock_products(product_ids: List[int]) -> List[Product]:
+    """Lock the batch's product rows in id order, so concurrent workers cannot deadlock"""
+    if not product_ids:
+        return []
+    return Product.query.filter(Product.id.in_(product_ids)).order_by(Product.id).with_for_update().all()
+
+def lock_carts(cart_ids: List[int]) -> List[Cart]:
+    if not cart_ids:
+        return []
+    return Cart.query.filter(Cart.id.in_(cart_ids)).order_by(Cart.id).with_for_update().all()
+
+def commit_batch():
+    """Commit every sale, stock change and order status of a batch in one transaction"""
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error committing checkout batch: {str(e)}")
+
+def rollback():
+    db.session.rollback()
+
+def mark_failed(order_id: int, error: str, processed_at) -> None:
+    try:
+        CheckoutOrder.query.filter_by(id=order_id, status="queued").update(
+            {"status": "failed", "error": error, "processed_at": processed_at}, synchronize_session=False
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error failing checkout order: {str(e)}")
+
+def stage_sale(user_id: int, items: List[dict], total) -> Sale:
+    """Add a sale with its products to the batch transaction (flushed/committed by commit_batch)"""
+    sale = Sale(user_id=user_id, total=total)
+    for item in items:
+        sale.sale_products.append(SaleProduct(product_id=item["product_id"], quantity=item["quantity"], price=item["price"]))
+    db.session.add(sale)
+    return sale
+
+def stage_invoice(sale: Sale, delivery_address_id: int) -> Invoice:
+    invoice = Invoice(sale=sale, delivery_address_id=delivery_address_id)
+    db.session.add(invoice)
+    return invoice
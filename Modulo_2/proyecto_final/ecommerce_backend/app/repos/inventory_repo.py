@@ -0,0 +1,66 @@
+# app/repos/inventory_repo.py
+from typing import Optional, List
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.product import Product
+from app.models.product_stock_shard import ProductStockShard
+from app.utils.exceptions import RepoError
+
+def is_sharded(product_id: int) -> Optional[bool]:
+    """Product.stock_sharded without loading the product (None if it does not exist)"""
+    return db.session.query(Product.stock_sharded).filter(Product.id == product_id).scalar()
+
+def get_sharded_product_ids() -> List[int]:
+    return [row[0] for row in db.session.query(Product.id).filter(Product.stock_sharded.is_(True)).order_by(Product.id)]
+
+def decrement_product_stock(product_id: int, quantity: int) -> bool:
+    """UPDATE products SET stock = stock - quantity WHERE stock >= quantity; False if there was not enough"""
+    updated = Product.query.filter(Product.id == product_id, Product.stock >= quantity).update(
+        {"stock": Product.stock - quantity}, synchronize_session=False
+    )
+    return updated == 1
+
+def get_shards_with_stock(product_id: int, quantity: int) -> List[int]:
+    """Shards that can cover quantity on their own (unlocked read, the decrement re-checks)"""
+    return [row[0] for row in db.session.query(ProductStockShard.shard).filter(
+        ProductStockShard.product_id == product_id, ProductStockShard.stock >= quantity
+    )]
+
+def decrement_shard(product_id: int, shard: int, quantity: int) -> bool:
+    updated = ProductStockShard.query.filter(
+        ProductStockShard.product_id == product_id,
+        ProductStockShard.shard == shard,
+        ProductStockShard.stock >= quantity
+    ).update({"stock": ProductStockShard.stock - quantity}, synchronize_session=False)
+    return updated == 1
+
+def lock_shards(product_id: int) -> List[ProductStockShard]:
+    """All shards of a product, locked in shard order so concurrent lockers cannot deadlock"""
+    return ProductStockShard.query.filter_by(product_id=product_id).order_by(ProductStockShard.shard).with_for_update().all()
+
+def lock_product(product_id: int) -> Optional[Product]:
+    return Product.query.filter_by(id=product_id).with_for_update().first()
+
+def apply_shards(product_id: int, shards: List[ProductStockShard], stocks: List[int]) -> None:
+    """Resize the product's locked shards to len(stocks) and give them those stock values"""
+    for shard in shards[len(stocks):]:
+        db.session.delete(shard)
+    for shard, stock in zip(shards, stocks):
+        shard.stock = stock
+    next_shard = shards[-1].shard + 1 if shards else 0
+    for offset, stock in enumerate(stocks[len(shards):]):
+        db.session.add(ProductStockShard(product_id=product_id, shard=next_shard + offset, stock=stock))
+
+def set_product_stock(product_id: int, stock: int, sharded: bool) -> None:
+    """Write products.stock (the shard sum snapshot for sharded products) and the sharding flag"""
+    Product.query.filter_by(id=product_id).update({"stock": stock, "stock_sharded": sharded}, synchronize_session=False)
+
+def commit():
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error updating inventory: {str(e)}")
+
+def rollback():
+    db.session.rollback()
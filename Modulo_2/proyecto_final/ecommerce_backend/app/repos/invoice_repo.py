@@ -2,27 +2,40 @@
 from typing import Optional, List
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
-from app.extensions import db
+from app.extensions import db, read_replica
 from app.models.invoice import Invoice
 from app.models.sale import Sale
 from app.models.sale_product import SaleProduct
 from app.models.product import Product
 from app.models.delivery_address import DeliveryAddress
+from app.utils.eager_loading import eager_options
 from app.utils.exceptions import RepoError
 from datetime import datetime
 
-def get_by_id(invoice_id: int) -> Optional[Invoice]:
-    """Get invoice by ID"""
-    return db.session.get(Invoice, invoice_id)
+def get_by_id(invoice_id: int, load=()) -> Optional[Invoice]:
+    """Get invoice by ID (load: relationship paths to load up front)"""
+    return db.session.get(Invoice, invoice_id, options=eager_options(Invoice, load))
 
-def get_by_sale_id(sale_id: int) -> List[Invoice]:
+def get_invoice_validator(invoice_id: int):
+    """Sale, delivery address and updated_at values that the invoice detail response depends on"""
+    return db.session.query(
+        Invoice.sale_id,
+        Invoice.delivery_address_id,
+        Invoice.updated_at,
+        DeliveryAddress.updated_at
+    ).outerjoin(DeliveryAddress, DeliveryAddress.id == Invoice.delivery_address_id).filter(Invoice.id == invoice_id).first()
+
+@read_replica
+def get_by_sale_id(sale_id: int, load=()) -> List[Invoice]:
     """Get all invoices for a sale"""
-    return Invoice.query.filter_by(sale_id=sale_id).order_by(Invoice.issue_date.desc()).all()
+    return Invoice.query.options(*eager_options(Invoice, load)).filter_by(sale_id=sale_id).order_by(Invoice.issue_date.desc()).all()
 
-def get_by_user_id(user_id: int) -> List[Invoice]:
+@read_replica
+def get_by_user_id(user_id: int, load=()) -> List[Invoice]:
     """Get all invoices for a user through sales relationship"""
-    return Invoice.query.join(Invoice.sale).filter_by(user_id=user_id).order_by(Invoice.issue_date.desc()).all()
+    return Invoice.query.options(*eager_options(Invoice, load)).join(Invoice.sale).filter_by(user_id=user_id).order_by(Invoice.issue_date.desc()).all()
 
+@read_replica
 def get_all() -> List[Invoice]:
     """Get all invoices"""
     return Invoice.query.order_by(Invoice.issue_date.desc()).all()
@@ -70,12 +83,20 @@ def delete_invoice(invoice_id: int) -> Optional[Invoice]:
         db.session.rollback()
         raise RepoError(f"Error deleting invoice: {str(e)}")
 
-def get_invoices_by_date_range(start_date: datetime = None, end_date: datetime = None, user_id: int = None) -> List[Invoice]:
-    """Get invoices filtered by date range and optionally by user"""
-    query = Invoice.query
+@read_replica
+def get_invoices_by_date_range(start_date: datetime = None, end_date: datetime = None, user_id: int = None,
+                               load=()) -> List[Invoice]:
+    """
+    Get invoices filtered by date range and optionally by user. The bounds are
+    plain comparisons on issue_date so PostgreSQL prunes the monthly partitions.
+    """
+    query = Invoice.query.options(*eager_options(Invoice, load))
     
     if user_id:
         query = query.join(Invoice.sale).filter_by(user_id=user_id)
+        if end_date:
+            # A sale always precedes its invoices: also prunes the sales partitions
+            query = query.filter(Sale.sale_date <= end_date)
     
     if start_date:
         query = query.filter(Invoice.issue_date >= start_date)
@@ -85,6 +106,7 @@ def get_invoices_by_date_range(start_date: datetime = None, end_date: datetime =
     
     return query.order_by(Invoice.issue_date.desc()).all()
 
+@read_replica
 def search_invoices_by_sale_total(min_total: float = None, max_total: float = None) -> List[Invoice]:
     """Search invoices by sale total amount"""
     query = Invoice.query.join(Invoice.sale)
@@ -97,6 +119,7 @@ def search_invoices_by_sale_total(min_total: float = None, max_total: float = No
     
     return query.order_by(Invoice.issue_date.desc()).all()
 
+@read_replica
 def get_invoice_with_full_details(invoice_id: int) -> Optional[Invoice]:
     """Get invoice with all related data (sale, products, delivery address)"""
     return Invoice.query.options(
@@ -0,0 +1,74 @@
+# app/repos/order_history_repo.py
+from typing import Dict, Iterable, Optional, List, Set
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db, read_replica
+from app.models.delivery_address import DeliveryAddress
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+from app.models.user_order_history import UserOrderHistory
+from app.utils.eager_loading import eager_options
+from app.utils.exceptions import RepoError
+
+# Everything an order history entry shows, loaded with one SELECT per level
+ORDER_LOAD = ("sale_products.product", "invoices.delivery_address")
+
+def get_by_user_id(user_id: int) -> Optional[UserOrderHistory]:
+    return db.session.get(UserOrderHistory, user_id)
+
+def lock(user_id: int) -> Optional[UserOrderHistory]:
+    """History row locked until commit, so concurrent updates of the same user apply one after the other"""
+    return UserOrderHistory.query.filter_by(user_id=user_id).with_for_update().first()
+
+def save(user_id: int, orders: List[dict], history: UserOrderHistory = None) -> UserOrderHistory:
+    try:
+        if history is None:
+            history = db.session.get(UserOrderHistory, user_id) or UserOrderHistory(user_id=user_id)
+            db.session.add(history)
+        history.orders = orders  # new list, so the JSON change is detected
+        db.session.commit()
+        return history
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error saving order history: {str(e)}")
+
+def rollback():
+    db.session.rollback()
+
+def delete(user_id: int) -> None:
+    try:
+        UserOrderHistory.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error deleting order history: {str(e)}")
+
+def get_user_sales(user_id: int) -> List[Sale]:
+    """The user's sales with products and invoices (primary: used right after writes)"""
+    return (Sale.query.options(*eager_options(Sale, ORDER_LOAD))
+            .filter_by(user_id=user_id).order_by(Sale.sale_date.desc(), Sale.id.desc()).all())
+
+def get_sale(sale_id: int) -> Optional[Sale]:
+    return db.session.get(Sale, sale_id, options=eager_options(Sale, ORDER_LOAD), populate_existing=True)
+
+def get_products(product_ids: Iterable[int]) -> Dict[int, Product]:
+    """Products of archived order items by id (deleted ones are missing)"""
+    return {product.id: product for product in Product.query.filter(Product.id.in_(list(product_ids)))}
+
+def get_delivery_addresses(address_ids: Iterable[int]) -> Dict[int, DeliveryAddress]:
+    return {address.id: address for address in DeliveryAddress.query.filter(DeliveryAddress.id.in_(list(address_ids)))}
+
+@read_replica
+def get_user_ids_with_sales(after_user_id: int = 0, limit: int = 500) -> List[int]:
+    """Next batch of user ids that have sales, in id order (keyset pagination)"""
+    return [row[0] for row in db.session.query(Sale.user_id).filter(Sale.user_id > after_user_id)
+            .group_by(Sale.user_id).order_by(Sale.user_id).limit(limit)]
+
+def get_existing_user_ids(user_ids: Iterable[int]) -> Set[int]:
+    """The ids among user_ids that still belong to a user (archived sales outlive deleted users)"""
+    return {row[0] for row in db.session.query(User.id).filter(User.id.in_(list(user_ids)))}
+
+@read_replica
+def get_history_user_ids(after_user_id: int = 0, limit: int = 500) -> List[int]:
+    return [row[0] for row in db.session.query(UserOrderHistory.user_id)
+            .filter(UserOrderHistory.user_id > after_user_id).order_by(UserOrderHistory.user_id).limit(limit)]
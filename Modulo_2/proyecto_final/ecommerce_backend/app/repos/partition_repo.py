@@ -0,0 +1,68 @@
+# app/repos/partition_repo.py
+from datetime import date
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.utils.exceptions import RepoError
+
+def is_postgresql() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+def is_partitioned(table: str) -> bool:
+    """True when table is a declaratively partitioned PostgreSQL table"""
+    if not is_postgresql():
+        return False
+    try:
+        return bool(db.session.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+        ).scalar())
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error reading partitioning of {table}: {str(e)}")
+
+def get_partitions(table: str) -> List[Dict]:
+    """Partitions of table with their bounds and estimated row counts, in name order"""
+    try:
+        rows = db.session.execute(text("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples::bigint
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:table)
+            ORDER BY child.relname
+        """), {"table": table}).all()
+        return [{"name": name, "bounds": bounds, "rows": max(rows, 0)} for name, bounds, rows in rows]
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error listing partitions of {table}: {str(e)}")
+
+def create_month_partition(table: str, column: str, name: str, start: date, end: date) -> None:
+    """
+    Create partition `name` for [start, end) and attach it. Rows of that range
+    that already landed in the DEFAULT partition are moved into it first
+    (ATTACH fails while the default partition holds any of them). The move is
+    a DELETE + INSERT, so it runs with app.moving_partition_rows set for the
+    transaction: the AFTER DELETE cascades that replace the foreign keys to
+    sales/invoices skip those rows, and moved sales keep their sale products,
+    invoices and checkout orders.
+    """
+    try:
+        db.session.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        db.session.execute(text("SET LOCAL app.moving_partition_rows = 'on'"))
+        db.session.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {table}_default
+                WHERE {column} >= :start AND {column} < :end
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), {"start": start, "end": end})
+        db.session.execute(text("SET LOCAL app.moving_partition_rows = 'off'"))
+        db.session.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error creating partition {name}: {str(e)}")
@@ -1,6 +1,8 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
-from app.extensions import db
+from app.extensions import db, read_replica
 from app.models.product import Product
 from app.utils.exceptions import RepoError
 
@@ -20,9 +22,23 @@ def get_by_id(product_id: int) -> Optional[Product]:
 def get_by_name(name: str) -> Optional[Product]:
     return Product.query.filter_by(name=name).first()
 
+@read_replica
+def get_by_ids(product_ids: List[int]) -> List[Product]:
+    """Products whose id is in product_ids (single IN query, unordered)"""
+    return Product.query.filter(Product.id.in_(product_ids)).all()
+
+@read_replica
 def get_all() -> List[Product]:
     return Product.query.all()
 
+@read_replica
+def get_list_validator() -> Tuple[Optional[datetime], int]:
+    """MAX(updated_at) and row count of the catalog, enough to tell whether the list changed"""
+    return tuple(db.session.query(func.max(Product.updated_at), func.count(Product.id)).one())
+
+def get_updated_at(product_id: int) -> Optional[datetime]:
+    return db.session.query(Product.updated_at).filter(Product.id == product_id).scalar()
+
 def update_product(product_id: int, data: dict) -> Optional[Product]:
     product = get_by_id(product_id)
     if not product:
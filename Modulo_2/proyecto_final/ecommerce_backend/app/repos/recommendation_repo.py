@@ -0,0 +1,79 @@
+# app/repos/recommendation_repo.py
+from collections import Counter
+from itertools import groupby
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db, read_replica
+from app.models.product_cooccurrence import ProductCooccurrence
+from app.models.sale_product import SaleProduct
+from app.utils.exceptions import RepoError
+
+def get_max_sale_id() -> int:
+    return db.session.query(func.max(SaleProduct.sale_id)).scalar() or 0
+
+def iter_sale_baskets(chunk_size: int = 50_000, after_sale_id: int = 0,
+                      up_to_sale_id: Optional[int] = None) -> Iterator[List[int]]:
+    """
+    Product ids of every sale with after_sale_id < sale_id <= up_to_sale_id, one
+    list per sale. sale_products is streamed in sale order chunk_size rows at a
+    time (server-side cursor on PostgreSQL), so the whole table is never held in memory.
+    """
+    query = select(SaleProduct.sale_id, SaleProduct.product_id).where(SaleProduct.sale_id > after_sale_id)
+    if up_to_sale_id is not None:
+        query = query.where(SaleProduct.sale_id <= up_to_sale_id)
+    rows = db.session.execute(query.order_by(SaleProduct.sale_id).execution_options(yield_per=chunk_size))
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        yield [product_id for _, product_id in group]
+
+def replace_all(counts: Dict[Tuple[int, int], int], chunk_size: int = 50_000,
+                late_counts: Callable[[], Dict[Tuple[int, int], int]] = None) -> int:
+    """
+    Swap the whole co-occurrence matrix in one transaction (readers keep the old
+    one until commit). increment_pairs is locked out until then (SQLite: the
+    write lock), and late_counts() is added inside the lock: the pairs of the
+    sales committed after `counts` was read, whose increments the swap wipes.
+    """
+    try:
+        if db.session.get_bind().dialect.name == "postgresql":
+            db.session.execute(text("LOCK TABLE product_cooccurrences IN SHARE ROW EXCLUSIVE MODE"))
+        db.session.execute(ProductCooccurrence.__table__.delete())
+        if late_counts:
+            counts = Counter(counts)
+            counts.update(late_counts())
+        rows = [{"product_id": a, "related_product_id": b, "count": count} for (a, b), count in sorted(counts.items())]
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(insert(ProductCooccurrence), rows[start:start + chunk_size])
+        db.session.commit()
+        return len(rows)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error rebuilding co-occurrence index: {str(e)}")
+
+def increment_pairs(counts: Dict[Tuple[int, int], int]) -> None:
+    """Add counts to (product_id, related_product_id) pairs with a single upsert, rows in key order"""
+    if not counts:
+        return
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ProductCooccurrence).values([
+        {"product_id": a, "related_product_id": b, "count": count} for (a, b), count in sorted(counts.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProductCooccurrence.product_id, ProductCooccurrence.related_product_id],
+        set_={"count": ProductCooccurrence.count + stmt.excluded["count"]}
+    )
+    try:
+        db.session.execute(stmt)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error updating co-occurrence index: {str(e)}")
+
+@read_replica
+def get_top_related(product_id: int, limit: int) -> List[Tuple[int, int]]:
+    """(related_product_id, count) pairs, most bought together first (index range scan)"""
+    return [tuple(row) for row in db.session.query(ProductCooccurrence.related_product_id, ProductCooccurrence.count)
+            .filter(ProductCooccurrence.product_id == product_id)
+            .order_by(ProductCooccurrence.count.desc(), ProductCooccurrence.related_product_id)
+            .limit(limit)]
@@ -1,24 +1,53 @@
 # app/repos/sale_repo.py
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from decimal import Decimal
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
-from app.extensions import db
+from app.extensions import db, read_replica
+from app.models.cart import Cart
 from app.models.sale import Sale
 from app.models.sale_product import SaleProduct
+from app.models.product import Product
+from app.models.invoice import Invoice
+from app.models.user import User
+from app.utils.eager_loading import eager_options
 from app.utils.exceptions import RepoError
 from datetime import datetime
 
-def get_by_id(sale_id: int) -> Optional[Sale]:
-    """Get sale by ID"""
-    return db.session.get(Sale, sale_id)
+def get_by_id(sale_id: int, load=()) -> Optional[Sale]:
+    """Get sale by ID (load: relationship paths to load up front)"""
+    return db.session.get(Sale, sale_id, options=eager_options(Sale, load))
 
-def get_by_user_id(user_id: int) -> List[Sale]:
+def get_sale_validator(sale_id: int):
+    """
+    Owner, total and the latest updated_at of everything the sale detail
+    response contains (sale, customer, items, products, invoices) in one query
+    """
+    query = db.session.query(
+        Sale.user_id,
+        Sale.total,
+        Sale.updated_at,
+        User.updated_at,
+        func.max(SaleProduct.updated_at),
+        func.max(Product.updated_at),
+        func.max(Invoice.updated_at),
+        func.count(func.distinct(Invoice.id))
+    ).join(User, User.id == Sale.user_id)
+    query = query.outerjoin(SaleProduct, SaleProduct.sale_id == Sale.id)
+    query = query.outerjoin(Product, Product.id == SaleProduct.product_id)
+    query = query.outerjoin(Invoice, Invoice.sale_id == Sale.id)
+    query = query.filter(Sale.id == sale_id)
+    return query.group_by(Sale.id, Sale.user_id, Sale.total, Sale.updated_at, User.updated_at).first()
+
+@read_replica
+def get_by_user_id(user_id: int, load=()) -> List[Sale]:
     """Get all sales for a user"""
-    return Sale.query.filter_by(user_id=user_id).order_by(Sale.sale_date.desc()).all()
+    return Sale.query.options(*eager_options(Sale, load)).filter_by(user_id=user_id).order_by(Sale.sale_date.desc()).all()
 
-def get_all() -> List[Sale]:
+@read_replica
+def get_all(load=()) -> List[Sale]:
     """Get all sales"""
-    return Sale.query.order_by(Sale.sale_date.desc()).all()
+    return Sale.query.options(*eager_options(Sale, load)).order_by(Sale.sale_date.desc()).all()
 
 def create_sale(user_id: int, total: Decimal) -> Sale:
     """Create a new sale"""
@@ -34,6 +63,25 @@ def create_sale(user_id: int, total: Decimal) -> Sale:
         db.session.rollback()
         raise RepoError(f"Error creating sale: {str(e)}")
 
+def create_sale_from_cart(user_id: int, total: Decimal, items: List[dict], cart_id: int) -> Sale:
+    """
+    Add the sale with its products and mark the cart converted in one commit,
+    together with the stock decrements already staged in the session.
+    """
+    try:
+        sale = Sale(user_id=user_id, total=total)
+        for item in items:
+            sale.sale_products.append(SaleProduct(product_id=item["product_id"], quantity=item["quantity"], price=item["price"]))
+        db.session.add(sale)
+        cart = db.session.get(Cart, cart_id)
+        cart.status = "converted"
+        cart.updated_at = datetime.now()
+        db.session.commit()
+        return sale
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise RepoError(f"Error creating sale: {str(e)}")
+
 def update_sale(sale_id: int, data: dict) -> Optional[Sale]:
     """Update sale information"""
     try:
@@ -117,13 +165,19 @@ def remove_product_from_sale(sale_id: int, product_id: int) -> Optional[SaleProd
         db.session.rollback()
         raise RepoError(f"Error removing product from sale: {str(e)}")
 
+@read_replica
 def get_sale_products(sale_id: int) -> List[SaleProduct]:
     """Get all products in a sale"""
     return SaleProduct.query.filter_by(sale_id=sale_id).all()
 
-def get_sales_by_date_range(user_id: int = None, start_date: datetime = None, end_date: datetime = None) -> List[Sale]:
-    """Get sales filtered by date range and optionally by user"""
-    query = Sale.query
+@read_replica
+def get_sales_by_date_range(user_id: int = None, start_date: datetime = None, end_date: datetime = None,
+                            load=()) -> List[Sale]:
+    """
+    Get sales filtered by date range and optionally by user. The bounds are
+    plain comparisons on sale_date so PostgreSQL prunes the monthly partitions.
+    """
+    query = Sale.query.options(*eager_options(Sale, load))
     
     if user_id:
         query = query.filter_by(user_id=user_id)
@@ -136,6 +190,19 @@ def get_sales_by_date_range(user_id: int = None, start_date: datetime = None, en
     
     return query.order_by(Sale.sale_date.desc()).all()
 
+@read_replica
+def get_product_sales_totals(start_date: datetime, end_date: datetime) -> List[Tuple[int, int, Decimal]]:
+    """(product_id, units sold, revenue) for sales with start_date <= sale_date < end_date"""
+    return db.session.query(
+        SaleProduct.product_id,
+        func.sum(SaleProduct.quantity),
+        func.sum(SaleProduct.quantity * SaleProduct.price)
+    ).join(Sale, Sale.id == SaleProduct.sale_id).filter(
+        Sale.sale_date >= start_date,
+        Sale.sale_date < end_date
+    ).group_by(SaleProduct.product_id).all()
+
+@read_replica
 def get_total_sales_amount(user_id: int = None) -> Decimal:
     """Get total sales amount, optionally filtered by user"""
     query = db.session.query(db.func.sum(Sale.total))
@@ -0,0 +1,13 @@
+from marshmallow import Schema, fields
+
+class CheckoutOrderReadSchema(Schema):
+    id = fields.Int(dump_only=True)
+    status = fields.Str(dump_only=True)
+    cart_id = fields.Int(dump_only=True)
+    delivery_address_id = fields.Int(dump_only=True)
+    items = fields.List(fields.Dict(), dump_only=True)
+    error = fields.Str(dump_only=True, allow_none=True)
+    sale_id = fields.Int(dump_only=True, allow_none=True)
+    invoice_id = fields.Int(dump_only=True, allow_none=True)
+    created_at = fields.DateTime(dump_only=True)
+    processed_at = fields.DateTime(dump_only=True, allow_none=True)
@@ -0,0 +1,81 @@
+# app/schemas/fast.py
+"""
+Precompiled dump path for hot read-only schemas.
+
+`compile_schema` reads a schema's dump fields once and generates a plain
+Python function that builds the output dict with direct attribute access,
+skipping marshmallow's per-field serialize/get_value machinery. The output
+is the same as `schema.dump(obj)` for model objects: Int, Str/Email,
+Decimal, DateTime (ISO format), Method and Nested fields are inlined; any
+other field type goes through its own `serialize` call.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from marshmallow import Schema, fields, missing
+
+_ISO_FORMATS = (None, "iso", "iso8601")
+
+def _decimal_formatter(field):
+    places, rounding = field.places, field.rounding
+    if places is None:
+        return lambda value: Decimal(str(value))
+    def format_decimal(value):
+        num = Decimal(str(value))
+        return num.quantize(places, rounding=rounding) if num.is_finite() else num
+    return format_decimal
+
+def _nested_dumper(field):
+    dump_one = compile_schema(field.schema)
+    if field.many or field.schema.many:
+        return lambda value: [dump_one(item) for item in value]
+    return dump_one
+
+def compile_schema(schema):
+    """Return a function equivalent to `schema.dump(obj)` for a single object"""
+    if isinstance(schema, type):
+        schema = schema()
+    env = {"missing": missing}
+    body = ["def dump(obj):", "    out = {}"]
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key or name
+        attr = field.attribute or name
+        getter = f"obj.{attr}" if attr.isidentifier() else f"getattr(obj, {attr!r})"
+        field_type = type(field)
+        if field_type is fields.Method and field._serialize_method is not None:
+            env[f"method_{i}"] = field._serialize_method
+            body.append(f"    out[{key!r}] = method_{i}(obj)")
+            continue
+        if field_type is fields.Integer and not field.as_string:
+            expr = "int(value)"
+        elif field_type in (fields.String, fields.Email):
+            expr = "value if type(value) is str else str(value)"
+        elif field_type is fields.Decimal and not field.as_string and not field.allow_nan:
+            env[f"decimal_{i}"] = _decimal_formatter(field)
+            expr = f"decimal_{i}(value)"
+        elif field_type is fields.DateTime and field.format in _ISO_FORMATS:
+            expr = "value.isoformat()"
+        elif field_type is fields.Nested:
+            env[f"nested_{i}"] = _nested_dumper(field)
+            expr = f"nested_{i}(value)"
+        else:
+            env[f"field_{i}"] = field
+            body += [f"    value = field_{i}.serialize({name!r}, obj)",
+                     f"    if value is not missing:",
+                     f"        out[{key!r}] = value"]
+            continue
+        body += [f"    value = {getter}",
+                 f"    out[{key!r}] = None if value is None else {expr}"]
+    body.append("    return out")
+    exec("\n".join(body), env)
+    return env["dump"]
+
+@lru_cache(maxsize=256)  # one entry per (schema, sparse fieldset) combination in use
+def _cached_dumper(schema_cls, only=None):
+    return compile_schema(schema_cls(only=only) if only else schema_cls)
+
+def fast_dump(schema_cls: type[Schema], obj, many: bool = False, only=None):
+    """Drop-in for `schema_cls(only=only).dump(obj, many=many)` using the compiled dumper"""
+    dump_one = _cached_dumper(schema_cls, tuple(only) if only else None)
+    if many:
+        return [dump_one(item) for item in obj]
+    return dump_one(obj)
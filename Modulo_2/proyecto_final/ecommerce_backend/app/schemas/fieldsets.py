@@ -0,0 +1,83 @@
+# app/schemas/fieldsets.py
+"""
+Sparse fieldsets for read endpoints (?fields= and ?include=).
+
+- fields=id,total,user.name: return only these fields (dotted names select inside nested objects)
+- include=sale_products,invoices: return the plain fields plus only these nested relationships
+
+Without either parameter the response is unchanged. The selected fields decide both
+the marshmallow `only=` and the loader options: every relationship the response
+reads (nested fields, plus the ones Method fields use, declared in the schema's
+RELATIONSHIPS) is passed down to the repos as `load=fieldset.paths` and loaded up
+front (app/utils/eager_loading.py); relationships that were not requested are
+neither queried nor serialized.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+from flask import request
+from marshmallow import Schema, fields
+from app.utils.exceptions import BadRequestError
+
+MAX_FIELDS = 50
+
+@dataclass(frozen=True)
+class Fieldset:
+    only: Optional[Tuple[str, ...]]  # None = every field
+    paths: Tuple[str, ...]  # relationship paths the response reads, e.g. "sale.user"
+
+def _split(value: Optional[str]) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+def _validate(schema: Schema, name: str, param: str):
+    top, _, rest = name.partition(".")
+    field = schema.fields.get(top)
+    if field is None or field.load_only:
+        raise BadRequestError(f"Unknown field in {param}: {name}")
+    if rest:
+        if not isinstance(field, fields.Nested):
+            raise BadRequestError(f"Field in {param} has no subfields: {name}")
+        _validate(field.schema, rest, param)
+
+def _relationship_paths(schema: Schema, names: Iterable[str]):
+    """Relationship paths read when dumping `names` (dotted names only read their subtree)"""
+    declared = getattr(schema, "RELATIONSHIPS", {})
+    for name in names:
+        top, _, rest = name.partition(".")
+        yield from declared.get(top, ())
+        field = schema.fields[top]
+        if isinstance(field, fields.Nested):
+            # Nested fields are named after the relationship they serialize
+            yield top
+            nested = field.schema
+            for path in _relationship_paths(nested, [rest] if rest else list(nested.dump_fields)):
+                yield f"{top}.{path}"
+
+def sparse_fieldset(schema_cls: type) -> Fieldset:
+    """
+    Fieldset requested by the current request's ?fields= / ?include= for schema_cls.
+    Raises BadRequestError (400) on unknown fields.
+    """
+    requested = _split(request.args.get("fields"))
+    included = _split(request.args.get("include"))
+    if len(requested) + len(included) > MAX_FIELDS:
+        raise BadRequestError(f"At most {MAX_FIELDS} fields can be requested")
+    schema = schema_cls()
+    for name in requested:
+        _validate(schema, name, "fields")
+    for name in included:
+        _validate(schema, name, "include")
+        if not isinstance(schema.fields[name.partition(".")[0]], fields.Nested):
+            raise BadRequestError(f"Field in include is not a relationship: {name}")
+    
+    if not requested and not included:
+        only = None
+        names = list(schema.dump_fields)
+    else:
+        if not requested:
+            # include= alone: plain fields plus the listed relationships
+            requested = [name for name, field in schema.dump_fields.items() if not isinstance(field, fields.Nested)]
+        names = requested + [name for name in included if name not in requested]
+        # A whole relationship ("user") wins over its subfields ("user.name")
+        names = [name for name in names if "." not in name or name.split(".")[0] not in names]
+        only = tuple(sorted(set(names)))
+    return Fieldset(only=only, paths=tuple(sorted(set(_relationship_paths(schema, names)))))
@@ -8,6 +8,9 @@ class InvoiceCreateSchema(Schema):
     delivery_address_id = fields.Int(required=True)
 
 class InvoiceReadSchema(Schema):
+    # Relationships read by Method fields (see app/schemas/fieldsets.py)
+    RELATIONSHIPS = {"total_amount": ("sale",)}
+    
     id = fields.Int(dump_only=True)
     sale_id = fields.Int()
     delivery_address_id = fields.Int()
@@ -33,6 +36,9 @@ class InvoiceUpdateSchema(Schema):
     delivery_address_id = fields.Int(required=False)
 
 class InvoiceListSchema(Schema):
+    # Relationships read by Method fields (see app/schemas/fieldsets.py)
+    RELATIONSHIPS = {"customer_name": ("sale.user",)}
+    
     id = fields.Int(dump_only=True)
     sale_id = fields.Int()
     delivery_address_id = fields.Int()
@@ -0,0 +1,27 @@
+from marshmallow import Schema, fields
+
+# Dumped once into user_order_histories.orders (JSON), so decimals are stored as strings
+
+class OrderHistoryItemSchema(Schema):
+    product_id = fields.Int()
+    name = fields.Function(lambda sale_product: sale_product.product.name if sale_product.product else None)
+    quantity = fields.Int()
+    price = fields.Decimal(places=2, as_string=True)
+    subtotal = fields.Function(lambda sale_product: str(sale_product.price * sale_product.quantity))
+
+class OrderHistoryInvoiceSchema(Schema):
+    id = fields.Int()
+    invoice_number = fields.Function(lambda invoice: f"INV-{invoice.id:06d}")
+    issue_date = fields.DateTime()
+    delivery_address = fields.Nested("DeliveryAddressReadSchema", only=("id", "address", "city", "postal_code", "country"))
+
+class OrderHistoryOrderSchema(Schema):
+    id = fields.Int()
+    sale_date = fields.DateTime()
+    total = fields.Decimal(places=2, as_string=True)
+    total_items = fields.Function(lambda sale: sum(sp.quantity for sp in sale.sale_products))
+    # Sorted, so documents compare equal however the rows were loaded (live or archived)
+    items = fields.Function(lambda sale: OrderHistoryItemSchema(many=True).dump(
+        sorted(sale.sale_products, key=lambda sale_product: sale_product.product_id)))
+    invoices = fields.Function(lambda sale: OrderHistoryInvoiceSchema(many=True).dump(
+        sorted(sale.invoices, key=lambda invoice: invoice.id)))
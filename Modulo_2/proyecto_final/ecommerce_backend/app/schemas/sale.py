@@ -6,6 +6,9 @@ class SaleCreateSchema(Schema):
     total = fields.Decimal(required=True, validate=validate.Range(min=0), places=2)
 
 class SaleReadSchema(Schema):
+    # Relationships read by Method fields (see app/schemas/fieldsets.py)
+    RELATIONSHIPS = {"product_count": ("sale_products",), "total_items": ("sale_products",)}
+    
     id = fields.Int(dump_only=True)
     user_id = fields.Int()
     sale_date = fields.DateTime(dump_only=True)
@@ -34,6 +37,13 @@ class SaleUpdateSchema(Schema):
     total = fields.Decimal(required=False, validate=validate.Range(min=0), places=2)
 
 class SaleListSchema(Schema):
+    # Relationships read by Method fields (see app/schemas/fieldsets.py)
+    RELATIONSHIPS = {
+        "product_count": ("sale_products",),
+        "total_items": ("sale_products",),
+        "has_invoice": ("invoices",)
+    }
+    
     id = fields.Int(dump_only=True)
     user_id = fields.Int()
     sale_date = fields.DateTime(dump_only=True)
@@ -7,6 +7,9 @@ class SaleProductCreateSchema(Schema):
     price = fields.Decimal(required=True, validate=validate.Range(min=0), places=2)
 
 class SaleProductReadSchema(Schema):
+    # Relationships read by Method fields (see app/schemas/fieldsets.py)
+    RELATIONSHIPS = {"price_difference": ("product",)}
+    
     sale_id = fields.Int()
     product_id = fields.Int()
     quantity = fields.Int()
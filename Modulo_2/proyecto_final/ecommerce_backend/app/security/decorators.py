@@ -1,9 +1,10 @@
 # app/security/decorators.py
 from functools import wraps
 from typing import Callable, Iterable, Any
-from flask import jsonify
+from flask import jsonify, request, current_app, make_response
 from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity, verify_jwt_in_request
-from app.utils.exceptions import json_error
+from app.security.rate_limit import take_token
+from app.utils.exceptions import json_error, ForbiddenError, CartNotFoundError
 
 def roles_required(*allowed_roles: str):
     """
@@ -24,6 +25,52 @@ def roles_required(*allowed_roles: str):
         return decorated
     return wrapper
 
+def rate_limit(limit: int, period: int, scope: str = None, when: Callable[[], bool] = None):
+    """
+    Token-bucket rate limit per route and client (JWT identity, else remote IP).
+    Allows bursts of `limit` requests, refilled evenly over `period` seconds.
+    Responses carry RateLimit-Limit/Remaining/Reset and RateLimit-Policy headers;
+    an empty bucket returns 429 with Retry-After.
+    Usage:
+        @bp.post("/login")
+        @rate_limit(5, 60)
+        def login(): ...
+    `when` restricts the limit to matching requests (e.g. only ?analytics=true).
+    Disabled with RATELIMIT_ENABLED=False; RATELIMIT_STORAGE picks "redis", "memory" or "auto".
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated(*args, **kwargs):
+            config = current_app.config
+            if not config.get("RATELIMIT_ENABLED", True) or (when is not None and not when()):
+                return fn(*args, **kwargs)
+            
+            try:
+                identity = get_jwt_identity()
+            except Exception:
+                identity = None  # no JWT in this request (e.g. login)
+            client = f"user:{identity}" if identity else f"ip:{request.remote_addr}"
+            key = f"{scope or request.endpoint}.{client}"
+            try:
+                result = take_token(key, limit, period, config.get("RATELIMIT_STORAGE", "auto"))
+            except Exception as e:
+                # Follow repo's error handling pattern: a limiter outage must not take the API down
+                print(f"Rate limit error in {fn.__name__}: {e}")
+                return fn(*args, **kwargs)
+            
+            if result.allowed:
+                response = make_response(fn(*args, **kwargs))
+            else:
+                response = make_response(json_error("Too many requests, please retry later", 429))
+                response.headers["Retry-After"] = str(result.retry_after)
+            response.headers["RateLimit-Limit"] = str(result.limit)
+            response.headers["RateLimit-Remaining"] = str(result.remaining)
+            response.headers["RateLimit-Reset"] = str(result.reset)
+            response.headers["RateLimit-Policy"] = f"{limit};w={period}"
+            return response
+        return decorated
+    return wrapper
+
 def optional_roles(allowed_roles: Iterable[str]):
     """
     Decorator that allows optional JWT authentication with role validation.
@@ -185,21 +232,19 @@ def cart_owner_required(cart_id_param: str = "cart_id"):
                 return json_error(f"Missing required parameter: {cart_id_param}", 400)
             
             try:
-                # Use cart_service validation which already checks ownership
+                # Use cart_service validation which already checks ownership; the cart is
+                # registered in the request identity map, so services reuse this instance
                 cart = cart_service.get_cart_by_id(cart_id, current_user_id)
-                g.cart = cart
-                g.is_cart_owner = True
-                return fn(*args, **kwargs)
-                
-            except Exception as e:
-                # Cart service will raise ForbiddenError if not owner, CartNotFoundError if not found
-                error_msg = str(e)
-                if "Access denied" in error_msg or "belongs to another user" in error_msg:
-                    return json_error("You don't have permission to access this cart", 403)
-                elif "not found" in error_msg.lower():
-                    return json_error("Cart not found", 404)
-                else:
-                    return json_error("Error accessing cart", 400)
+            except ForbiddenError:
+                return json_error("You don't have permission to access this cart", 403)
+            except CartNotFoundError:
+                return json_error("Cart not found", 404)
+            except Exception:
+                return json_error("Error accessing cart", 400)
+            
+            g.cart = cart
+            g.is_cart_owner = True
+            return fn(*args, **kwargs)
             
         return decorated
     return wrapper
@@ -292,73 +337,6 @@ def resource_access_required(resource_service, resource_id_param: str, ownership
         return decorated
     return wrapper
 
-def cart_owner_required(cart_id_param: str = "cart_id"):
-    """
-    Decorator that ensures the current user owns the specified cart.
-    This decorator validates cart ownership by checking that the cart belongs to the current user.
-    
-    Args:
-        cart_id_param: Name of the URL parameter that contains the cart_id
-    
-    Usage:
-        @jwt_required()
-        @cart_owner_required()
-        def update_cart_status(cart_id): ...
-        
-        @jwt_required()
-        @cart_owner_required("cart_identifier")
-        def get_cart(cart_identifier): ...
-    """
-    def wrapper(fn):
-        @wraps(fn)
-        def decorated(*args, **kwargs):
-            from flask import g
-            from app.services import cart_service
-            
-            current_user_id = int(get_jwt_identity())
-            
-            # Get the cart_id from URL parameters
-            cart_id = kwargs.get(cart_id_param)
-            if cart_id is None:
-                return json_error(f"Missing required parameter: {cart_id_param}", 400)
-            
-            try:
-                # Use cart_service validation which already checks ownership
-                cart = cart_service.get_cart_by_id(cart_id, current_user_id)
-                g.cart = cart
-                g.is_cart_owner = True
-                return fn(*args, **kwargs)
-                
-            except Exception as e:
-                # Cart service will raise ForbiddenError if not owner, CartNotFoundError if not found
-                error_msg = str(e)
-                if "Access denied" in error_msg or "belongs to another user" in error_msg:
-                    return json_error("You don't have permission to access this cart", 403)
-                elif "not found" in error_msg.lower():
-                    return json_error("Cart not found", 404)
-                else:
-                    return json_error("Error accessing cart", 400)
-            
-        return decorated
-    return wrapper
-
-def customer_only(fn):
-    """
-    Decorator that ensures the current user has customer role.
-    This is useful for endpoints that should only be accessible to customers.
-    """
-    @wraps(fn)
-    @jwt_required()
-    def decorated(*args, **kwargs):
-        claims = get_jwt()
-        user_role = claims.get("role")
-        
-        if user_role != "customer":
-            return json_error("This endpoint is only accessible to customers", 403)
-            
-        return fn(*args, **kwargs)
-    return decorated
-
 def delivery_address_access_required(address_id_param: str = "delivery_address_id"):
     """
     Specialized decorator for delivery address access control.
@@ -427,70 +405,3 @@ def delivery_address_access_required(address_id_param: str = "delivery_address_i
             
         return decorated
     return wrapper
-
-def cart_owner_required(cart_id_param: str = "cart_id"):
-    """
-    Decorator that ensures the current user owns the specified cart.
-    This decorator validates cart ownership by checking that the cart belongs to the current user.
-    
-    Args:
-        cart_id_param: Name of the URL parameter that contains the cart_id
-    
-    Usage:
-        @jwt_required()
-        @cart_owner_required()
-        def update_cart_status(cart_id): ...
-        
-        @jwt_required()
-        @cart_owner_required("cart_identifier")
-        def get_cart(cart_identifier): ...
-    """
-    def wrapper(fn):
-        @wraps(fn)
-        def decorated(*args, **kwargs):
-            from flask import g
-            from app.services import cart_service
-            
-            current_user_id = int(get_jwt_identity())
-            
-            # Get the cart_id from URL parameters
-            cart_id = kwargs.get(cart_id_param)
-            if cart_id is None:
-                return json_error(f"Missing required parameter: {cart_id_param}", 400)
-            
-            try:
-                # Use cart_service validation which already checks ownership
-                cart = cart_service.get_cart_by_id(cart_id, current_user_id)
-                g.cart = cart
-                g.is_cart_owner = True
-                return fn(*args, **kwargs)
-                
-            except Exception as e:
-                # Cart service will raise ForbiddenError if not owner, CartNotFoundError if not found
-                error_msg = str(e)
-                if "Access denied" in error_msg or "belongs to another user" in error_msg:
-                    return json_error("You don't have permission to access this cart", 403)
-                elif "not found" in error_msg.lower():
-                    return json_error("Cart not found", 404)
-                else:
-                    return json_error("Error accessing cart", 400)
-            
-        return decorated
-    return wrapper
-
-def customer_only(fn):
-    """
-    Decorator that ensures the current user has customer role.
-    This is useful for endpoints that should only be accessible to customers.
-    """
-    @wraps(fn)
-    @jwt_required()
-    def decorated(*args, **kwargs):
-        claims = get_jwt()
-        user_role = claims.get("role")
-        
-        if user_role != "customer":
-            return json_error("This endpoint is only accessible to customers", 403)
-            
-        return fn(*args, **kwargs)
-    return decorated
@@ -0,0 +1,100 @@
+# app/security/rate_limit.py
+"""
+Token-bucket storage for the rate_limit decorator (app/security/decorators.py).
+
+A bucket holds up to `capacity` tokens and refills at `capacity / period` tokens
+per second; every request takes one token. On Redis the whole read-refill-take
+step is one Lua script, so concurrent workers never double-spend a token and each
+check is a single round trip. Without Redis (SimpleCache in tests, local runs)
+an in-process bucket with the same semantics is used.
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass
+from app.extensions import cache
+
+KEY_PREFIX = "ratelimit"
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the bucket is full again
+    retry_after: int  # seconds until the next token (0 when allowed)
+
+def _result(allowed: bool, tokens: float, capacity: int, rate: float) -> RateLimitResult:
+    return RateLimitResult(
+        allowed=allowed,
+        limit=capacity,
+        remaining=int(tokens),
+        reset=math.ceil((capacity - tokens) / rate),
+        retry_after=0 if allowed else max(1, math.ceil((1 - tokens) / rate))
+    )
+
+class MemoryTokenBuckets:
+    """Per-process token buckets, used when the cache backend is not Redis"""
+    
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def take(self, key: str, capacity: int, rate: float, now: float) -> RateLimitResult:
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+        return _result(allowed, tokens, capacity, rate)
+    
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+memory_buckets = MemoryTokenBuckets()
+_scripts = {}
+
+def _redis_take(redis_client, key: str, capacity: int, rate: float, now: float) -> RateLimitResult:
+    script = _scripts.get(id(redis_client))
+    if script is None:
+        script = _scripts[id(redis_client)] = redis_client.register_script(TOKEN_BUCKET_LUA)
+    allowed, tokens = script(keys=[key], args=[capacity, rate, now])
+    return _result(bool(allowed), float(tokens), capacity, rate)
+
+def take_token(key: str, capacity: int, period: float, storage: str = "auto") -> RateLimitResult:
+    """
+    Take one token from the bucket `key`.
+    
+    Args:
+        key: Bucket id (route + user or IP)
+        capacity: Burst size, also the number of requests allowed per `period`
+        period: Seconds to refill an empty bucket
+        storage: "redis", "memory" or "auto" (Redis when the cache backend is Redis)
+    """
+    rate = capacity / period
+    now = time.time()
+    backend = cache.cache
+    if storage != "memory" and hasattr(backend, "_write_client"):
+        return _redis_take(backend._write_client, f"{backend._get_prefix()}{KEY_PREFIX}.{key}", capacity, rate, now)
+    return memory_buckets.take(key, capacity, rate, now)
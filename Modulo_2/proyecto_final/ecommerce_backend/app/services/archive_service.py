@@ -0,0 +1,375 @@
+# app/services/archive_service.py
+"""
+Columnar cold-data archive for closed sales periods.
+
+Sales older than ARCHIVE_AFTER_MONTHS are never updated again, but analytics
+kept rescanning them. `flask archive run` moves each closed month of `sales`,
+`sale_products` and `invoices` out of the database into ARCHIVE_DIR/<YYYY-MM>/:
+one zlib-compressed file of little-endian int64 values per column (dates as
+epoch microseconds, money as cents) plus a manifest.json with the month's
+precomputed aggregates (sales per day). Per-customer totals are stored as
+columns as well.
+
+get_sales_analytics / get_invoices_analytics merge the archive with the live
+rows: months fully inside the requested range use the aggregates, months cut by
+the range scan only the columns they need. Archived rows are gone from the
+database, so nothing is counted twice. The order history read model gets the
+archived sales of a user back from get_archived_sales.
+
+A month is written to a temporary directory, renamed into place as "pending",
+deleted from the database, then marked "complete". Readers ignore pending
+months; the next run completes them (archived rows already deleted) or
+re-archives them (archived rows still there).
+"""
+import json
+import os
+import shutil
+import sys
+import zlib
+from array import array
+from calendar import timegm
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from flask import current_app
+import app.repos.archive_repo as archive_repo
+from app.services.partition_service import add_months, month_start
+from app.utils.exceptions import ArchiveError
+
+ARCHIVE_FORMAT = 1
+COMPRESSION_LEVEL = 6
+MANIFEST = "manifest.json"
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# archived table -> columns, every one stored as int64
+COLUMNS = {
+    "sales": ("id", "user_id", "sale_date", "total_cents"),
+    "sale_products": ("sale_id", "product_id", "quantity", "price_cents"),
+    "invoices": ("id", "sale_id", "delivery_address_id", "issue_date", "sale_total_cents", "sale_user_id"),
+    "customers": ("user_id", "sales_count", "total_cents"),
+}
+
+def archive_dir() -> str:
+    return os.path.abspath(current_app.config.get("ARCHIVE_DIR", "archive"))
+
+def period_key(month: date) -> str:
+    return f"{month.year}-{month.month:02d}"
+
+def to_micros(value: datetime) -> int:
+    return timegm(value.utctimetuple()) * 1_000_000 + value.microsecond
+
+def from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+def to_cents(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+def encode_column(values) -> bytes:
+    column = array("q", values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return zlib.compress(column.tobytes(), COMPRESSION_LEVEL)
+
+def decode_column(data: bytes) -> array:
+    column = array("q")
+    column.frombytes(zlib.decompress(data))
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+def _column_path(period_dir: str, table: str, column: str) -> str:
+    return os.path.join(period_dir, f"{table}.{column}.i8.z")
+
+def read_column(period_dir: str, table: str, column: str) -> array:
+    try:
+        with open(_column_path(period_dir, table, column), "rb") as f:
+            return decode_column(f.read())
+    except (OSError, zlib.error) as e:
+        raise ArchiveError(f"Error reading archived column {table}.{column} in {period_dir}: {e}")
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+@lru_cache(maxsize=1024)
+def _read_manifest(path: str, mtime_ns: int) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def _manifests(status: str = "complete") -> Iterator[Tuple[str, dict]]:
+    """(period directory, manifest) of the archived months with this status, oldest first"""
+    root = archive_dir()
+    if not os.path.isdir(root):
+        return
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name, MANIFEST)
+        try:
+            manifest = _read_manifest(path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            continue  # temporary or foreign directory
+        except (OSError, ValueError) as e:
+            raise ArchiveError(f"Error reading archive manifest {path}: {e}")
+        if manifest.get("status") == status:
+            yield os.path.join(root, name), manifest
+
+def list_periods() -> List[dict]:
+    """Manifests of every archived month (pending ones included), oldest first"""
+    return [manifest for status in ("complete", "pending") for _, manifest in _manifests(status)]
+
+def _bounds(manifest: dict) -> Tuple[datetime, datetime]:
+    return datetime.fromisoformat(manifest["start"]), datetime.fromisoformat(manifest["end"])
+
+def _overlaps(first: datetime, last: datetime, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+    """Does [first, last] intersect the inclusive analytics range [start_date, end_date]?"""
+    return (start_date is None or last >= start_date) and (end_date is None or first <= end_date)
+
+def _covers(first: datetime, last: datetime, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+    return (start_date is None or start_date <= first) and (end_date is None or last <= end_date)
+
+# === Archiver ===
+
+def _columns(rows, converters) -> List[list]:
+    """Row tuples -> one list per column, each value passed through its converter (if any)"""
+    return [[convert(row[i]) if convert else row[i] for row in rows] for i, convert in enumerate(converters)]
+
+def archive_period(month: date) -> Optional[Dict]:
+    """Move one month of sales, sale products and invoices to the archive; None when it has no sales"""
+    start = datetime(month.year, month.month, 1)
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    sales = archive_repo.get_period_sales(start, end)
+    if not sales:
+        return None
+    sale_products = archive_repo.get_period_sale_products(start, end)
+    invoices = archive_repo.get_period_invoices(start, end)
+    
+    sales_by_day, customers = {}, {}
+    for _, user_id, sale_date, total in sales:
+        cents = to_cents(total)
+        day = sales_by_day.setdefault(sale_date.date().isoformat(), [0, 0])
+        day[0] += 1
+        day[1] += cents
+        customer = customers.setdefault(user_id, [0, 0])
+        customer[0] += 1
+        customer[1] += cents
+    
+    columns = {
+        "sales": _columns(sales, (None, None, to_micros, to_cents)),
+        "sale_products": _columns(sale_products, (None, None, None, to_cents)),
+        "invoices": _columns(invoices, (None, None, None, to_micros, to_cents, None)),
+        "customers": [list(customers), [c[0] for c in customers.values()], [c[1] for c in customers.values()]],
+    }
+    issue_dates = [row[3] for row in invoices]
+    manifest = {
+        "format": ARCHIVE_FORMAT,
+        "period": period_key(month),
+        "status": "pending",
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+        "rows": {table: len(values[0]) for table, values in columns.items()},
+        "sales_by_day": sales_by_day,
+        "invoices": {
+            "first": min(issue_dates).isoformat() if issue_dates else None,
+            "last": max(issue_dates).isoformat() if issue_dates else None,
+        },
+    }
+    
+    period_dir = os.path.join(archive_dir(), manifest["period"])
+    tmp_dir = f"{period_dir}.tmp"
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        size = 0
+        for table, values in columns.items():
+            for column, column_values in zip(COLUMNS[table], values):
+                data = encode_column(column_values)
+                with open(_column_path(tmp_dir, table, column), "wb") as f:
+                    f.write(data)
+                size += len(data)
+        manifest["bytes"] = size
+        _write_json(os.path.join(tmp_dir, MANIFEST), manifest)
+        os.replace(tmp_dir, period_dir)
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise ArchiveError(f"Error writing archive of {manifest['period']}: {e}")
+    
+    try:
+        deleted = archive_repo.delete_period(start, end, len(sales))
+    except Exception:
+        shutil.rmtree(period_dir, ignore_errors=True)
+        raise
+    _mark_complete(period_dir, manifest)
+    return {"period": manifest["period"], "bytes": size, **deleted}
+
+def _mark_complete(period_dir: str, manifest: dict):
+    _write_json(os.path.join(period_dir, MANIFEST), {**manifest, "status": "complete"})
+
+def _recover_pending() -> List[str]:
+    """
+    Finish months interrupted after their files were written; returns the completed
+    ones. The delete is all-or-nothing, so the archived sales tell what happened:
+    all still in the database -> it never committed and the month is archived again;
+    none left -> the files are the only copy and the month is completed, whatever
+    sales were backdated into it since. Anything else is left for an operator.
+    Sales are compared as whole rows: SQLite reuses the ids of deleted rows.
+    """
+    completed = []
+    for period_dir, manifest in list(_manifests("pending")):
+        start, end = _bounds(manifest)
+        archived = set(zip(*(read_column(period_dir, "sales", c) for c in COLUMNS["sales"])))
+        live = {(sale_id, user_id, to_micros(sale_date), to_cents(total))
+                for sale_id, user_id, sale_date, total in archive_repo.get_period_sales(start, end)}
+        remaining = archived & live
+        if not remaining:
+            _mark_complete(period_dir, manifest)
+            completed.append(manifest["period"])
+        elif remaining == archived:
+            shutil.rmtree(period_dir)  # rows were not deleted: archive the month again
+        else:
+            raise ArchiveError(f"Pending archive of {manifest['period']} has {len(remaining)} of its "
+                               f"{len(archived)} sales still in the database, check {period_dir}")
+    return completed
+
+def archive_closed_periods(older_than_months: int = None, today: date = None,
+                           progress: Callable = None) -> List[Dict]:
+    """
+    Archive every month that ended more than older_than_months months ago
+    (default ARCHIVE_AFTER_MONTHS) and is not archived yet. Sales inserted later
+    into an already archived month stay in the database and are still counted.
+    """
+    if older_than_months is None:
+        older_than_months = current_app.config.get("ARCHIVE_AFTER_MONTHS", 12)
+    cutoff = add_months(month_start(today or date.today()), -older_than_months)
+    _recover_pending()
+    archived = {manifest["period"] for _, manifest in _manifests()}
+    oldest = archive_repo.get_oldest_sale_date()
+    
+    results = []
+    month = month_start(oldest.date()) if oldest else cutoff
+    while month < cutoff:
+        if period_key(month) not in archived:
+            result = archive_period(month)
+            if result:
+                results.append(result)
+                if progress:
+                    progress(result)
+        month = add_months(month, 1)
+    return results
+
+# === Order history ===
+
+def _manifest_mtime(period_dir: str) -> int:
+    return os.stat(os.path.join(period_dir, MANIFEST)).st_mtime_ns
+
+@lru_cache(maxsize=64)
+def _period_customers(period_dir: str, mtime_ns: int) -> frozenset:
+    return frozenset(read_column(period_dir, "customers", "user_id"))
+
+@lru_cache(maxsize=24)
+def _period_sales_by_user(period_dir: str, mtime_ns: int) -> Dict[int, List[dict]]:
+    """One archived month's sales with their items and invoices, grouped by user"""
+    sales, by_user = {}, {}
+    for sale_id, user_id, sold_at, cents in zip(*(read_column(period_dir, "sales", c) for c in COLUMNS["sales"])):
+        sale = sales[sale_id] = {"id": sale_id, "user_id": user_id, "sale_date": from_micros(sold_at),
+                                 "total": from_cents(cents), "items": [], "invoices": []}
+        by_user.setdefault(user_id, []).append(sale)
+    for sale_id, product_id, quantity, cents in zip(*(read_column(period_dir, "sale_products", c)
+                                                      for c in COLUMNS["sale_products"])):
+        sales[sale_id]["items"].append({"product_id": product_id, "quantity": quantity, "price": from_cents(cents)})
+    for invoice_id, sale_id, address_id, issued_at in zip(*(read_column(period_dir, "invoices", c)
+                                                            for c in COLUMNS["invoices"][:4])):
+        sales[sale_id]["invoices"].append({"id": invoice_id, "delivery_address_id": address_id,
+                                           "issue_date": from_micros(issued_at)})
+    return by_user
+
+def get_archived_sales(user_id: int) -> List[dict]:
+    """
+    The user's sales in complete archived months, oldest month first:
+    {id, user_id, sale_date, total, items: [{product_id, quantity, price}],
+    invoices: [{id, delivery_address_id, issue_date}]}
+    """
+    sales = []
+    for period_dir, _ in _manifests():
+        mtime_ns = _manifest_mtime(period_dir)
+        if user_id in _period_customers(period_dir, mtime_ns):
+            sales.extend(_period_sales_by_user(period_dir, mtime_ns).get(user_id, []))
+    return sales
+
+def get_archived_user_ids() -> Set[int]:
+    """Users with sales in complete archived months"""
+    user_ids = set()
+    for period_dir, _ in _manifests():
+        user_ids |= _period_customers(period_dir, _manifest_mtime(period_dir))
+    return user_ids
+
+# === Analytics ===
+
+def merge_sales_analytics(start_date: Optional[datetime], end_date: Optional[datetime],
+                          sales_by_day: Dict[str, Dict], customer_totals: Dict[int, Dict]):
+    """
+    Add the archived sales with start_date <= sale_date <= end_date to the
+    per-day and per-customer totals built from the live sales (same shapes).
+    """
+    def add(day, user_id, count, cents):
+        if day is not None:
+            entry = sales_by_day.setdefault(day, {'count': 0, 'revenue': 0.0})
+            entry['count'] += count
+            entry['revenue'] += cents / 100
+        if user_id is not None:
+            entry = customer_totals.setdefault(user_id, {'sales_count': 0, 'total_spent': 0.0})
+            entry['sales_count'] += count
+            entry['total_spent'] += cents / 100
+    
+    for period_dir, manifest in _manifests():
+        first, end = _bounds(manifest)
+        last = end - ONE_MICROSECOND
+        if not _overlaps(first, last, start_date, end_date):
+            continue
+        if _covers(first, last, start_date, end_date):
+            for day, (count, cents) in manifest["sales_by_day"].items():
+                add(day, None, count, cents)
+            for user_id, count, cents in zip(*(read_column(period_dir, "customers", c) for c in COLUMNS["customers"])):
+                add(None, user_id, count, cents)
+            continue
+        
+        low = to_micros(start_date) if start_date else None
+        high = to_micros(end_date) if end_date else None
+        for user_id, sold_at, cents in zip(read_column(period_dir, "sales", "user_id"),
+                                           read_column(period_dir, "sales", "sale_date"),
+                                           read_column(period_dir, "sales", "total_cents")):
+            if (low is None or sold_at >= low) and (high is None or sold_at <= high):
+                add(from_micros(sold_at).date().isoformat(), None, 1, cents)
+                add(None, user_id, 1, cents)
+
+def merge_invoices_analytics(start_date: Optional[datetime], end_date: Optional[datetime],
+                             monthly_data: Dict[str, Dict], customers: Set[int]) -> Tuple[int, float]:
+    """
+    Add the archived invoices with start_date <= issue_date <= end_date to the
+    live monthly breakdown and customer set; returns (invoices, revenue) added.
+    """
+    low = to_micros(start_date) if start_date else None
+    high = to_micros(end_date) if end_date else None
+    count, cents_total = 0, 0
+    for period_dir, manifest in _manifests():
+        issued = manifest["invoices"]
+        if issued["first"] is None or not _overlaps(datetime.fromisoformat(issued["first"]),
+                                                    datetime.fromisoformat(issued["last"]), start_date, end_date):
+            continue
+        for issued_at, cents, user_id in zip(read_column(period_dir, "invoices", "issue_date"),
+                                             read_column(period_dir, "invoices", "sale_total_cents"),
+                                             read_column(period_dir, "invoices", "sale_user_id")):
+            if (low is None or issued_at >= low) and (high is None or issued_at <= high):
+                entry = monthly_data.setdefault(from_micros(issued_at).strftime('%Y-%m'), {'count': 0, 'revenue': 0.0})
+                entry['count'] += 1
+                entry['revenue'] += cents / 100
+                customers.add(user_id)
+                count += 1
+                cents_total += cents
+    return count, cents_total / 100
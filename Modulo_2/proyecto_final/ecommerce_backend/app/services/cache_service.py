@@ -12,12 +12,49 @@ class CacheKeys:
     USER_ADDRESSES = "user.addresses"
     ADMIN_SALES = "admin.sales"
     ADMIN_INVOICES = "admin.invoices"
+    PRODUCTS_VERSION = "products.version"
+    PRODUCTS_VALIDATOR = "products.validator"
+    IDEMPOTENCY = "idempotency"
+    PRODUCT_RELATED = "products.related"
+    RELATED_VERSION = "products.related.version"
+
+def get_cache_version(namespace_key: str) -> int:
+    """Current version of a cache namespace (0 if never bumped or cache unavailable)"""
+    try:
+        return int(cache.get(namespace_key) or 0)
+    except Exception as e:
+        print(f"Error reading cache version {namespace_key}: {e}")
+        return 0
+
+def bump_cache_version(namespace_key: str):
+    """Increment a cache namespace version so validators derived from it change"""
+    try:
+        cache.cache.inc(namespace_key)
+    except Exception as e:
+        print(f"Error bumping cache version {namespace_key}: {e}")
+
+def add_if_absent(key: str, value, timeout: int) -> bool:
+    """
+    Atomically store value only if key does not exist (SET NX EX on Redis, so a
+    crashed owner's entry always expires). Used as a lightweight distributed lock.
+    """
+    backend = cache.cache
+    if hasattr(backend, "_write_client"):
+        return bool(backend._write_client.set(
+            name=f"{backend._get_prefix()}{key}",
+            value=backend.serializer.dumps(value),
+            nx=True,
+            ex=timeout
+        ))
+    return bool(cache.add(key, value, timeout=timeout))
 
 def invalidate_product_cache():
     """
     Invalidate all product-related cache entries using Redis pattern matching
     Following the repo's error handling pattern with try/catch and print
     """
+    # Bump first so ETags change even if the pattern delete below fails
+    bump_cache_version(CacheKeys.PRODUCTS_VERSION)
     try:
         # Clear products list cache
         cache.delete(CacheKeys.PRODUCTS_ALL)
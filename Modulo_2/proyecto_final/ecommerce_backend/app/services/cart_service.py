@@ -1,9 +1,12 @@
 # app/services/cart_service.py
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
+import time
+from datetime import datetime, timedelta
 from app.extensions import db
 import app.repos.cart_repo as cart_repo
 import app.repos.product_repo as product_repo
+import app.utils.identity_map as identity_map
 from app.models.cart import Cart
 from app.models.cart_product import CartProduct
 from app.models.product import Product
@@ -35,7 +38,7 @@ def get_or_create_active_cart(user_id: int) -> Cart:
 
 def get_cart_by_id(cart_id: int, user_id: int = None) -> Cart:
     """Get cart by ID, optionally validating ownership"""
-    cart = cart_repo.get_by_id(cart_id)
+    cart = identity_map.get_or_load("cart", cart_id, cart_repo.get_by_id)
     if not cart:
         raise CartNotFoundError("Cart not found")
     
@@ -45,15 +48,18 @@ def get_cart_by_id(cart_id: int, user_id: int = None) -> Cart:
     
     return cart
 
-def get_user_carts(user_id: int, status: str = None) -> List[Cart]:
-    """Get all carts for a user, optionally filtered by status"""
+def get_user_carts(user_id: int, status: str = None, start_date: datetime = None,
+                   end_date: datetime = None, page: int = 1, per_page: int = 50) -> List[Cart]:
+    """Get carts for a user, optionally filtered by status and creation date (paginated)"""
     try:
-        if status:
-            # Get carts by status for user
-            all_carts = cart_repo.get_by_status(status)
-            return [cart for cart in all_carts if cart.user_id == user_id]
-        else:
-            return cart_repo.get_by_user_id(user_id)
+        return cart_repo.query_carts(
+            user_id=user_id,
+            status=status,
+            start_date=start_date,
+            end_date=end_date,
+            page=page,
+            per_page=per_page
+        )
     except RepoError as e:
         raise CartError(f"Error retrieving carts: {str(e)}")
 
@@ -205,7 +211,7 @@ def update_cart_status(cart_id: int, status: str, user_id: int = None) -> Cart:
 def validate_cart_for_checkout(cart_id: int) -> Dict[str, Any]:
     """Validate cart is ready for checkout and return validation results"""
     try:
-        cart = cart_repo.get_by_id(cart_id)
+        cart = identity_map.get_or_load("cart", cart_id, cart_repo.get_by_id)
         if not cart:
             raise CartNotFoundError("Cart not found")
         
@@ -264,14 +270,71 @@ def validate_cart_for_checkout(cart_id: int) -> Dict[str, Any]:
     except RepoError as e:
         raise CartError(f"Error validating cart: {str(e)}")
 
-def abandon_old_carts(days_old: int = 7) -> int:
-    """Mark old active carts as abandoned (utility function for cleanup)"""
+def abandon_old_carts(days_old: int = 7, batch_size: int = 1000) -> int:
+    """Mark active carts idle for more than `days_old` days as abandoned"""
+    result = sweep_stale_carts(abandon_after_days=days_old, expire_after_days=None, batch_size=batch_size)
+    return result['abandoned']
+
+def _run_batches(stage: str, step, metrics: Dict[str, Any], pause_seconds: float,
+                 max_batches: int = None, progress=None) -> int:
+    """Run `step` (one bounded batch) until it affects no rows, sleeping between batches"""
+    total = 0
+    while max_batches is None or metrics['batches'] < max_batches:
+        affected = step()
+        if not affected:
+            break
+        total += affected
+        metrics['batches'] += 1
+        if progress:
+            progress(stage, affected, total)
+        if pause_seconds:
+            # Throttle so the sweeper does not contend with checkout traffic
+            time.sleep(pause_seconds)
+    return total
+
+def sweep_stale_carts(abandon_after_days: Optional[int] = 7, expire_after_days: Optional[int] = 30,
+                      purge_after_days: Optional[int] = None, batch_size: int = 1000,
+                      pause_seconds: float = 0, max_batches: int = None, progress=None) -> Dict[str, Any]:
+    """
+    Sweep stale carts in bounded, throttled batches.
+    
+    1. active carts idle for `abandon_after_days` become 'abandoned'
+    2. abandoned carts idle for `expire_after_days` become 'expired'
+    3. products of abandoned/expired carts idle for `purge_after_days` are deleted
+    
+    Any stage can be disabled by passing None. `max_batches` bounds the total work of
+    a single run; `progress(stage, affected, total)` is called after every batch.
+    """
+    started = time.monotonic()
+    now = datetime.now()
+    metrics = {'abandoned': 0, 'expired': 0, 'purged_cart_products': 0, 'batches': 0}
+    
     try:
-        from datetime import datetime, timedelta
+        if abandon_after_days is not None:
+            cutoff = now - timedelta(days=abandon_after_days)
+            metrics['abandoned'] = _run_batches(
+                'abandoned',
+                lambda: cart_repo.mark_stale_carts("active", "abandoned", cutoff, batch_size),
+                metrics, pause_seconds, max_batches, progress
+            )
+        
+        if expire_after_days is not None:
+            cutoff = now - timedelta(days=expire_after_days)
+            metrics['expired'] = _run_batches(
+                'expired',
+                lambda: cart_repo.mark_stale_carts("abandoned", "expired", cutoff, batch_size),
+                metrics, pause_seconds, max_batches, progress
+            )
         
-        # This would need to be implemented in the repository
-        # For now, return 0 as placeholder
-        # TODO: Implement in cart_repo
-        return 0
+        if purge_after_days is not None:
+            cutoff = now - timedelta(days=purge_after_days)
+            metrics['purged_cart_products'] = _run_batches(
+                'purged_cart_products',
+                lambda: cart_repo.purge_cart_products(["abandoned", "expired"], cutoff, batch_size),
+                metrics, pause_seconds, max_batches, progress
+            )
     except RepoError as e:
-        raise CartError(f"Error abandoning old carts: {str(e)}")
+        raise CartError(f"Error sweeping stale carts: {str(e)}")
+    
+    metrics['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return metrics
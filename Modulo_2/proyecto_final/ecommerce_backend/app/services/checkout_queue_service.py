@@ -0,0 +1,205 @@
+# app/services/checkout_queue_service.py
+"""
+Asynchronous checkout (CHECKOUT_ASYNC_ENABLED).
+
+POST /sales/checkout only runs the cheap checks (cart ownership and status,
+delivery address, non-empty cart), snapshots the cart items into a
+`checkout_orders` row and answers 202. `flask checkout worker` drains the queue
+in micro-batches: each batch locks its product and cart rows once, applies the
+orders in queue order (oldest first) against the in-memory stock and commits
+every sale, stock decrement and order status in a single transaction. Stock
+conflicts are therefore resolved deterministically: an order that no longer
+fits the remaining stock fails as a whole, later orders still get a chance.
+"""
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+import app.repos.cart_repo as cart_repo
+import app.repos.checkout_order_repo as checkout_order_repo
+import app.services.cart_service as cart_service
+import app.services.delivery_address_service as delivery_address_service
+import app.services.inventory_service as inventory_service
+import app.services.leaderboard_service as leaderboard_service
+import app.services.order_history_service as order_history_service
+import app.services.recommendation_service as recommendation_service
+from app.models.checkout_order import CheckoutOrder
+from app.services.cache_service import invalidate_product_cache, invalidate_sales_cache, invalidate_user_cache
+from app.utils.exceptions import (
+    ForbiddenError,
+    CartNotActiveError,
+    EmptyCartError,
+    DeliveryAddressNotFoundError,
+    CheckoutOrderNotFoundError
+)
+
+def enqueue_checkout(user_id: int, cart_id: int, delivery_address_id: int, payment_method: str = None,
+                     payment_reference: str = None, generate_invoice: bool = False) -> CheckoutOrder:
+    """Validate cheaply and queue the checkout; an already queued order for the cart is returned as is"""
+    cart = cart_service.get_cart_by_id(cart_id, user_id)
+    if cart.status != "active":
+        raise CartNotActiveError("Cart is not active")
+    
+    delivery_address = delivery_address_service.get_delivery_address_by_id(delivery_address_id)
+    if not delivery_address:
+        raise DeliveryAddressNotFoundError("Delivery address not found")
+    if delivery_address.user_id != user_id:
+        raise ForbiddenError("Access denied: Delivery address belongs to another user")
+    
+    queued = checkout_order_repo.get_queued_for_cart(cart_id)
+    if queued:
+        return queued
+    
+    cart_products = cart_repo.get_cart_products(cart_id)
+    if not cart_products:
+        raise EmptyCartError("Cart is empty")
+    
+    return checkout_order_repo.create_order(
+        user_id=user_id,
+        cart_id=cart_id,
+        delivery_address_id=delivery_address_id,
+        items=[{"product_id": cp.product_id, "quantity": cp.quantity} for cp in cart_products],
+        payment_method=payment_method,
+        payment_reference=payment_reference,
+        generate_invoice=bool(generate_invoice),
+        status="queued"
+    )
+
+def get_order(order_id: int, user_id: int = None) -> CheckoutOrder:
+    order = checkout_order_repo.get_by_id(order_id)
+    if not order:
+        raise CheckoutOrderNotFoundError()
+    if user_id and order.user_id != user_id:
+        raise ForbiddenError("Access denied: Checkout order belongs to another user")
+    return order
+
+def _rejection(order: CheckoutOrder, products: dict, stock: dict, carts: dict) -> Optional[str]:
+    """Why the order cannot be applied against the batch's current state (None if it can)"""
+    cart = carts.get(order.cart_id)
+    if cart is None or cart.status != "active":
+        return "Cart is not active"
+    needed = {}
+    for item in order.items:
+        needed[item["product_id"]] = needed.get(item["product_id"], 0) + item["quantity"]
+    for product_id, quantity in needed.items():
+        product = products.get(product_id)
+        if product is None:
+            return f"Product {product_id} not found"
+        if stock[product_id] < quantity:
+            return f"Insufficient stock for {product.name}. Available: {stock[product_id]}, Requested: {quantity}"
+    return None
+
+def _apply_batch(orders: List[CheckoutOrder]) -> dict:
+    """Apply locked orders in id order; the caller commits"""
+    product_ids = sorted({item["product_id"] for order in orders for item in order.items})
+    products = {product.id: product for product in checkout_order_repo.lock_products(product_ids)}
+    stock = {product_id: product.stock for product_id, product in products.items()}  # remaining as the batch goes
+    carts = {cart.id: cart for cart in checkout_order_repo.lock_carts(sorted({o.cart_id for o in orders}))}
+    now = datetime.now()
+    result = {"completed": 0, "failed": 0, "users": set(), "sold": [], "sales": []}
+    
+    for order in orders:
+        order.processed_at = now
+        error = _rejection(order, products, stock, carts)
+        if error:
+            order.status, order.error = "failed", error
+            result["failed"] += 1
+            continue
+        
+        items, total = [], Decimal("0.00")
+        for item in order.items:
+            product = products[item["product_id"]]
+            stock[product.id] -= item["quantity"]
+            if product.stock_sharded:
+                inventory_service.decrement_stock(product.id, item["quantity"], commit=False)
+            else:
+                product.stock = stock[product.id]
+            total += product.price * item["quantity"]
+            items.append({**item, "price": product.price})  # price at time of sale
+        order.sale = checkout_order_repo.stage_sale(order.user_id, items, total)
+        result["sold"].append(items)
+        result["sales"].append(order.sale)
+        if order.generate_invoice:
+            order.invoice = checkout_order_repo.stage_invoice(order.sale, order.delivery_address_id)
+        carts[order.cart_id].status = "converted"
+        order.status = "completed"
+        result["completed"] += 1
+        result["users"].add(order.user_id)
+    return result
+
+def _after_commit(result: dict):
+    users = result.pop("users")
+    sold = result.pop("sold")
+    sales = result.pop("sales")
+    if not users:
+        return
+    leaderboard_service.record_sale([item for items in sold for item in items])
+    recommendation_service.record_sales([[item["product_id"] for item in items] for items in sold])
+    # ids first: every refresh commits, which expires the batch's objects
+    for user_id, sale_id in [(sale.user_id, sale.id) for sale in sales]:
+        order_history_service.refresh_order(user_id, sale_id)
+    invalidate_product_cache()  # stock changed
+    invalidate_sales_cache()
+    for user_id in users:
+        invalidate_user_cache(user_id)
+
+def process_batch(batch_size: int = 100) -> Dict[str, int]:
+    """
+    Claim up to batch_size queued orders and apply them in one transaction.
+    If the group commit fails, the orders are retried one per transaction so a
+    single bad order cannot block the rest of the batch.
+    """
+    orders = checkout_order_repo.claim_queued(batch_size)
+    if not orders:
+        return {"claimed": 0, "completed": 0, "failed": 0}
+    order_ids = [order.id for order in orders]
+    try:
+        result = _apply_batch(orders)
+        checkout_order_repo.commit_batch()
+        _after_commit(result)
+        return {"claimed": len(orders), **result}
+    except Exception as e:
+        checkout_order_repo.rollback()
+        if len(order_ids) == 1:
+            checkout_order_repo.mark_failed(order_ids[0], f"Checkout failed: {e}", datetime.now())
+            return {"claimed": 1, "completed": 0, "failed": 1}
+        print(f"Error committing checkout batch, retrying orders one by one: {e}")
+    
+    result = {"claimed": 0, "completed": 0, "failed": 0}
+    for order_id in order_ids:
+        orders = checkout_order_repo.claim_queued(1, order_id=order_id)
+        if not orders:
+            continue  # taken by another worker meanwhile
+        try:
+            single = _apply_batch(orders)
+            checkout_order_repo.commit_batch()
+            _after_commit(single)
+        except Exception as e:
+            checkout_order_repo.rollback()
+            checkout_order_repo.mark_failed(order_id, f"Checkout failed: {e}", datetime.now())
+            single = {"completed": 0, "failed": 1}
+        result["claimed"] += 1
+        result["completed"] += single["completed"]
+        result["failed"] += single["failed"]
+    return result
+
+def run_worker(batch_size: int = 100, poll_seconds: float = 0.2, max_batches: int = None,
+               stop_when_empty: bool = False, progress: Callable = None) -> Dict[str, int]:
+    """
+    Process batches until interrupted, max_batches, or (stop_when_empty) an empty queue.
+    A worker killed mid-batch leaves its orders queued: nothing is committed before the batch is.
+    """
+    totals = {"batches": 0, "completed": 0, "failed": 0}
+    while max_batches is None or totals["batches"] < max_batches:
+        result = process_batch(batch_size)
+        if not result["claimed"]:
+            if stop_when_empty:
+                break
+            time.sleep(poll_seconds)
+            continue
+        totals["batches"] += 1
+        totals["completed"] += result["completed"]
+        totals["failed"] += result["failed"]
+        if progress:
+            progress(result)
+    return totals
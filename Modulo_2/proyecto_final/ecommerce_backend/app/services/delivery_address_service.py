@@ -1,4 +1,5 @@
 import app.repos.delivery_address_repo as delivery_address_repo
+import app.utils.identity_map as identity_map
 from app.utils.exceptions import (
     DeliveryAddressNotFoundError,
     AppError,
@@ -15,7 +16,9 @@ def update_delivery_address(delivery_address_id: int, data: dict):
     return delivery_address_repo.update_delivery_address(delivery_address_id, data)
 
 def delete_delivery_address(delivery_address_id: int):
+    identity_map.forget("delivery_address", delivery_address_id)
     return delivery_address_repo.delete_delivery_address(delivery_address_id)
 
 def get_delivery_address_by_id(delivery_address_id: int):
-    return delivery_address_repo.get_delivery_address_by_id(delivery_address_id)
\ No newline at end of file
+    return identity_map.get_or_load("delivery_address", delivery_address_id,
+                                    delivery_address_repo.get_delivery_address_by_id)
\ No newline at end of file
@@ -0,0 +1,76 @@
+# app/services/diagnostics_service.py
+"""Runtime diagnostics for the admin endpoints in app/api/admin.py (per worker process)"""
+import os
+from typing import Any, Dict, List, Optional
+from flask import current_app
+from app.utils import memory
+from app.utils.exceptions import NotFoundError
+
+def get_slow_query_report(limit: int = 20) -> Dict[str, Any]:
+    """Top statement fingerprints by total time, with the last slow sample of each"""
+    query_log = current_app.extensions.get("slow_query_log")
+    if query_log is None:
+        return {"enabled": False, "queries": []}
+    return {
+        "enabled": True,
+        "threshold_ms": query_log.threshold_ms,
+        "queries": query_log.stats.top(limit)
+    }
+
+def reset_slow_query_stats() -> None:
+    query_log = current_app.extensions.get("slow_query_log")
+    if query_log is not None:
+        query_log.stats.reset()
+
+def _profile_store():
+    store = current_app.extensions.get("profile_store")
+    if store is None:
+        raise NotFoundError("Request profiling is disabled")
+    return store
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Stored request profiles of this host, newest first"""
+    return _profile_store().list()
+
+def get_profile_path(profile_id: str) -> str:
+    """Path of the pstats dump (load with pstats.Stats or snakeviz)"""
+    try:
+        path = _profile_store().pstats_path(profile_id)
+    except ValueError:
+        path = None
+    if path is None:
+        raise NotFoundError("Profile not found")
+    return path
+
+def get_profile_text(profile_id: str, sort: str = "cumulative", limit: int = 50) -> str:
+    try:
+        text = _profile_store().text(profile_id, sort, limit)
+    except ValueError:
+        text = None
+    if text is None:
+        raise NotFoundError("Profile not found")
+    return text
+
+def _memory_stats():
+    stats = current_app.extensions.get("memory_stats")
+    if stats is None:
+        raise NotFoundError("Memory diagnostics are disabled")
+    return stats
+
+def get_memory_report(object_types: int = 0) -> Dict[str, Any]:
+    """RSS and identity map sizes of this worker; object counts by type when object_types > 0"""
+    report = {
+        "pid": os.getpid(),
+        "rss_mb": memory.current_rss_mb(),
+        "peak_rss_mb": memory.peak_rss_mb(),
+        **_memory_stats().report()
+    }
+    if object_types:
+        report["objects"] = memory.object_counts(object_types)
+    return report
+
+def take_memory_snapshot(limit: int = 20) -> Dict[str, Any]:
+    return _memory_stats().take_snapshot(limit=limit)
+
+def stop_memory_tracing() -> None:
+    _memory_stats().stop_tracing()
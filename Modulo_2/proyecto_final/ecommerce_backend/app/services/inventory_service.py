@@ -0,0 +1,123 @@
+# app/services/inventory_service.py
+"""
+Sharded stock counters for hot products.
+
+Every checkout of a product updates the same `products` row, so under a flash
+sale all buyers queue on one row lock. A product flagged with
+`flask inventory shard <id>` keeps its stock split across N rows of
+`product_stock_shards` instead: a decrement picks a random shard that can cover
+the quantity and runs a conditional UPDATE on it alone, so N checkouts can
+proceed in parallel. Reading `Product.stock` returns the shard sum (see
+app/models/product_stock_shard.py), and `products.stock` is only refreshed as a
+snapshot by rebalance().
+
+Shards drain unevenly; `flask inventory rebalance` spreads the stock evenly
+again, and a decrement no single shard can cover falls back to locking all
+shards of the product.
+"""
+import random
+from typing import Dict, List
+import app.repos.inventory_repo as inventory_repo
+from app.utils.exceptions import InsufficientStockError, ProductNotFoundError, ValidationError
+
+def split_evenly(total: int, shards: int) -> List[int]:
+    base, extra = divmod(max(total, 0), shards)
+    return [base + 1 if shard < extra else base for shard in range(shards)]
+
+def is_sharded(product_id: int) -> bool:
+    return bool(inventory_repo.is_sharded(product_id))
+
+def decrement_stock(product_id: int, quantity: int, commit: bool = True) -> None:
+    """
+    Take quantity units of stock, or raise InsufficientStockError without changing anything.
+    Plain products use one conditional UPDATE on their row; sharded products try
+    the shards that can cover the quantity in random order.
+    """
+    sharded = inventory_repo.is_sharded(product_id)
+    if sharded is None:
+        raise ProductNotFoundError(f"Product {product_id} not found")
+    
+    if not sharded:
+        taken = inventory_repo.decrement_product_stock(product_id, quantity)
+    else:
+        candidates = inventory_repo.get_shards_with_stock(product_id, quantity)
+        random.shuffle(candidates)
+        taken = any(inventory_repo.decrement_shard(product_id, shard, quantity) for shard in candidates)
+        if not taken:
+            taken = _take_across_shards(product_id, quantity)
+    
+    if not taken:
+        if commit:
+            inventory_repo.rollback()  # release the shard locks of the slow path
+        raise InsufficientStockError(f"Insufficient stock for product {product_id}. Requested: {quantity}")
+    if commit:
+        inventory_repo.commit()
+
+def _take_across_shards(product_id: int, quantity: int) -> bool:
+    """Slow path: lock every shard and take from the fullest ones first"""
+    shards = inventory_repo.lock_shards(product_id)
+    if sum(shard.stock for shard in shards) < quantity:
+        return False
+    for shard in sorted(shards, key=lambda s: s.stock, reverse=True):
+        take = min(shard.stock, quantity)
+        shard.stock -= take
+        quantity -= take
+        if not quantity:
+            break
+    return True
+
+def shard_product(product_id: int, shards: int) -> Dict[str, int]:
+    """Split the product's stock across `shards` counters (re-split if it is already sharded)"""
+    if shards < 1:
+        raise ValidationError("Shard count must be at least 1")
+    product = inventory_repo.lock_product(product_id)
+    if not product:
+        raise ProductNotFoundError()
+    locked = inventory_repo.lock_shards(product_id)
+    total = sum(shard.stock for shard in locked) if product.stock_sharded else product.stock
+    
+    inventory_repo.apply_shards(product_id, locked, split_evenly(total, shards))
+    inventory_repo.set_product_stock(product_id, total, sharded=True)
+    inventory_repo.commit()
+    return {"product_id": product_id, "shards": shards, "stock": total}
+
+def unshard_product(product_id: int) -> Dict[str, int]:
+    """Fold the shards back into products.stock"""
+    product = inventory_repo.lock_product(product_id)
+    if not product:
+        raise ProductNotFoundError()
+    locked = inventory_repo.lock_shards(product_id)
+    total = sum(shard.stock for shard in locked) if product.stock_sharded else product.stock
+    
+    inventory_repo.apply_shards(product_id, locked, [])
+    inventory_repo.set_product_stock(product_id, total, sharded=False)
+    inventory_repo.commit()
+    return {"product_id": product_id, "shards": 0, "stock": total}
+
+def set_stock(product_id: int, stock: int) -> None:
+    """Admin stock update of a sharded product: the new total is spread evenly over its shards"""
+    locked = inventory_repo.lock_shards(product_id)
+    inventory_repo.apply_shards(product_id, locked, split_evenly(stock, len(locked) or 1))
+    inventory_repo.set_product_stock(product_id, stock, sharded=True)
+    inventory_repo.commit()
+
+def rebalance(product_id: int = None) -> List[Dict[str, int]]:
+    """
+    Even out the shards of one product (or of every sharded product) and refresh
+    the products.stock snapshot. Each product is rebalanced in its own short
+    transaction, so checkouts only wait on the product being rebalanced.
+    """
+    product_ids = [product_id] if product_id is not None else inventory_repo.get_sharded_product_ids()
+    results = []
+    for pid in product_ids:
+        locked = inventory_repo.lock_shards(pid)
+        if not locked:
+            inventory_repo.rollback()
+            continue
+        before = [shard.stock for shard in locked]
+        total = sum(before)
+        inventory_repo.apply_shards(pid, locked, split_evenly(total, len(locked)))
+        inventory_repo.set_product_stock(pid, total, sharded=True)
+        inventory_repo.commit()
+        results.append({"product_id": pid, "shards": len(locked), "stock": total, "spread_before": max(before) - min(before)})
+    return results
@@ -4,7 +4,10 @@ from datetime import datetime
 from app.extensions import db
 import app.repos.invoice_repo as invoice_repo
 import app.repos.sale_repo as sale_repo
-import app.repos.delivery_address_repo as delivery_address_repo
+import app.services.archive_service as archive_service
+import app.services.delivery_address_service as delivery_address_service
+import app.services.order_history_service as order_history_service
+import app.services.sale_service as sale_service
 from app.models.invoice import Invoice
 from app.models.sale import Sale
 from app.utils.exceptions import (
@@ -17,9 +20,9 @@ from app.utils.exceptions import (
     InvoiceError
 )
 
-def get_invoice_by_id(invoice_id: int, user_id: int = None) -> Invoice:
+def get_invoice_by_id(invoice_id: int, user_id: int = None, load=()) -> Invoice:
     """Get invoice by ID with optional ownership validation"""
-    invoice = invoice_repo.get_by_id(invoice_id)
+    invoice = invoice_repo.get_by_id(invoice_id, load)
     if not invoice:
         raise InvoiceNotFoundError("Invoice not found")
     
@@ -29,6 +32,18 @@ def get_invoice_by_id(invoice_id: int, user_id: int = None) -> Invoice:
     
     return invoice
 
+def get_invoice_validator(invoice_id: int, user_id: int = None):
+    """Conditional GET validator for an invoice: its own columns plus the sale it renders"""
+    row = invoice_repo.get_invoice_validator(invoice_id)
+    if row is None:
+        return None
+    sale_validator = sale_service.get_sale_validator(row[0], user_id)
+    if sale_validator is None:
+        return None
+    sale_parts, sale_last_modified = sale_validator
+    last_modified = max(stamp for stamp in (row[2], row[3], sale_last_modified) if stamp is not None)
+    return (tuple(row), sale_parts), last_modified
+
 def get_invoice_with_details(invoice_id: int, user_id: int = None) -> Invoice:
     """Get invoice with full details including sale products and delivery address"""
     invoice = invoice_repo.get_invoice_with_full_details(invoice_id)
@@ -41,17 +56,18 @@ def get_invoice_with_details(invoice_id: int, user_id: int = None) -> Invoice:
     
     return invoice
 
-def get_user_invoices(user_id: int, start_date: datetime = None, end_date: datetime = None) -> List[Invoice]:
+def get_user_invoices(user_id: int, start_date: datetime = None, end_date: datetime = None,
+                      load=()) -> List[Invoice]:
     """Get all invoices for a user with optional date filtering"""
     try:
         if start_date or end_date:
-            return invoice_repo.get_invoices_by_date_range(start_date, end_date, user_id)
+            return invoice_repo.get_invoices_by_date_range(start_date, end_date, user_id, load)
         else:
-            return invoice_repo.get_by_user_id(user_id)
+            return invoice_repo.get_by_user_id(user_id, load)
     except RepoError as e:
         raise InvoiceError(f"Error retrieving user invoices: {str(e)}")
 
-def get_invoices_for_sale(sale_id: int, user_id: int = None) -> List[Invoice]:
+def get_invoices_for_sale(sale_id: int, user_id: int = None, load=()) -> List[Invoice]:
     """Get all invoices for a specific sale"""
     # Validate sale exists and ownership if user_id provided
     sale = sale_repo.get_by_id(sale_id)
@@ -62,7 +78,7 @@ def get_invoices_for_sale(sale_id: int, user_id: int = None) -> List[Invoice]:
         raise ForbiddenError("Access denied: Sale belongs to another user")
     
     try:
-        return invoice_repo.get_by_sale_id(sale_id)
+        return invoice_repo.get_by_sale_id(sale_id, load)
     except RepoError as e:
         raise InvoiceError(f"Error retrieving sale invoices: {str(e)}")
 
@@ -94,7 +110,7 @@ def create_invoice(sale_id: int, delivery_address_id: int, user_id: int = None)
         raise ForbiddenError("Access denied: Sale belongs to another user")
     
     # Validate delivery address exists
-    delivery_address = delivery_address_repo.get_delivery_address_by_id(delivery_address_id)
+    delivery_address = delivery_address_service.get_delivery_address_by_id(delivery_address_id)
     if not delivery_address:
         raise DeliveryAddressNotFoundError("Delivery address not found")
     
@@ -103,9 +119,11 @@ def create_invoice(sale_id: int, delivery_address_id: int, user_id: int = None)
         raise ForbiddenError("Access denied: Delivery address belongs to another user")
     
     try:
-        return invoice_repo.create_invoice(sale_id, delivery_address_id)
+        invoice = invoice_repo.create_invoice(sale_id, delivery_address_id)
     except RepoError as e:
         raise InvoiceError(f"Error creating invoice: {str(e)}")
+    order_history_service.refresh_order(sale.user_id, sale_id)
+    return invoice
 
 def update_invoice(invoice_id: int, data: dict, user_id: int = None) -> Invoice:
     """Update invoice information"""
@@ -114,33 +132,39 @@ def update_invoice(invoice_id: int, data: dict, user_id: int = None) -> Invoice:
     
     # If updating delivery address, validate it exists and ownership
     if 'delivery_address_id' in data:
-        delivery_address = delivery_address_repo.get_delivery_address_by_id(data['delivery_address_id'])
+        delivery_address = delivery_address_service.get_delivery_address_by_id(data['delivery_address_id'])
         if not delivery_address:
             raise DeliveryAddressNotFoundError("Delivery address not found")
         
         if user_id and delivery_address.user_id != user_id:
             raise ForbiddenError("Access denied: Delivery address belongs to another user")
     
+    owner_id, sale_id = invoice.sale.user_id, invoice.sale_id
     try:
-        return invoice_repo.update_invoice(invoice_id, data)
+        updated_invoice = invoice_repo.update_invoice(invoice_id, data)
     except RepoError as e:
         raise InvoiceError(f"Error updating invoice: {str(e)}")
+    order_history_service.refresh_order(owner_id, sale_id)
+    return updated_invoice
 
 def delete_invoice(invoice_id: int, user_id: int = None) -> Invoice:
     """Delete an invoice"""
     # Validate invoice exists and ownership
     invoice = get_invoice_by_id(invoice_id, user_id)
+    owner_id, sale_id = invoice.sale.user_id, invoice.sale_id
     
     try:
-        return invoice_repo.delete_invoice(invoice_id)
+        deleted_invoice = invoice_repo.delete_invoice(invoice_id)
     except RepoError as e:
         raise InvoiceError(f"Error deleting invoice: {str(e)}")
+    order_history_service.refresh_order(owner_id, sale_id)
+    return deleted_invoice
 
 def get_all_invoices(start_date: datetime = None, end_date: datetime = None, 
-                    user_id: int = None) -> List[Invoice]:
+                    user_id: int = None, load=()) -> List[Invoice]:
     """Get all invoices with optional filtering (Admin only typically)"""
     try:
-        return invoice_repo.get_invoices_by_date_range(start_date, end_date, user_id)
+        return invoice_repo.get_invoices_by_date_range(start_date, end_date, user_id, load)
     except RepoError as e:
         raise InvoiceError(f"Error retrieving invoices: {str(e)}")
 
@@ -235,19 +259,12 @@ def get_user_invoices_summary(user_id: int) -> Dict[str, Any]:
         raise InvoiceError(f"Error generating user invoices summary: {str(e)}")
 
 def get_invoices_analytics(start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
-    """Get analytics for invoices in a date range (Admin only typically)"""
+    """Get analytics for invoices in a date range (Admin only typically), archived months included"""
     try:
         invoices = invoice_repo.get_invoices_by_date_range(start_date, end_date)
         
-        if not invoices:
-            return {
-                'total_invoices': 0,
-                'total_revenue': 0.0,
-                'analytics': {}
-            }
-        
         total_revenue = sum(float(invoice.sale.total) for invoice in invoices)
-        unique_customers = len(set(invoice.sale.user_id for invoice in invoices))
+        customers = set(invoice.sale.user_id for invoice in invoices)
         
         # Monthly breakdown if date range spans multiple months
         monthly_data = {}
@@ -258,11 +275,25 @@ def get_invoices_analytics(start_date: datetime = None, end_date: datetime = Non
             monthly_data[month_key]['count'] += 1
             monthly_data[month_key]['revenue'] += float(invoice.sale.total)
         
+        # Archived months (flask archive run) are no longer in the invoices table
+        archived_count, archived_revenue = archive_service.merge_invoices_analytics(
+            start_date, end_date, monthly_data, customers
+        )
+        total_invoices = len(invoices) + archived_count
+        total_revenue += archived_revenue
+        
+        if not total_invoices:
+            return {
+                'total_invoices': 0,
+                'total_revenue': 0.0,
+                'analytics': {}
+            }
+        
         return {
-            'total_invoices': len(invoices),
+            'total_invoices': total_invoices,
             'total_revenue': total_revenue,
-            'unique_customers': unique_customers,
-            'average_invoice_amount': total_revenue / len(invoices),
+            'unique_customers': len(customers),
+            'average_invoice_amount': total_revenue / total_invoices,
             'monthly_breakdown': monthly_data,
             'date_range': {
                 'from': start_date.isoformat() if start_date else None,
@@ -0,0 +1,171 @@
+# app/services/leaderboard_service.py
+"""
+Best-seller leaderboards ("top sellers today / this week").
+
+Every checkout adds its items to one Redis sorted set per period and metric
+(ZINCRBY by quantity and by revenue), e.g. `leaderboard.units.day.2026-10-19`
+or `leaderboard.revenue.week.2026-W42`, so reading the top N is a single
+ZREVRANGE instead of a GROUP BY over sale_products. Each set expires one
+period after its period ends, so old days and weeks disappear on their own.
+`flask leaderboard rebuild` recomputes the current periods from sale_products
+(after a Redis flush, or to correct drift). Without Redis (SimpleCache in
+tests, local runs) an in-process store with the same semantics is used.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+import app.repos.sale_repo as sale_repo
+import app.services.product_service as product_service
+from app.extensions import cache
+from app.utils.exceptions import BadRequestError
+
+KEY_PREFIX = "leaderboard"
+PERIODS = ("day", "week")
+METRICS = ("units", "revenue")
+LEADERBOARD_MAX_LIMIT = 100
+
+def period_bounds(period: str, when: datetime = None) -> Tuple[str, datetime, datetime]:
+    """Bucket name and [start, end) of the day or ISO week containing `when`"""
+    when = when or datetime.now()
+    start = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        return start.strftime("%Y-%m-%d"), start, start + timedelta(days=1)
+    start -= timedelta(days=start.weekday())
+    year, week, _ = start.isocalendar()
+    return f"{year}-W{week:02d}", start, start + timedelta(weeks=1)
+
+def leaderboard_key(metric: str, period: str, when: datetime = None) -> Tuple[str, int]:
+    """Sorted set key and the unix time it expires at (one period after the period ends)"""
+    bucket, start, end = period_bounds(period, when)
+    return f"{KEY_PREFIX}.{metric}.{period}.{bucket}", int((end + (end - start)).timestamp())
+
+class MemoryLeaderboards:
+    """Per-process sorted sets, used when the cache backend is not Redis"""
+    
+    def __init__(self):
+        self._sets = {}
+        self._lock = threading.Lock()
+    
+    def _live(self, key: str, now: float) -> dict:
+        scores, expires_at = self._sets.get(key, ({}, None))
+        if expires_at is not None and expires_at <= now:
+            self._sets.pop(key, None)
+            return {}
+        return scores
+    
+    def incr(self, key: str, member: int, amount: float, expires_at: int):
+        with self._lock:
+            scores = self._live(key, time.time())
+            scores[member] = scores.get(member, 0) + amount
+            self._sets[key] = (scores, expires_at)
+    
+    def replace(self, key: str, scores: dict, expires_at: int):
+        with self._lock:
+            self._sets[key] = (dict(scores), expires_at)
+    
+    def top(self, key: str, limit: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            scores = self._live(key, time.time())
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    
+    def reset(self):
+        with self._lock:
+            self._sets.clear()
+
+memory_leaderboards = MemoryLeaderboards()
+
+def _redis_backend():
+    backend = cache.cache
+    return backend if hasattr(backend, "_write_client") else None
+
+def record_sale(items: List[dict], when: datetime = None):
+    """
+    Add a committed sale's items ({product_id, quantity, price}) to the current
+    day and week leaderboards. Best effort: a Redis error never fails a checkout.
+    """
+    increments = []
+    for period in PERIODS:
+        units_key, expires_at = leaderboard_key("units", period, when)
+        revenue_key, _ = leaderboard_key("revenue", period, when)
+        for item in items:
+            increments.append((units_key, item["product_id"], item["quantity"], expires_at))
+            increments.append((revenue_key, item["product_id"], float(item["price"] * item["quantity"]), expires_at))
+    
+    try:
+        backend = _redis_backend()
+        if backend is None:
+            for key, member, amount, expires_at in increments:
+                memory_leaderboards.incr(key, member, amount, expires_at)
+            return
+        prefix = backend._get_prefix()
+        pipe = backend._write_client.pipeline(transaction=False)
+        for key, member, amount, expires_at in increments:
+            pipe.zincrby(f"{prefix}{key}", amount, member)
+            pipe.expireat(f"{prefix}{key}", expires_at)
+        pipe.execute()
+    except Exception as e:
+        print(f"Error updating best-seller leaderboard: {e}")
+
+def top_products(period: str = "day", metric: str = "units", limit: int = 10,
+                 when: datetime = None) -> List[Tuple[int, float]]:
+    """(product_id, score) pairs, best first"""
+    key, _ = leaderboard_key(metric, period, when)
+    try:
+        backend = _redis_backend()
+        if backend is None:
+            return memory_leaderboards.top(key, limit)
+        rows = backend._read_client.zrevrange(f"{backend._get_prefix()}{key}", 0, limit - 1, withscores=True)
+        return [(int(member), score) for member, score in rows]
+    except Exception as e:
+        print(f"Error reading best-seller leaderboard: {e}")
+        return []
+
+def get_best_sellers(period: str = "day", metric: str = "units", limit: int = 10) -> List[Dict]:
+    """Leaderboard entries with their products (from the per-product cache); deleted products are skipped"""
+    if period not in PERIODS:
+        raise BadRequestError(f"period must be one of: {', '.join(PERIODS)}")
+    if metric not in METRICS:
+        raise BadRequestError(f"by must be one of: {', '.join(METRICS)}")
+    if not 1 <= limit <= LEADERBOARD_MAX_LIMIT:
+        raise BadRequestError(f"limit must be between 1 and {LEADERBOARD_MAX_LIMIT}")
+    
+    ranking = top_products(period, metric, limit)
+    if not ranking:
+        return []
+    products, _ = product_service.get_products_by_ids([product_id for product_id, _ in ranking])
+    by_id = {product.id: product for product in products}
+    entries = []
+    for product_id, score in ranking:
+        if product_id in by_id:
+            value = int(score) if metric == "units" else Decimal(str(score)).quantize(Decimal("0.01"))
+            entries.append({"rank": len(entries) + 1, "product": by_id[product_id], metric: value})
+    return entries
+
+def rebuild(periods=PERIODS, when: datetime = None) -> Dict[str, int]:
+    """Recompute the current period sets from sale_products; returns products ranked per period"""
+    result = {}
+    for period in periods:
+        _, start, end = period_bounds(period, when)
+        totals = sale_repo.get_product_sales_totals(start, end)
+        scores = {
+            "units": {product_id: int(units) for product_id, units, _ in totals},
+            "revenue": {product_id: float(revenue) for product_id, _, revenue in totals},
+        }
+        backend = _redis_backend()
+        pipe = backend._write_client.pipeline(transaction=True) if backend is not None else None
+        for metric in METRICS:
+            key, expires_at = leaderboard_key(metric, period, when)
+            if pipe is None:
+                memory_leaderboards.replace(key, scores[metric], expires_at)
+                continue
+            full_key = f"{backend._get_prefix()}{key}"
+            pipe.delete(full_key)
+            if scores[metric]:
+                pipe.zadd(full_key, scores[metric])
+                pipe.expireat(full_key, expires_at)
+        if pipe is not None:
+            pipe.execute()  # MULTI/EXEC: readers never see a half-rebuilt set
+        result[period] = len(totals)
+    return result
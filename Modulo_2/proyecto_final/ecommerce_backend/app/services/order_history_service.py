@@ -0,0 +1,133 @@
+# app/services/order_history_service.py
+"""
+Per-user order history read model ("My orders").
+
+The screen used to call /sales/sales, /sales/invoices and then /sales/sales/<id>
+for every order, each rebuilding sale products, products and invoices from the
+normalized tables. `user_order_histories` keeps one JSON document per user
+instead (JSONB on PostgreSQL) with every order, its items and its invoices, so
+GET /sales/order-history is a single primary-key read.
+
+Writers patch the document after they commit: checkout and admin sale updates
+replace the sale's entry, invoice create/update/delete re-render the entry of
+the invoice's sale. A failed patch deletes the document, and the next read
+rebuilds it from the normalized tables. `flask order-history check` compares
+stored documents with freshly built ones and `--repair` / `rebuild` rewrites them.
+
+Sales moved to the cold-data archive (`flask archive run`) are no longer in the
+normalized tables: documents are built from both, so archiving a month changes
+nothing for its customers.
+"""
+import heapq
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+import app.repos.order_history_repo as order_history_repo
+from app.schemas.order_history import OrderHistoryOrderSchema
+from app.services import archive_service
+
+def _archived_orders(user_id: int) -> List[dict]:
+    """The user's archived sales rendered like live ones (products and addresses are never archived)"""
+    sales = archive_service.get_archived_sales(user_id)
+    if not sales:
+        return []
+    products = order_history_repo.get_products({item["product_id"] for sale in sales for item in sale["items"]})
+    addresses = order_history_repo.get_delivery_addresses(
+        {invoice["delivery_address_id"] for sale in sales for invoice in sale["invoices"]})
+    return OrderHistoryOrderSchema(many=True).dump([
+        SimpleNamespace(
+            id=sale["id"], sale_date=sale["sale_date"], total=sale["total"],
+            sale_products=[SimpleNamespace(product=products.get(item["product_id"]), **item) for item in sale["items"]],
+            invoices=[SimpleNamespace(id=invoice["id"], issue_date=invoice["issue_date"],
+                                      delivery_address=addresses.get(invoice["delivery_address_id"]))
+                      for invoice in sale["invoices"]])
+        for sale in sales
+    ])
+
+def _sort_orders(orders: List[dict]):
+    orders.sort(key=lambda order: (order["sale_date"] or "", order["id"]), reverse=True)
+
+def build_orders(user_id: int) -> List[dict]:
+    """The user's document built from the normalized tables and the archive, newest order first"""
+    orders = OrderHistoryOrderSchema(many=True).dump(order_history_repo.get_user_sales(user_id))
+    archived = _archived_orders(user_id)
+    if archived:
+        orders += archived
+        _sort_orders(orders)
+    return orders
+
+def get_order_history(user_id: int) -> Dict[str, Any]:
+    history = order_history_repo.get_by_user_id(user_id)
+    if history is None:
+        history = order_history_repo.save(user_id, build_orders(user_id))  # first read or after a failed patch
+    return {"orders": history.orders, "count": len(history.orders), "updated_at": history.updated_at}
+
+def refresh_order(user_id: int, sale_id: int):
+    """
+    Re-render one order of the user's document after a committed write (or drop
+    it when the sale no longer exists). Best effort: never fails the write itself.
+    """
+    try:
+        history = order_history_repo.lock(user_id)
+        if history is None:
+            order_history_repo.save(user_id, build_orders(user_id))
+            return
+        orders = [order for order in history.orders if order["id"] != sale_id]
+        sale = order_history_repo.get_sale(sale_id)
+        if sale is not None and sale.user_id == user_id:
+            orders.append(OrderHistoryOrderSchema().dump(sale))
+            _sort_orders(orders)
+        order_history_repo.save(user_id, orders, history)
+    except Exception as e:
+        print(f"Error updating order history of user {user_id}: {e}")
+        order_history_repo.rollback()
+        try:
+            order_history_repo.delete(user_id)  # rebuilt on next read instead of served stale
+        except Exception as drop_error:
+            print(f"Error dropping order history of user {user_id}: {drop_error}")
+
+def _live_users_with_sales(batch_size: int):
+    last_id = 0
+    while True:
+        user_ids = order_history_repo.get_user_ids_with_sales(last_id, batch_size)
+        if not user_ids:
+            return
+        yield from user_ids
+        last_id = user_ids[-1]
+
+def _users_with_sales(user_id: int = None, batch_size: int = 500):
+    """User ids with live or archived sales, ascending"""
+    if user_id is not None:
+        yield user_id
+        return
+    previous = None
+    archived = sorted(order_history_repo.get_existing_user_ids(archive_service.get_archived_user_ids()))
+    for uid in heapq.merge(_live_users_with_sales(batch_size), archived):
+        if uid != previous:
+            yield uid
+            previous = uid
+
+def check_consistency(repair: bool = False, user_id: int = None, batch_size: int = 500,
+                      progress: Callable = None) -> Dict[str, int]:
+    """Compare stored documents with freshly built ones; repair=True rewrites the ones that differ"""
+    result = {"checked": 0, "missing": 0, "stale": 0, "repaired": 0}
+    for uid in _users_with_sales(user_id, batch_size):
+        fresh = build_orders(uid)
+        history = order_history_repo.get_by_user_id(uid)
+        result["checked"] += 1
+        if history is not None and history.orders == fresh:
+            continue
+        result["missing" if history is None else "stale"] += 1
+        if progress:
+            progress(uid, "missing" if history is None else "stale")
+        if repair:
+            order_history_repo.save(uid, fresh, history)
+            result["repaired"] += 1
+    return result
+
+def rebuild(user_id: int = None, batch_size: int = 500) -> int:
+    """Rewrite the documents of every user with sales (or just user_id); returns how many"""
+    rebuilt = 0
+    for uid in _users_with_sales(user_id, batch_size):
+        order_history_repo.save(uid, build_orders(uid))
+        rebuilt += 1
+    return rebuilt
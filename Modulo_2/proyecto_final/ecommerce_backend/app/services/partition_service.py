@@ -0,0 +1,59 @@
+# app/services/partition_service.py
+"""
+Monthly range partitions of `sales` (sale_date) and `invoices` (issue_date).
+
+On PostgreSQL the d2f8a4c61e07 migration turns both tables into
+PARTITION BY RANGE tables with one partition per month plus a DEFAULT
+partition. Date-range reports and analytics filter directly on the partition
+key, so the planner only scans the months they cover and old months can be
+detached or archived as a whole. `flask partitions ensure` (daily cron) keeps
+PARTITION_MONTHS_AHEAD months created in advance; anything that still falls
+outside lands in the default partition and is moved out when its month is
+created. SQLite (tests) keeps plain tables and every function here is a no-op.
+"""
+from datetime import date
+from typing import Dict, List
+from flask import current_app
+import app.repos.partition_repo as partition_repo
+
+# partitioned table -> partition key
+PARTITIONED_TABLES = {"sales": "sale_date", "invoices": "issue_date"}
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    """sales, 2025-03-01 -> sales_y2025m03 (same names as the migration)"""
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+def ensure_partitions(months_ahead: int = None, today: date = None) -> List[str]:
+    """Create the missing monthly partitions from this month to months_ahead; returns their names"""
+    if not partition_repo.is_postgresql():
+        return []
+    if months_ahead is None:
+        months_ahead = current_app.config.get("PARTITION_MONTHS_AHEAD", 3)
+    first = month_start(today or date.today())
+    
+    created = []
+    for table, column in PARTITIONED_TABLES.items():
+        if not partition_repo.is_partitioned(table):
+            continue
+        existing = {partition["name"] for partition in partition_repo.get_partitions(table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(first, offset)
+            name = partition_name(table, month)
+            if name not in existing:
+                partition_repo.create_month_partition(table, column, name, month, add_months(month, 1))
+                created.append(name)
+    return created
+
+def get_partitions() -> Dict[str, List[Dict]]:
+    """Partitions of every partitioned table (empty lists when not partitioned)"""
+    return {
+        table: partition_repo.get_partitions(table) if partition_repo.is_partitioned(table) else []
+        for table in PARTITIONED_TABLES
+    }
@@ -1,12 +1,15 @@
+from typing import List, Tuple
 import app.repos.product_repo as product_repo
+import app.services.inventory_service as inventory_service
 from app.utils.exceptions import (
     ProductNotFoundError,
     ProductNameInUseError,
     AppError,
     RepoError
 )
+from app.extensions import cache
 from app.utils.cache_decorators import cached_response
-from app.services.cache_service import invalidate_product_cache
+from app.services.cache_service import CacheKeys, invalidate_product_cache, get_cache_version
 
 def create_product(data: dict):
     try:
@@ -20,20 +23,97 @@ def create_product(data: dict):
         print(f"Unexpected error while creating product: {e}")
         raise AppError(f"Could not create product: {e}")
 
+PRODUCT_CACHE_TIMEOUT = 3600
+MULTI_GET_MAX_IDS = 100
+
+def product_cache_key(product_id: int) -> str:
+    """Per-product cache entry shared by GET /products/<id> and GET /products?ids="""
+    return f"{CacheKeys.PRODUCT_BY_ID}_{product_id}"
+
 # CRÍTICO - Cache largo para productos individuales (1 hora)
-@cached_response(timeout=3600, key_prefix="products.get_by_id")
 def get_product_by_id(product_id: int):
-    product = product_repo.get_by_id(product_id)
-    if not product:
-        raise ProductNotFoundError()
+    try:
+        product = cache.get(product_cache_key(product_id))
+    except Exception as e:
+        print(f"Error reading product cache: {e}")
+        product = None
+    if product is None:
+        product = product_repo.get_by_id(product_id)
+        if not product:
+            raise ProductNotFoundError()
+        try:
+            cache.set(product_cache_key(product_id), product, timeout=PRODUCT_CACHE_TIMEOUT)
+        except Exception as e:
+            print(f"Error caching product: {e}")
     return product
 
+def get_products_by_ids(product_ids: List[int]) -> Tuple[List, List[int]]:
+    """
+    Products for a list of ids, in request order, plus the ids that do not exist.
+    Cached products come from one MGET; the misses are fetched with a single IN
+    query and written back in one pipelined SET batch.
+    """
+    product_ids = list(dict.fromkeys(product_ids))  # drop duplicates, keep order
+    keys = [product_cache_key(product_id) for product_id in product_ids]
+    try:
+        cached = cache.get_many(*keys)
+    except Exception as e:
+        print(f"Error reading product cache: {e}")
+        cached = [None] * len(keys)
+    
+    found = {product_id: product for product_id, product in zip(product_ids, cached) if product is not None}
+    misses = [product_id for product_id in product_ids if product_id not in found]
+    if misses:
+        loaded = {product.id: product for product in product_repo.get_by_ids(misses)}
+        found.update(loaded)
+        if loaded:
+            try:
+                cache.set_many({product_cache_key(pid): product for pid, product in loaded.items()},
+                               timeout=PRODUCT_CACHE_TIMEOUT)
+            except Exception as e:
+                print(f"Error caching products: {e}")
+    
+    products = [found[product_id] for product_id in product_ids if product_id in found]
+    missing = [product_id for product_id in product_ids if product_id not in found]
+    return products, missing
+
 # CRÍTICO - Cache largo para catálogo de productos (30 min)
 @cached_response(timeout=1800, key_prefix="products.get_all")
 def get_all_products():
     return product_repo.get_all()
 
+def get_products_validator():
+    """
+    Conditional GET validator for the catalog: product namespace version plus
+    MAX(updated_at)/count, cached per version so unchanged polls skip the database
+    """
+    version = get_cache_version(CacheKeys.PRODUCTS_VERSION)
+    cache_key = f"{CacheKeys.PRODUCTS_VALIDATOR}_v{version}"
+    try:
+        validator = cache.get(cache_key)
+    except Exception as e:
+        print(f"Error reading products validator: {e}")
+        validator = None
+    if validator is None:
+        last_modified, count = product_repo.get_list_validator()
+        validator = ((version, count, last_modified), last_modified)
+        try:
+            cache.set(cache_key, validator, timeout=1800)
+        except Exception as e:
+            print(f"Error caching products validator: {e}")
+    return validator
+
+def get_product_validator(product_id: int):
+    """Conditional GET validator for one product (None if it does not exist)"""
+    updated_at = product_repo.get_updated_at(product_id)
+    if updated_at is None:
+        return None
+    return (get_cache_version(CacheKeys.PRODUCTS_VERSION), product_id, updated_at), updated_at
+
 def update_product(product_id: int, data: dict):
+    if "stock" in data and inventory_service.is_sharded(product_id):
+        data = dict(data)
+        inventory_service.set_stock(product_id, data.pop("stock"))
     updated_product = product_repo.update_product(product_id, data)
     if not updated_product:
         raise ProductNotFoundError()
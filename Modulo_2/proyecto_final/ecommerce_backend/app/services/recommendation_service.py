@@ -0,0 +1,108 @@
+# app/services/recommendation_service.py
+"""
+"Frequently bought together" recommendations.
+
+`product_cooccurrences` is a sparse, symmetric product x product matrix: how
+many sales contained both products. `flask recommendations rebuild` computes it
+from the full sale_products history in one streaming pass (baskets are read in
+sale order in chunks and their pairs counted in memory), and every checkout adds
+its own pairs with a single upsert. Sales committed while the rebuild streams are
+counted again during the swap; the rebuild is only exact with checkouts stopped,
+as a sale committed but not yet indexed at that moment is counted twice. The top-K neighbours of each product are
+cached under one key, so GET /products/<id>/related is one cache read plus the
+cached multi-get of the neighbour products.
+"""
+import time
+from collections import Counter
+from itertools import permutations
+from typing import Callable, Dict, List
+from flask import current_app
+import app.repos.recommendation_repo as recommendation_repo
+import app.services.product_service as product_service
+from app.extensions import cache
+from app.services.cache_service import CacheKeys, get_cache_version, bump_cache_version
+
+RELATED_CACHE_TIMEOUT = 3600
+# Pairs grow quadratically with basket size; bulk orders say little about affinity
+MAX_BASKET_SIZE = 50
+
+def related_cache_key(product_id: int) -> str:
+    """Versioned so a rebuild invalidates every product's neighbour list at once"""
+    return f"{CacheKeys.PRODUCT_RELATED}_v{get_cache_version(CacheKeys.RELATED_VERSION)}_{product_id}"
+
+def _top_k() -> int:
+    return current_app.config.get("RECOMMENDATIONS_TOP_K", 10)
+
+def basket_pairs(baskets: List[List[int]]) -> Counter:
+    """Ordered (product, other product) pair counts, one per sale containing both"""
+    counts = Counter()
+    for basket in baskets:
+        products = set(basket)
+        if 1 < len(products) <= MAX_BASKET_SIZE:
+            counts.update(permutations(sorted(products), 2))
+    return counts
+
+def rebuild_index(chunk_size: int = 50_000, progress: Callable = None) -> Dict[str, float]:
+    """Recompute the whole co-occurrence matrix from sale_products and swap it in"""
+    started = time.perf_counter()
+    cutoff = recommendation_repo.get_max_sale_id()
+    counts, sales, batch = Counter(), 0, []
+    for basket in recommendation_repo.iter_sale_baskets(chunk_size, up_to_sale_id=cutoff):
+        batch.append(basket)
+        if len(batch) >= chunk_size:
+            counts.update(basket_pairs(batch))
+            sales += len(batch)
+            batch = []
+            if progress:
+                progress(sales, len(counts))
+    counts.update(basket_pairs(batch))
+    sales += len(batch)
+    
+    late = []
+    
+    def late_counts():
+        """Checkouts committed since the cutoff: their increments are wiped by the swap"""
+        late.extend(recommendation_repo.iter_sale_baskets(chunk_size, after_sale_id=cutoff))
+        return basket_pairs(late)
+    
+    pairs = recommendation_repo.replace_all(counts, chunk_size, late_counts)
+    sales += len(late)
+    bump_cache_version(CacheKeys.RELATED_VERSION)
+    return {"sales": sales, "pairs": pairs, "elapsed_seconds": round(time.perf_counter() - started, 2)}
+
+def record_sales(baskets: List[List[int]]):
+    """
+    Add committed sales (lists of product ids) to the index and drop the cached
+    neighbour lists they change. Best effort: an error never fails a checkout.
+    """
+    counts = basket_pairs(baskets)
+    if not counts:
+        return
+    try:
+        recommendation_repo.increment_pairs(counts)
+        cache.delete_many(*[related_cache_key(product_id) for product_id in {a for a, _ in counts}])
+    except Exception as e:
+        print(f"Error updating co-occurrence index: {e}")
+
+def get_related(product_id: int, limit: int = None) -> List[Dict]:
+    """Products most often bought together with product_id, with the number of shared sales"""
+    product_service.get_product_by_id(product_id)  # 404 for unknown products (cached)
+    key = related_cache_key(product_id)
+    try:
+        neighbours = cache.get(key)
+    except Exception as e:
+        print(f"Error reading related products cache: {e}")
+        neighbours = None
+    if neighbours is None:
+        neighbours = recommendation_repo.get_top_related(product_id, _top_k())
+        try:
+            cache.set(key, neighbours, timeout=RELATED_CACHE_TIMEOUT)
+        except Exception as e:
+            print(f"Error caching related products: {e}")
+    
+    neighbours = neighbours[:limit] if limit else neighbours
+    if not neighbours:
+        return []
+    products, _ = product_service.get_products_by_ids([related_id for related_id, _ in neighbours])
+    by_id = {product.id: product for product in products}
+    return [{"product": by_id[related_id], "count": count} for related_id, count in neighbours if related_id in by_id]
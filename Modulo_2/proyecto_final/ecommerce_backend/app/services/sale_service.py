@@ -6,8 +6,14 @@ from app.extensions import db
 import app.repos.sale_repo as sale_repo
 import app.repos.cart_repo as cart_repo
 import app.repos.product_repo as product_repo
-import app.repos.delivery_address_repo as delivery_address_repo
 import app.services.cart_service as cart_service
+import app.services.archive_service as archive_service
+import app.services.delivery_address_service as delivery_address_service
+import app.services.inventory_service as inventory_service
+import app.services.leaderboard_service as leaderboard_service
+import app.services.order_history_service as order_history_service
+import app.services.recommendation_service as recommendation_service
+from app.services.cache_service import CacheKeys, get_cache_version
 from app.models.sale import Sale
 from app.models.sale_product import SaleProduct
 from app.models.cart import Cart
@@ -26,9 +32,9 @@ from app.utils.exceptions import (
     DeliveryAddressNotFoundError
 )
 
-def get_sale_by_id(sale_id: int, user_id: int = None) -> Sale:
+def get_sale_by_id(sale_id: int, user_id: int = None, load=()) -> Sale:
     """Get sale by ID with optional ownership validation"""
-    sale = sale_repo.get_by_id(sale_id)
+    sale = sale_repo.get_by_id(sale_id, load)
     if not sale:
         raise SaleNotFoundError("Sale not found")
     
@@ -38,23 +44,38 @@ def get_sale_by_id(sale_id: int, user_id: int = None) -> Sale:
     
     return sale
 
-def get_user_sales(user_id: int, start_date: datetime = None, end_date: datetime = None) -> List[Sale]:
+def get_sale_validator(sale_id: int, user_id: int = None):
+    """
+    Conditional GET validator for a sale detail response, from one aggregate query.
+    Returns None when the sale does not exist or belongs to another user so the
+    endpoint produces its usual 404/403.
+    """
+    row = sale_repo.get_sale_validator(sale_id)
+    if row is None or (user_id and row[0] != user_id):
+        return None
+    last_modified = max(stamp for stamp in row[2:7] if stamp is not None)
+    # Product updates within the same second still change the tag through the namespace version
+    return (tuple(row), get_cache_version(CacheKeys.PRODUCTS_VERSION)), last_modified
+
+def get_user_sales(user_id: int, start_date: datetime = None, end_date: datetime = None,
+                   load=()) -> List[Sale]:
     """Get all sales for a user with optional date filtering"""
     try:
         if start_date or end_date:
-            return sale_repo.get_sales_by_date_range(user_id, start_date, end_date)
+            return sale_repo.get_sales_by_date_range(user_id, start_date, end_date, load)
         else:
-            return sale_repo.get_by_user_id(user_id)
+            return sale_repo.get_by_user_id(user_id, load)
     except RepoError as e:
         raise SaleError(f"Error retrieving user sales: {str(e)}")
 
-def get_all_sales(user_id: int = None, start_date: datetime = None, end_date: datetime = None) -> List[Sale]:
+def get_all_sales(user_id: int = None, start_date: datetime = None, end_date: datetime = None,
+                  load=()) -> List[Sale]:
     """Get all sales with optional filtering (admin function)"""
     try:
         if start_date or end_date or user_id:
-            return sale_repo.get_sales_by_date_range(user_id, start_date, end_date)
+            return sale_repo.get_sales_by_date_range(user_id, start_date, end_date, load)
         else:
-            return sale_repo.get_all()
+            return sale_repo.get_all(load)
     except RepoError as e:
         raise SaleError(f"Error retrieving sales: {str(e)}")
 
@@ -78,8 +99,8 @@ def create_sale_from_cart(user_id: int, cart_id: int, delivery_address_id: int,
         if cart.status != "active":
             raise CartNotActiveError("Cart is not active")
         
-        # Validate delivery address ownership
-        delivery_address = delivery_address_repo.get_delivery_address_by_id(delivery_address_id)
+        # Validate delivery address ownership (already loaded if the security layer checked it)
+        delivery_address = delivery_address_service.get_delivery_address_by_id(delivery_address_id)
         if not delivery_address:
             raise DeliveryAddressNotFoundError("Delivery address not found")
         
@@ -123,26 +144,19 @@ def create_sale_from_cart(user_id: int, cart_id: int, delivery_address_id: int,
                     'price': product.price  # Store current price at time of sale
                 })
             
-            # Create the sale
-            sale = sale_repo.create_sale(user_id, total_amount)
+            # Take the stock first (conditional decrements, spread over shards for hot products),
+            # in product id order so concurrent checkouts lock rows in the same order. Nothing
+            # is committed until the sale exists: a failed decrement rolls everything back.
+            for product_data in sorted(sale_products_data, key=lambda item: item['product_id']):
+                inventory_service.decrement_stock(product_data['product_id'], product_data['quantity'], commit=False)
             
-            # Add products to sale and update stock
-            for product_data in sale_products_data:
-                # Add product to sale
-                sale_repo.add_product_to_sale(
-                    sale.id,
-                    product_data['product_id'],
-                    product_data['quantity'],
-                    product_data['price']
-                )
-                
-                # Update product stock
-                product = product_repo.get_by_id(product_data['product_id'])
-                new_stock = product.stock - product_data['quantity']
-                product_repo.update_product(product_data['product_id'], {'stock': new_stock})
+            # Create the sale with its products and mark the cart as converted (single commit)
+            sale = sale_repo.create_sale_from_cart(user_id, total_amount, sale_products_data, cart_id)
             
-            # Mark cart as converted
-            cart_service.update_cart_status(cart_id, "converted", user_id)
+            # Best-seller leaderboards (Redis sorted sets, best effort)
+            leaderboard_service.record_sale(sale_products_data)
+            recommendation_service.record_sales([[item['product_id'] for item in sale_products_data]])
+            order_history_service.refresh_order(user_id, sale.id)
             
             return sale
             
@@ -164,6 +178,7 @@ def update_sale(sale_id: int, data: dict, user_id: int = None) -> Sale:
         if not updated_sale:
             raise SaleNotFoundError("Sale not found")
         
+        order_history_service.refresh_order(updated_sale.user_id, sale_id)
         return updated_sale
     except RepoError as e:
         raise SaleError(f"Error updating sale: {str(e)}")
@@ -238,29 +253,11 @@ def get_user_sales_summary(user_id: int) -> Dict[str, Any]:
         raise SaleError(f"Error getting user sales summary: {str(e)}")
 
 def get_sales_analytics(start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
-    """Get sales analytics for admin dashboard"""
+    """Get sales analytics for admin dashboard (live sales merged with the cold-data archive)"""
     try:
         # Get sales in date range
         sales = sale_repo.get_sales_by_date_range(None, start_date, end_date)
         
-        if not sales:
-            return {
-                'total_sales': 0,
-                'total_revenue': 0.0,
-                'average_order_value': 0.0,
-                'total_customers': 0,
-                'sales_by_day': {},
-                'top_customers': []
-            }
-        
-        # Basic metrics
-        total_sales = len(sales)
-        total_revenue = sum(float(sale.total) for sale in sales)
-        average_order_value = total_revenue / total_sales if total_sales > 0 else 0.0
-        
-        # Unique customers
-        unique_customers = len(set(sale.user_id for sale in sales))
-        
         # Sales by day
         sales_by_day = {}
         for sale in sales:
@@ -270,7 +267,7 @@ def get_sales_analytics(start_date: datetime = None, end_date: datetime = None)
             sales_by_day[day]['count'] += 1
             sales_by_day[day]['revenue'] += float(sale.total)
         
-        # Top customers by total spent
+        # Totals by customer
         customer_totals = {}
         for sale in sales:
             if sale.user_id not in customer_totals:
@@ -278,6 +275,27 @@ def get_sales_analytics(start_date: datetime = None, end_date: datetime = None)
             customer_totals[sale.user_id]['sales_count'] += 1
             customer_totals[sale.user_id]['total_spent'] += float(sale.total)
         
+        # Archived months (flask archive run) are no longer in the sales table
+        archive_service.merge_sales_analytics(start_date, end_date, sales_by_day, customer_totals)
+        
+        if not sales_by_day:
+            return {
+                'total_sales': 0,
+                'total_revenue': 0.0,
+                'average_order_value': 0.0,
+                'total_customers': 0,
+                'sales_by_day': {},
+                'top_customers': []
+            }
+        
+        # Basic metrics
+        total_sales = sum(day['count'] for day in sales_by_day.values())
+        total_revenue = sum(day['revenue'] for day in sales_by_day.values())
+        average_order_value = total_revenue / total_sales if total_sales > 0 else 0.0
+        
+        # Unique customers
+        unique_customers = len(customer_totals)
+        
         # Sort customers by total spent
         top_customers = sorted(
             customer_totals.items(),
@@ -0,0 +1,222 @@
+# app/services/seed_service.py
+"""
+Synthetic production-scale dataset generator (flask seed).
+
+Rows follow the models in app/models and are generated in chunks so memory
+stays flat for millions of rows:
+- product popularity is Zipfian (a few best sellers, a long tail)
+- customers are Zipfian too, so a minority places most orders (repeat customers)
+- sale dates follow seasonality: November/December peaks, weekends and evenings
+Everything comes from one random.Random(seed), so the same arguments always
+produce the same data.
+"""
+import bisect
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Callable, Dict, Optional
+from werkzeug.security import generate_password_hash
+import app.repos.bulk_repo as bulk_repo
+from app.models.cart import Cart
+from app.models.cart_product import CartProduct
+from app.models.delivery_address import DeliveryAddress
+from app.models.invoice import Invoice
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.user import User
+
+SEED_PASSWORD = "seed-password"
+CITIES = [("San Jose", "CR"), ("Heredia", "CR"), ("Alajuela", "CR"), ("Cartago", "CR"), ("Panama", "PA"),
+          ("Managua", "NI"), ("Guatemala", "GT"), ("Bogota", "CO"), ("Mexico City", "MX"), ("Madrid", "ES")]
+CATEGORIES = ["Dog Food", "Cat Toy", "Bird Cage", "Fish Tank", "Leash", "Collar", "Shampoo", "Treats",
+              "Litter", "Bed", "Bowl", "Brush", "Vitamins", "Aquarium Filter", "Scratching Post"]
+ADJECTIVES = ["Premium", "Classic", "Deluxe", "Eco", "Compact", "Large", "Organic", "Travel", "Smart", "Basic"]
+# Relative order volume per month (Jan..Dec) and per weekday (Mon..Sun)
+MONTH_WEIGHTS = [0.8, 0.75, 0.9, 0.9, 1.0, 0.95, 1.0, 1.05, 0.95, 1.05, 1.45, 1.9]
+WEEKDAY_WEIGHTS = [0.9, 0.9, 0.95, 1.0, 1.1, 1.25, 1.15]
+HOUR_WEIGHTS = [0.2, 0.1, 0.05, 0.05, 0.05, 0.1, 0.3, 0.6, 0.8, 0.9, 1.0, 1.1,
+                1.2, 1.1, 1.0, 1.0, 1.1, 1.2, 1.4, 1.6, 1.7, 1.5, 1.0, 0.5]
+ITEMS_PER_ORDER_WEIGHTS = [0.45, 0.25, 0.15, 0.1, 0.05]  # 1..5 distinct products
+CART_STATUS_WEIGHTS = {"converted": 0.5, "abandoned": 0.3, "expired": 0.15, "active": 0.05}
+
+def _zipf_cumulative(n: int, s: float):
+    return list(accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+class _Picker:
+    """Weighted sampling over 0..n-1 with precomputed cumulative weights (bisect, O(log n))"""
+
+    def __init__(self, rng, cumulative):
+        self._rng = rng
+        self._cumulative = cumulative
+        self._total = cumulative[-1]
+        self._last = len(cumulative) - 1
+
+    def __call__(self):
+        return min(bisect.bisect(self._cumulative, self._rng.random() * self._total), self._last)
+
+    def distinct(self, k):
+        picked = set()
+        for _ in range(k * 4):  # skewed weights repeat popular picks, retry a bounded number of times
+            picked.add(self())
+            if len(picked) == k:
+                break
+        return picked
+
+def _fmt_dt(value: datetime) -> str:
+    return value.isoformat(sep=" ")
+
+def _seasonal_dates(rng, start: datetime, end: datetime):
+    """Return a function producing datetimes in [start, end) weighted by month, weekday and hour"""
+    days = max(1, (end - start).days)
+    day_weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        day_weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()])
+    pick_day = _Picker(rng, list(accumulate(day_weights)))
+    pick_hour = _Picker(rng, list(accumulate(HOUR_WEIGHTS)))
+    start_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def next_date():
+        return start_day + timedelta(days=pick_day(), hours=pick_hour(), seconds=rng.randrange(3600))
+    return next_date
+
+def _load(table, columns, rows, stats, progress):
+    started = time.perf_counter()
+    written = bulk_repo.bulk_insert(table, columns, rows)
+    stats[table.name] = stats.get(table.name, 0) + written
+    if progress:
+        progress(table.name, written, time.perf_counter() - started)
+
+def seed_database(users: int = 1000, products: int = 500, sales: int = 5000, carts: int = 2000,
+                  invoice_ratio: float = 0.7, seed: int = 42, chunk_size: int = 50_000,
+                  start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                  progress: Callable[[str, int, float], None] = None) -> Dict[str, int]:
+    """
+    Generate and bulk-load a synthetic dataset, appending after existing ids.
+
+    Returns:
+        Rows inserted per table plus 'elapsed_seconds'
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime(2025, 1, 1)
+    start_date = start_date or end_date - timedelta(days=730)
+    next_date = _seasonal_dates(rng, start_date, end_date)
+    stats: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    first_user, first_address, first_product = (bulk_repo.next_id(User), bulk_repo.next_id(DeliveryAddress),
+                                                bulk_repo.next_id(Product))
+    first_sale, first_invoice, first_cart = (bulk_repo.next_id(Sale), bulk_repo.next_id(Invoice),
+                                             bulk_repo.next_id(Cart))
+
+    # ----- users and delivery addresses (1-3 per user) -----
+    password_hash = generate_password_hash(SEED_PASSWORD)  # one hash for everyone keeps loading fast
+    address_start, address_count = [], []
+    user_columns = ("id", "email", "password_hash", "role", "is_active", "name", "phone", "created_at", "updated_at")
+    address_columns = ("id", "user_id", "address", "city", "postal_code", "country", "created_at", "updated_at")
+    address_id = first_address
+    for chunk_start in range(0, users, chunk_size):
+        user_rows, address_rows = [], []
+        for index in range(chunk_start, min(users, chunk_start + chunk_size)):
+            user_id = first_user + index
+            joined = _fmt_dt(start_date - timedelta(days=rng.randrange(365)))
+            user_rows.append((user_id, f"customer{user_id}@seed.example", password_hash, "customer", True,
+                              f"Customer {user_id}", f"+506{rng.randrange(10_000_000, 99_999_999)}", joined, joined))
+            count = rng.choice((1, 1, 1, 2, 2, 3))
+            address_start.append(address_id)
+            address_count.append(count)
+            for _ in range(count):
+                city, country = rng.choice(CITIES)
+                address_rows.append((address_id, user_id, f"{rng.randrange(1, 9999)} {rng.choice(ADJECTIVES)} Street",
+                                     city, f"{rng.randrange(10000, 99999)}", country, joined, joined))
+                address_id += 1
+        _load(User.__table__, user_columns, user_rows, stats, progress)
+        _load(DeliveryAddress.__table__, address_columns, address_rows, stats, progress)
+
+    # ----- products -----
+    prices = []
+    product_columns = ("id", "name", "description", "price", "stock", "created_at", "updated_at")
+    for chunk_start in range(0, products, chunk_size):
+        product_rows = []
+        for index in range(chunk_start, min(products, chunk_start + chunk_size)):
+            product_id = first_product + index
+            price = Decimal(rng.randrange(199, 49999)) / 100
+            prices.append(price)
+            created = _fmt_dt(start_date - timedelta(days=rng.randrange(30)))
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(CATEGORIES)} {product_id}"
+            product_rows.append((product_id, name, f"Synthetic product {product_id}", str(price),
+                                 rng.randrange(0, 1000), created, created))
+        _load(Product.__table__, product_columns, product_rows, stats, progress)
+
+    if not users or not products:
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        return stats
+
+    pick_product = _Picker(rng, _zipf_cumulative(products, 1.07))
+    # Shuffle which users are "heavy" so popularity is not tied to id order
+    customer_order = list(range(users))
+    rng.shuffle(customer_order)
+    pick_rank = _Picker(rng, _zipf_cumulative(users, 0.5))
+    pick_items = _Picker(rng, list(accumulate(ITEMS_PER_ORDER_WEIGHTS)))
+
+    # ----- sales, sale_products and invoices -----
+    sale_columns = ("id", "user_id", "sale_date", "total", "created_at", "updated_at")
+    item_columns = ("sale_id", "product_id", "quantity", "price", "created_at", "updated_at")
+    invoice_columns = ("id", "sale_id", "delivery_address_id", "issue_date", "created_at", "updated_at")
+    invoice_id = first_invoice
+    for chunk_start in range(0, sales, chunk_size):
+        sale_rows, item_rows, invoice_rows = [], [], []
+        for index in range(chunk_start, min(sales, chunk_start + chunk_size)):
+            sale_id = first_sale + index
+            customer = customer_order[pick_rank()]
+            sold_at = next_date()
+            stamp = _fmt_dt(sold_at)
+            total = Decimal(0)
+            for product_index in pick_product.distinct(pick_items() + 1):
+                quantity = rng.choice((1, 1, 1, 2, 2, 3))
+                price = prices[product_index]
+                total += price * quantity
+                item_rows.append((sale_id, first_product + product_index, quantity, str(price), stamp, stamp))
+            sale_rows.append((sale_id, first_user + customer, stamp, str(total), stamp, stamp))
+            if rng.random() < invoice_ratio:
+                address = address_start[customer] + rng.randrange(address_count[customer])
+                issued = _fmt_dt(sold_at + timedelta(minutes=rng.randrange(1, 180)))
+                invoice_rows.append((invoice_id, sale_id, address, issued, issued, issued))
+                invoice_id += 1
+        _load(Sale.__table__, sale_columns, sale_rows, stats, progress)
+        _load(SaleProduct.__table__, item_columns, item_rows, stats, progress)
+        _load(Invoice.__table__, invoice_columns, invoice_rows, stats, progress)
+
+    # ----- carts and cart_products (at most one active cart per user) -----
+    statuses = list(CART_STATUS_WEIGHTS)
+    status_cumulative = list(accumulate(CART_STATUS_WEIGHTS.values()))
+    with_active_cart = set()
+    cart_columns = ("id", "user_id", "creation_date", "status", "created_at", "updated_at")
+    cart_product_columns = ("cart_id", "product_id", "quantity", "updated_at")
+    for chunk_start in range(0, carts, chunk_size):
+        cart_rows, cart_product_rows = [], []
+        for index in range(chunk_start, min(carts, chunk_start + chunk_size)):
+            cart_id = first_cart + index
+            customer = customer_order[pick_rank()]
+            status = rng.choices(statuses, cum_weights=status_cumulative)[0]
+            if status == "active":
+                if customer in with_active_cart:
+                    status = "abandoned"
+                else:
+                    with_active_cart.add(customer)
+            created = next_date()
+            updated = _fmt_dt(created + timedelta(hours=rng.randrange(1, 72)))
+            cart_rows.append((cart_id, first_user + customer, _fmt_dt(created), status, _fmt_dt(created), updated))
+            for product_index in pick_product.distinct(pick_items() + 1):
+                cart_product_rows.append((cart_id, first_product + product_index, rng.randint(1, 3), updated))
+        _load(Cart.__table__, cart_columns, cart_rows, stats, progress)
+        _load(CartProduct.__table__, cart_product_columns, cart_product_rows, stats, progress)
+
+    for model in (User, DeliveryAddress, Product, Sale, Invoice, Cart):
+        bulk_repo.reset_sequence(model.__table__)
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+    return stats
@@ -1,5 +1,6 @@
 import app.repos.user_repo as user_repo
 import app.services.delivery_address_service as delivery_address_service
+import app.utils.identity_map as identity_map
 from app.utils.exceptions import (
     UserNotFoundError,
     AppError,
@@ -7,7 +8,7 @@ from app.utils.exceptions import (
 )
 
 def get_user_by_id(user_id: int):
-    user = user_repo.get_by_id(user_id)
+    user = identity_map.get_or_load("user", user_id, user_repo.get_by_id)
     if not user:  # If user NOT found
         raise UserNotFoundError()
     return user
@@ -22,6 +23,7 @@ def update_user(user_id: int, data: dict):
     return updated_user
 
 def delete_user(user_id: int):
+    identity_map.forget("user", user_id)
     deleted_user = user_repo.delete_user(user_id)
     if not deleted_user:  # If delete failed (user not found)
         raise UserNotFoundError()
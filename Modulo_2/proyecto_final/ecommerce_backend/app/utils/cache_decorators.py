@@ -1,8 +1,11 @@
+import hashlib
+import time
 from functools import wraps
-from flask import request, current_app
+from flask import request, current_app, make_response
+from werkzeug.http import is_resource_modified
 from flask_jwt_extended import get_jwt_identity
 from app.extensions import cache
-from app.utils.exceptions import AppError
+from app.utils.exceptions import AppError, json_error
 
 def cached_response(timeout=300, key_prefix=None, include_user=False):
     """
@@ -88,3 +91,134 @@ def invalidate_cache_pattern(pattern):
                 raise
         return wrapper
     return decorator
+
+def conditional_get(validator, include_user=False):
+    """
+    ETag/Last-Modified support that answers 304 before the view runs
+    
+    Args:
+        validator: Called with the view kwargs; returns (etag_parts, last_modified)
+                   or None when the resource cannot be validated (not found, not owned)
+        include_user: Also pass user_id (JWT identity) to the validator
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                validator_kwargs = dict(kwargs)
+                if include_user:
+                    validator_kwargs["user_id"] = int(get_jwt_identity())
+                validators = validator(**validator_kwargs)
+            except Exception as e:
+                # Follow repo's error handling pattern: serve the full response instead
+                print(f"Conditional GET error in {func.__name__}: {e}")
+                validators = None
+            
+            if not validators:
+                return func(*args, **kwargs)
+            
+            etag_parts, last_modified = validators
+            # Query args change the body (include_summary, include_details...), so they are part of the tag
+            etag = hashlib.sha1(repr((request.path, request.query_string, etag_parts)).encode()).hexdigest()
+            
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            # Clients may keep the body but must revalidate it on every use
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+def idempotent(key_prefix, ttl=None, lock_timeout=None, wait_timeout=None):
+    """
+    Idempotency-Key support for unsafe endpoints (checkout, invoice creation)
+    
+    The first request with a given key runs the view and its response is stored
+    (statuses below 500, except 429) for `ttl` seconds; retries with the same key and body get
+    it replayed with an `Idempotent-Replayed: true` header. A duplicate arriving
+    while the first is still running waits for its result instead of recomputing.
+    Keys are scoped per user. Requests without the header are not affected.
+    
+    Args:
+        key_prefix: Namespace for the stored responses (e.g. "checkout")
+        ttl: Seconds a completed response is kept (IDEMPOTENCY_TTL)
+        lock_timeout: Seconds an in-progress marker lives if its owner dies (IDEMPOTENCY_LOCK_TIMEOUT)
+        wait_timeout: Seconds a concurrent duplicate waits before giving up with 409 (IDEMPOTENCY_WAIT_TIMEOUT)
+    """
+    from app.services.cache_service import CacheKeys, add_if_absent
+    
+    def replay(stored):
+        response = current_app.response_class(stored["body"], status=stored["status"], mimetype=stored["mimetype"])
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+    
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            idempotency_key = request.headers.get("Idempotency-Key")
+            if not idempotency_key:
+                return func(*args, **kwargs)
+            if len(idempotency_key) > 255:
+                return json_error("Idempotency-Key must be at most 255 characters", 400)
+            
+            config = current_app.config
+            store_ttl = ttl or config.get("IDEMPOTENCY_TTL", 86400)
+            marker_ttl = lock_timeout or config.get("IDEMPOTENCY_LOCK_TIMEOUT", 30)
+            max_wait = wait_timeout if wait_timeout is not None else config.get("IDEMPOTENCY_WAIT_TIMEOUT", 10)
+            
+            user_id = get_jwt_identity() or request.remote_addr
+            cache_key = f"{CacheKeys.IDEMPOTENCY}.{key_prefix}.{user_id}.{idempotency_key}"
+            fingerprint = hashlib.sha256(request.method.encode() + request.path.encode() + request.get_data()).hexdigest()
+            
+            try:
+                deadline = time.monotonic() + max_wait
+                while True:
+                    stored = cache.get(cache_key)
+                    if stored is not None and stored["fingerprint"] != fingerprint:
+                        return json_error("Idempotency-Key was already used with a different request", 422)
+                    if stored is not None and stored["state"] == "completed":
+                        return replay(stored)
+                    if stored is None and add_if_absent(cache_key, {"state": "in_progress", "fingerprint": fingerprint}, marker_ttl):
+                        break  # this request owns the key
+                    if time.monotonic() >= deadline:
+                        response = make_response(json_error("A request with this Idempotency-Key is still being processed", 409))
+                        response.headers["Retry-After"] = "1"
+                        return response
+                    time.sleep(0.05)
+            except Exception as e:
+                # Follow repo's error handling pattern: without the store, run the request normally
+                print(f"Idempotency store error in {func.__name__}: {e}")
+                return func(*args, **kwargs)
+            
+            try:
+                response = make_response(func(*args, **kwargs))
+            except Exception:
+                cache.delete(cache_key)
+                raise
+            
+            try:
+                if response.status_code < 500 and response.status_code != 429:
+                    cache.set(cache_key, {
+                        "state": "completed",
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "mimetype": response.mimetype,
+                        "body": response.get_data()
+                    }, timeout=store_ttl)
+                else:
+                    # Server errors and rate-limit rejections are not final: let the client retry for real
+                    cache.delete(cache_key)
+            except Exception as e:
+                print(f"Idempotency store error in {func.__name__}: {e}")
+            return response
+        return wrapper
+    return decorator
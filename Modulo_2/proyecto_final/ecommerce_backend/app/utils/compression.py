@@ -0,0 +1,117 @@
+# app/utils/compression.py
+import hashlib
+import zlib
+from flask import request
+from app.extensions import cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSED_CACHE_PREFIX = "compressed"
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+def _compressor(encoding, config):
+    if encoding == "br":
+        return _BrotliStream(config["COMPRESS_BR_QUALITY"])
+    return _GzipStream(config["COMPRESS_LEVEL"])
+
+def _stream(chunks, compressor):
+    """Compress an iterable of byte chunks as it is sent"""
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _compress_body(body, encoding, config, etag):
+    """
+    Compress a buffered body, reusing a cached variant when possible. The key is
+    the response ETag when there is one (no hashing needed) or a digest of the body.
+    """
+    timeout = config["COMPRESS_CACHE_TIMEOUT"]
+    if not timeout:
+        compressor = _compressor(encoding, config)
+        return compressor.compress(body) + compressor.flush()
+
+    variant = etag or hashlib.sha1(body).hexdigest()
+    cache_key = f"{COMPRESSED_CACHE_PREFIX}.{encoding}.{request.path}.{variant}"
+    try:
+        compressed = cache.get(cache_key)
+    except Exception as e:
+        print(f"Error reading compressed response cache: {e}")
+        compressed = None
+    if compressed is None:
+        compressor = _compressor(encoding, config)
+        compressed = compressor.compress(body) + compressor.flush()
+        try:
+            cache.set(cache_key, compressed, timeout=timeout)
+        except Exception as e:
+            print(f"Error caching compressed response: {e}")
+    return compressed
+
+def compress_response(response, config):
+    """after_request hook: gzip/brotli encode JSON and text responses the client accepts"""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config["COMPRESS_MIMETYPES"]):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+    encoding = request.accept_encodings.best_match(encodings)
+    if not encoding or request.method == "HEAD":
+        return response
+
+    if response.is_streamed:
+        # Size is unknown up front: compress chunk by chunk and let the server chunk the output
+        response.response = _stream(response.iter_encoded(), _compressor(encoding, config))
+        response.headers.pop("Content-Length", None)
+        response.direct_passthrough = False
+    else:
+        body = response.get_data()
+        if len(body) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        etag, _ = response.get_etag()
+        response.set_data(_compress_body(body, encoding, config, etag))
+
+    response.headers["Content-Encoding"] = encoding
+    # The encoded body differs byte-wise but not semantically, so the validator becomes weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app):
+    app.config.setdefault("COMPRESS_ENABLED", True)
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BR_QUALITY", 4)
+    app.config.setdefault("COMPRESS_CACHE_TIMEOUT", 300)
+    app.config.setdefault("COMPRESS_MIMETYPES", ["application/json", "text/plain", "text/csv", "text/html"])
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, app.config)
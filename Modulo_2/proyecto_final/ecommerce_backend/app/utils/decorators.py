@@ -3,6 +3,7 @@ from functools import wraps
 from flask import request, jsonify
 from marshmallow import ValidationError
 from app.utils.exceptions import AppError, json_error
+from app.utils.metrics import record_app_error
 
 
 def handle_errors(operation_name: str, handle_validation: bool = False):
@@ -25,6 +26,7 @@ def handle_errors(operation_name: str, handle_validation: bool = False):
                     # Re-raise if not handling validation errors
                     raise
             except AppError as err:
+                record_app_error(err)
                 return json_error(err.message, err.status)
             except Exception as e:
                 print(f"Unexpected error while {operation_name}: {e}")
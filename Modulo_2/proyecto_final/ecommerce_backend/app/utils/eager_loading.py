@@ -0,0 +1,23 @@
+# app/utils/eager_loading.py
+from typing import Iterable
+from sqlalchemy.orm import joinedload, selectinload
+
+def eager_options(model, paths: Iterable[str]) -> list:
+    """
+    Loader options for `model` that load every relationship path up front, e.g.
+    ("sale", "sale.user") -> joinedload(Invoice.sale).joinedload(Sale.user).
+    Collections use selectinload (one extra IN query per level), many-to-one
+    relationships joinedload; paths that prefix a longer one are implied by it.
+    """
+    paths = set(paths)
+    leaves = sorted(p for p in paths if not any(other.startswith(p + ".") for other in paths))
+    options = []
+    for path in leaves:
+        loader, current = None, model
+        for name in path.split("."):
+            attribute = getattr(current, name)
+            strategy = selectinload if attribute.property.uselist else joinedload
+            loader = strategy(attribute) if loader is None else getattr(loader, strategy.__name__)(attribute)
+            current = attribute.property.mapper.class_
+        options.append(loader)
+    return options
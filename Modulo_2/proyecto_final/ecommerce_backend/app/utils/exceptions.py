@@ -148,6 +148,13 @@ class InvoiceError(BadRequestError):
     message = "Invoice operation failed"
 
 
+# === CHECKOUT QUEUE ERRORS ===
+
+class CheckoutOrderNotFoundError(NotFoundError):
+    """Queued checkout order not found"""
+    message = "Checkout order not found"
+
+
 # === REPOSITORY ERRORS ===
 
 class RepoError(AppError):
@@ -155,6 +162,14 @@ class RepoError(AppError):
     status = 500
     message = "Database operation failed"
 
+
+# === ARCHIVE ERRORS ===
+
+class ArchiveError(AppError):
+    """Cold-data archive files missing, unreadable or not writable"""
+    status = 500
+    message = "Sales archive operation failed"
+
 # === MessageErrors ===
 
 def json_error(message: str, status: int):
@@ -0,0 +1,56 @@
+# app/utils/identity_map.py
+"""
+Request-scoped identity map stored on flask.g.
+
+Security decorators load the cart, delivery address or user they authorize and
+register it here; services look objects up here before going to the repos, so a
+request never fetches the same row twice (decorator, endpoint and checkout
+validation all share one instance). Outside a request every lookup goes straight
+to the loader. The map is cleared at the start and end of every request.
+"""
+from typing import Any, Callable, Hashable, Optional
+from flask import g, has_request_context
+
+def _store() -> Optional[dict]:
+    if not has_request_context():
+        return None
+    store = g.get("_identity_map")
+    if store is None:
+        store = g._identity_map = {}
+    return store
+
+def get_or_load(kind: str, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+    """Return the object registered as (kind, key), loading and registering it on a miss"""
+    store = _store()
+    if store is None:
+        return loader(key)
+    obj = store.get((kind, key))
+    if obj is None:
+        obj = loader(key)
+        if obj is not None:
+            store[(kind, key)] = obj
+    return obj
+
+def remember(kind: str, key: Hashable, obj: Any) -> None:
+    store = _store()
+    if store is not None and obj is not None:
+        store[(kind, key)] = obj
+
+def forget(kind: str, key: Hashable) -> None:
+    store = _store()
+    if store is not None:
+        store.pop((kind, key), None)
+
+def size() -> int:
+    """Number of objects held for the current request"""
+    store = _store()
+    return len(store) if store else 0
+
+def reset(*_) -> None:
+    if has_request_context():
+        g._identity_map = {}
+
+def init_identity_map(app):
+    # g outlives the request when an app context is already pushed (CLI, tests), so clear explicitly
+    app.before_request(reset)
+    app.teardown_request(reset)
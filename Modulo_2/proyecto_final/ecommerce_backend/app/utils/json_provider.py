@@ -0,0 +1,60 @@
+# app/utils/json_provider.py
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, Flask's stdlib provider is used without it
+    orjson = None
+
+def _default(o):
+    """Types orjson does not serialize natively (same output as Flask's provider)"""
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, date):
+        return http_date(o)  # datetimes and dates reach here through OPT_PASSTHROUGH_DATETIME
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Decimal prices and totals are written as strings and datetimes/dates as
+    HTTP dates ("Mon, 19 Oct 2026 07:00:00 GMT"), like the default provider;
+    UUIDs and dataclasses are serialized natively by orjson. Calls that pass
+    stdlib `json` keyword arguments fall back to the default provider so
+    extensions relying on them keep working.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+def init_json_provider(app):
+    """Install the orjson provider unless disabled via JSON_PROVIDER or orjson is missing"""
+    if app.config.get("JSON_PROVIDER", "orjson") == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
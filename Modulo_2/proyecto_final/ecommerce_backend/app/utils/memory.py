@@ -0,0 +1,147 @@
+# app/utils/memory.py
+"""
+Per-worker memory diagnostics and optional self-recycling.
+
+After every request the size of the SQLAlchemy session identity map (and of the
+request identity map in app/utils/identity_map.py) is recorded, so large `.all()`
+loads show up as high-water marks in GET /admin/memory. RSS, object counts by type
+and tracemalloc snapshot diffs are only computed when an admin asks for them.
+
+With MEMORY_MAX_REQUESTS or MEMORY_MAX_RSS_MB set, a worker that passes either
+limit sends itself MEMORY_RECYCLE_SIGNAL (SIGTERM) after finishing the response;
+gunicorn/uwsgi treat that as a graceful shutdown and start a fresh worker.
+"""
+import gc
+import os
+import resource
+import signal
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process, from /proc on Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def object_counts(limit: int = 20):
+    """Most common live Python object types (walks every tracked object: admin use only)"""
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+class MemoryStats:
+    """Request counter and identity map high-water marks for this worker"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.session_identity_map = {"last": 0, "max": 0, "total": 0}
+        self.request_identity_map = {"last": 0, "max": 0}
+        self.recycle_pending = False
+        self._snapshot = None
+        self._lock = threading.Lock()
+    
+    def record(self, session_objects: int, request_objects: int):
+        with self._lock:
+            self.requests += 1
+            stats = self.session_identity_map
+            stats["last"] = session_objects
+            stats["max"] = max(stats["max"], session_objects)
+            stats["total"] += session_objects
+            self.request_identity_map["last"] = request_objects
+            self.request_identity_map["max"] = max(self.request_identity_map["max"], request_objects)
+    
+    def report(self):
+        with self._lock:
+            session_map = dict(self.session_identity_map)
+            total = session_map.pop("total")
+            session_map["mean"] = round(total / self.requests, 2) if self.requests else 0
+            return {
+                "requests_served": self.requests,
+                "session_identity_map": session_map,
+                "request_identity_map": dict(self.request_identity_map),
+                "recycle_pending": self.recycle_pending
+            }
+    
+    def take_snapshot(self, frames: int = 10, limit: int = 20):
+        """
+        Take a tracemalloc snapshot and diff it with the previous one. The first call
+        starts tracing (which slows allocations) and only records a baseline.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+            ))
+            previous, self._snapshot = self._snapshot, snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        result = {"tracing": True, "traced_mb": round(current / 1024 / 1024, 2),
+                  "traced_peak_mb": round(peak / 1024 / 1024, 2), "baseline": previous is None, "top": []}
+        if previous is None:
+            return result
+        for stat in snapshot.compare_to(previous, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            result["top"].append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "size_kb": round(stat.size / 1024, 1),
+                "count_diff": stat.count_diff
+            })
+        return result
+    
+    def stop_tracing(self):
+        with self._lock:
+            self._snapshot = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+def _recycle(sig):
+    os.kill(os.getpid(), sig)
+
+def init_memory_diagnostics(app):
+    app.config.setdefault("MEMORY_DIAGNOSTICS_ENABLED", True)
+    app.config.setdefault("MEMORY_MAX_REQUESTS", 0)  # 0 = never recycle by request count
+    app.config.setdefault("MEMORY_MAX_RSS_MB", 0)  # 0 = never recycle by RSS
+    app.config.setdefault("MEMORY_RSS_CHECK_INTERVAL", 100)  # requests between RSS reads
+    app.config.setdefault("MEMORY_RECYCLE_SIGNAL", "SIGTERM")
+    if not app.config["MEMORY_DIAGNOSTICS_ENABLED"]:
+        return
+    from flask import g
+    from app.extensions import db
+    
+    app.extensions["memory_stats"] = MemoryStats()
+    max_requests = app.config["MEMORY_MAX_REQUESTS"]
+    max_rss = app.config["MEMORY_MAX_RSS_MB"]
+    check_interval = max(1, app.config["MEMORY_RSS_CHECK_INTERVAL"])
+    recycle_signal = getattr(signal, app.config["MEMORY_RECYCLE_SIGNAL"])
+    
+    @app.after_request
+    def _record_memory(response):
+        stats = app.extensions["memory_stats"]
+        request_map = g.get("_identity_map")
+        stats.record(len(db.session.identity_map), len(request_map) if request_map else 0)
+        if stats.recycle_pending or not (max_requests or max_rss):
+            return response
+        over_limit = bool(max_requests) and stats.requests >= max_requests
+        if not over_limit and max_rss and stats.requests % check_interval == 0:
+            rss = current_rss_mb()
+            over_limit = rss is not None and rss >= max_rss
+        if over_limit:
+            stats.recycle_pending = True
+            # Let the response finish first; the server replaces the worker after it exits
+            response.call_on_close(lambda: _recycle(recycle_signal))
+        return response
@@ -0,0 +1,122 @@
+# app/utils/metrics.py
+"""
+Prometheus metrics (GET /metrics).
+
+- http_request_duration_seconds: latency histogram by endpoint (e.g. "sales.checkout"), method and status
+- http_requests_in_progress: in-flight requests by endpoint
+- app_errors_total: AppError subclasses turned into responses by handle_errors
+- db_pool_checked_out / db_pool_overflow / db_pool_size and db_pool_wait_seconds per bind (primary, replica)
+
+With several worker processes, export PROMETHEUS_MULTIPROC_DIR (an empty directory
+shared by the workers) before the server starts: every worker writes its samples
+there and /metrics aggregates all of them, whichever worker answers the scrape.
+"""
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from app.utils.exceptions import AppError
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by Flask endpoint",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being served by Flask endpoint",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+APP_ERRORS = Counter("app_errors", "AppError subclasses returned to clients", ["error", "status"])
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out of the pool",
+                         ["bind"], multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond pool_size",
+                      ["bind"], multiprocess_mode="livesum")
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["bind"], multiprocess_mode="livesum")
+POOL_WAIT = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+                      ["bind"], buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+def _error_classes(base=AppError):
+    for subclass in base.__subclasses__():
+        yield subclass
+        yield from _error_classes(subclass)
+
+def record_app_error(error: AppError):
+    """Called by handle_errors for every AppError it converts into a response"""
+    APP_ERRORS.labels(type(error).__name__, str(error.status)).inc()
+
+def _instrument_pool(bind: str, engine):
+    from sqlalchemy import event
+    pool = engine.pool
+    
+    def update_gauges(*_):
+        POOL_CHECKED_OUT.labels(bind).set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            POOL_OVERFLOW.labels(bind).set(max(0, pool.overflow()))
+    
+    event.listen(pool, "checkout", update_gauges)
+    event.listen(pool, "checkin", update_gauges)
+    if hasattr(pool, "size"):
+        POOL_SIZE.labels(bind).set(pool.size())
+    
+    # Engine.raw_connection() calls pool.connect(), which blocks while the pool is exhausted
+    connect = pool.connect
+    
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.labels(bind).observe(time.perf_counter() - started)
+    pool.connect = timed_connect
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+def init_metrics(app):
+    app.config.setdefault("METRICS_ENABLED", True)
+    app.config.setdefault("METRICS_AUTH_TOKEN", None)  # optional bearer token required to scrape
+    if not app.config["METRICS_ENABLED"]:
+        return
+    from app.extensions import db
+    
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _instrument_pool(bind or "primary", engine)
+    for error_class in _error_classes():
+        APP_ERRORS.labels(error_class.__name__, str(error_class.status))  # export zeros
+    
+    @app.before_request
+    def _start_timer():
+        g._metrics_endpoint = request.endpoint or "unmatched"  # 404s share one label
+        g._metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(g._metrics_endpoint).inc()
+    
+    @app.after_request
+    def _record_status(response):
+        g._metrics_status = response.status_code
+        return response
+    
+    @app.teardown_request
+    def _observe(exc):
+        endpoint = g.pop("_metrics_endpoint", None)
+        if endpoint is None:
+            return
+        REQUESTS_IN_PROGRESS.labels(endpoint).dec()
+        status = g.pop("_metrics_status", 500)
+        REQUEST_LATENCY.labels(endpoint, request.method, str(status)).observe(
+            time.perf_counter() - g.pop("_metrics_started"))
+    
+    @app.get("/metrics")
+    def metrics():
+        token = app.config["METRICS_AUTH_TOKEN"]
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,135 @@
+# app/utils/profiling.py
+"""
+On-demand request profiling for admins.
+
+A request sent with the PROFILING_HEADER header (default "X-Profile: 1") and an admin
+JWT runs under cProfile. The pstats dump and its metadata (endpoint, status,
+duration) are written to a bounded directory (PROFILE_STORE_DIR, newest
+PROFILE_STORE_MAX kept) and the response carries "X-Profile-Id", which
+GET /admin/profiles/<id> downloads. Requests without the header only pay one header
+lookup; non-admin requests with the header are served normally and not profiled.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import uuid
+from flask import g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+class ProfileStore:
+    """Directory of <id>.prof (pstats) + <id>.json (metadata) pairs, newest max_entries kept"""
+    
+    def __init__(self, directory: str, max_entries: int = 20):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, profile_id: str, suffix: str) -> str:
+        if not PROFILE_ID.match(profile_id):
+            raise ValueError("Invalid profile id")
+        return os.path.join(self.directory, f"{profile_id}.{suffix}")
+    
+    def save(self, profiler: cProfile.Profile, metadata: dict) -> str:
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(self._path(profile_id, "prof"))
+        with open(self._path(profile_id, "json"), "w") as f:
+            json.dump({"id": profile_id, **metadata}, f)
+        self._prune()
+        return profile_id
+    
+    def _prune(self):
+        with self._lock:
+            ids = self._ids()
+            for profile_id in ids[self.max_entries:]:
+                for suffix in ("prof", "json"):
+                    try:
+                        os.remove(self._path(profile_id, suffix))
+                    except OSError:
+                        pass  # already removed by another worker
+    
+    def _ids(self):
+        """Stored ids, newest first (ids start with a millisecond timestamp)"""
+        ids = [name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")]
+        return sorted((i for i in ids if PROFILE_ID.match(i)), key=lambda i: int(i.split("-")[0]), reverse=True)
+    
+    def list(self):
+        entries = []
+        for profile_id in self._ids():
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # pruned while listing
+        return entries
+    
+    def pstats_path(self, profile_id: str):
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+    
+    def text(self, profile_id: str, sort: str = "cumulative", limit: int = 50):
+        path = self.pstats_path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        pstats.Stats(path, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+def _is_admin_request() -> bool:
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt().get("role") == "admin"
+    except Exception:
+        return False  # missing/invalid token: serve the request unprofiled
+
+def init_profiling(app):
+    app.config.setdefault("PROFILING_ENABLED", True)
+    app.config.setdefault("PROFILING_HEADER", "X-Profile")
+    app.config.setdefault("PROFILE_STORE_DIR", os.path.join(tempfile.gettempdir(), "ecommerce_profiles"))
+    app.config.setdefault("PROFILE_STORE_MAX", 20)
+    if not app.config["PROFILING_ENABLED"]:
+        return
+    app.extensions["profile_store"] = ProfileStore(app.config["PROFILE_STORE_DIR"], app.config["PROFILE_STORE_MAX"])
+    header = app.config["PROFILING_HEADER"]
+    
+    @app.before_request
+    def _start_profiler():
+        if header not in request.headers or not _is_admin_request():
+            return
+        g._profiler = cProfile.Profile()
+        g._profile_started = time.perf_counter()
+        g._profiler.enable()
+    
+    @app.after_request
+    def _stop_profiler(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        try:
+            response.headers["X-Profile-Id"] = app.extensions["profile_store"].save(profiler, {
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - g.pop("_profile_started")) * 1000, 3),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+            })
+        except Exception as e:
+            print(f"Error storing request profile: {e}")
+        return response
+    
+    @app.teardown_request
+    def _discard_profiler(exc):
+        # The view raised before after_request: stop profiling without storing
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
@@ -0,0 +1,236 @@
+# app/utils/query_log.py
+"""
+Statement timing and slow-query log (SQLAlchemy engine events).
+
+Every statement is timed and aggregated under a normalized fingerprint (literals,
+bound values and IN lists collapsed) so GET /admin/slow-queries can show the top
+queries by total time. Statements slower than SLOW_QUERY_THRESHOLD_MS are logged
+to the "app.slow_queries" logger with their parameter shapes (types, never values),
+the repo function that issued them and an EXPLAIN plan. Slow logs are limited to
+SLOW_QUERY_LOG_PER_MINUTE and EXPLAIN runs at most once per fingerprint every
+SLOW_QUERY_EXPLAIN_COOLDOWN seconds, so a slow database is not hammered further.
+Stats are per worker process.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import event
+
+logger = logging.getLogger("app.slow_queries")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_SPACES = re.compile(r"\s+")
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions that differ only in values group together"""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _POSTCOMPILE.sub("(?)", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _SPACES.sub(" ", normalized).strip()
+
+def parameter_shapes(parameters):
+    """Describe bound parameters by type (and length for sequences) without leaking values"""
+    def shape(value):
+        if isinstance(value, (list, tuple)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+    if isinstance(parameters, dict):
+        return {key: shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [shape(value) for value in parameters]
+    return shape(parameters)
+
+def calling_repo_function(default: str = "unknown") -> str:
+    """First app.repos frame on the stack, as 'invoice_repo.get_invoices_by_date_range'"""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.repos."):
+            return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        if fallback is None and module.startswith("app.") and module != __name__:
+            fallback = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or default
+
+class QueryStats:
+    """Per-fingerprint aggregates, bounded to max_fingerprints entries"""
+    
+    def __init__(self, max_fingerprints: int = 500):
+        self.max_fingerprints = max_fingerprints
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def record(self, key: str, elapsed_ms: float, slow: bool):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Drop the cheapest fingerprint so the expensive ones keep accumulating
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "slow_calls": 0}
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            if slow:
+                entry["slow_calls"] += 1
+    
+    def annotate(self, key: str, **details):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key].update(details)
+    
+    def top(self, limit: int = 20):
+        with self._lock:
+            rows = [{"fingerprint": key, **entry} for key, entry in self._entries.items()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        for row in rows:
+            row["mean_ms"] = round(row["total_ms"] / row["calls"], 3)
+            row["total_ms"] = round(row["total_ms"], 3)
+            row["max_ms"] = round(row["max_ms"], 3)
+        return rows[:limit]
+    
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+class SlowQueryLog:
+    """Engine event handlers plus the state they share (stats, log budget, EXPLAIN cooldowns)"""
+    
+    def __init__(self, threshold_ms: float, explain: bool = True, logs_per_minute: int = 30,
+                 explain_cooldown: float = 300, max_fingerprints: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.logs_per_minute = logs_per_minute
+        self.explain_cooldown = explain_cooldown
+        self.stats = QueryStats(max_fingerprints)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._logged_in_window = 0
+        self._suppressed = 0
+        self._explained_at = {}
+    
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+    
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # On the statement's execution context, not conn.info: a statement that raises never
+        # reaches _after, and the pooled connection's info would keep its start time forever
+        if context is not None:
+            context.slow_query_start = time.perf_counter()
+    
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "slow_query_start", None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if conn.info.get("explaining"):
+            return  # our own EXPLAIN statement
+        key = fingerprint(statement)
+        slow = elapsed_ms >= self.threshold_ms
+        self.stats.record(key, elapsed_ms, slow)
+        if slow:
+            self._log_slow(conn, statement, parameters, executemany, key, elapsed_ms)
+    
+    def _take_log_slot(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start, self._logged_in_window = now, 0
+            if self._logged_in_window >= self.logs_per_minute:
+                self._suppressed += 1
+                return None
+            self._logged_in_window += 1
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed
+    
+    def _should_explain(self, key):
+        if not self.explain:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._explained_at.get(key, -self.explain_cooldown) < self.explain_cooldown:
+                return False
+            self._explained_at[key] = now
+            if len(self._explained_at) > self.stats.max_fingerprints:
+                self._explained_at.pop(next(iter(self._explained_at)))
+            return True
+    
+    def _log_slow(self, conn, statement, parameters, executemany, key, elapsed_ms):
+        suppressed = self._take_log_slot()
+        if suppressed is None:
+            return
+        caller = calling_repo_function()
+        shapes = parameter_shapes(parameters[0] if executemany and parameters else parameters)
+        plan = None
+        if not executemany and statement.lstrip().upper().startswith("SELECT") and self._should_explain(key):
+            plan = self._explain(conn, statement, parameters)
+        self.stats.annotate(key, caller=caller, last_statement=statement, parameter_shapes=shapes,
+                            **({"plan": plan} if plan else {}))
+        logger.warning(
+            "Slow query (%.1f ms) from %s\n%s\nparameters: %s%s%s",
+            elapsed_ms, caller, statement, shapes,
+            f"\nplan:\n{plan}" if plan else "",
+            f"\n({suppressed} slow queries not logged in the previous window)" if suppressed else ""
+        )
+    
+    @staticmethod
+    def _explain_statement(conn, statement):
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        return prefix + statement
+    
+    def _explain(self, conn, statement, parameters):
+        """
+        EXPLAIN on the caller's connection, inside a savepoint: a failure must not
+        abort the request's transaction (PostgreSQL rejects every later statement).
+        """
+        conn.info["explaining"] = True
+        try:
+            savepoint = conn.begin_nested()
+            try:
+                rows = conn.exec_driver_sql(self._explain_statement(conn, statement), parameters).fetchall()
+                savepoint.commit()
+            except Exception:
+                savepoint.rollback()
+                raise
+            return "\n".join(" | ".join(str(column) for column in row) for row in rows)
+        except Exception as e:
+            return f"EXPLAIN failed: {e}"
+        finally:
+            conn.info["explaining"] = False
+
+def init_query_log(app):
+    """Attach the slow-query log to every engine of the app (primary and replica binds)"""
+    app.config.setdefault("SLOW_QUERY_LOG_ENABLED", True)
+    app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 200)
+    app.config.setdefault("SLOW_QUERY_EXPLAIN", True)
+    app.config.setdefault("SLOW_QUERY_LOG_PER_MINUTE", 30)
+    app.config.setdefault("SLOW_QUERY_EXPLAIN_COOLDOWN", 300)
+    app.config.setdefault("SLOW_QUERY_MAX_FINGERPRINTS", 500)
+    if not app.config["SLOW_QUERY_LOG_ENABLED"]:
+        return
+    from app.extensions import db
+    
+    query_log = SlowQueryLog(
+        threshold_ms=app.config["SLOW_QUERY_THRESHOLD_MS"],
+        explain=app.config["SLOW_QUERY_EXPLAIN"],
+        logs_per_minute=app.config["SLOW_QUERY_LOG_PER_MINUTE"],
+        explain_cooldown=app.config["SLOW_QUERY_EXPLAIN_COOLDOWN"],
+        max_fingerprints=app.config["SLOW_QUERY_MAX_FINGERPRINTS"]
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            query_log.attach(engine)
+    app.extensions["slow_query_log"] = query_log
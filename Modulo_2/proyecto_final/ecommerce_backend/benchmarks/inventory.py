@@ -0,0 +1,105 @@
+# benchmarks/inventory.py
+"""
+Contention benchmark for hot-product stock decrements: one `products` row
+versus the same stock split across N `product_stock_shards` rows.
+
+N threads buy one unit at a time through inventory_service.decrement_stock and
+keep the transaction open for --hold-ms (the rest of a checkout: sale rows,
+cart status) before committing, which is what makes the single row lock hurt.
+Run it against PostgreSQL: SQLite has a single database-wide write lock, so
+both modes serialize there and only the overhead of sharding shows.
+
+    python -m benchmarks.inventory --database-url postgresql://localhost/ecommerce_bench
+    python -m benchmarks.inventory --database-url postgresql://localhost/ecommerce_bench --threads 12 --shards 16
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from app.extensions import db
+from benchmarks.load import build_app
+
+def run_mode(app, product_id, threads, decrements, hold_seconds):
+    """Decrements per second with `threads` concurrent buyers"""
+    import app.repos.inventory_repo as inventory_repo
+    from app.services import inventory_service
+    from app.utils.exceptions import InsufficientStockError
+
+    per_thread = decrements // threads
+    start = threading.Barrier(threads + 1)
+    errors = []
+
+    def buyer():
+        with app.app_context():
+            start.wait()
+            for _ in range(per_thread):
+                try:
+                    inventory_service.decrement_stock(product_id, 1, commit=False)
+                    time.sleep(hold_seconds)
+                    inventory_repo.commit()
+                except InsufficientStockError as e:
+                    errors.append(e)
+                    inventory_repo.rollback()
+            db.session.remove()
+
+    workers = [threading.Thread(target=buyer) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return per_thread * threads / elapsed, len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--threads", type=int, default=8, help="keep within the connection pool (5 + 10 overflow)")
+    parser.add_argument("--decrements", type=int, default=2000, help="units bought per mode")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--hold-ms", type=float, default=2.0, help="time the transaction stays open after the decrement")
+    args = parser.parse_args()
+
+    temp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{temp_path}"
+
+    app, _ = build_app(database_url, "simple")
+    try:
+        from app.models.product import Product
+        from app.services import inventory_service
+        with app.app_context():
+            db.create_all()
+            Product.query.filter(Product.name.like("Contention benchmark %")).delete(synchronize_session=False)
+            single = Product(name="Contention benchmark single", price=Decimal("1.00"), stock=args.decrements)
+            sharded = Product(name="Contention benchmark sharded", price=Decimal("1.00"), stock=args.decrements)
+            db.session.add_all([single, sharded])
+            db.session.commit()
+            single_id, sharded_id = single.id, sharded.id
+            inventory_service.shard_product(sharded_id, args.shards)
+
+        print(f"{args.decrements} decrements, {args.threads} threads, {args.hold_ms}ms held per transaction")
+        print(f"{'mode':<20}{'ops/s':>10}{'failed':>8}")
+        results = {}
+        for name, product_id in (("single row", single_id), (f"{args.shards} shards", sharded_id)):
+            rate, failed = run_mode(app, product_id, args.threads, args.decrements, args.hold_ms / 1000)
+            results[name] = rate
+            print(f"{name:<20}{rate:>10.0f}{failed:>8}")
+        single_rate, sharded_rate = results.values()
+        print(f"speedup: {sharded_rate / single_rate:.1f}x")
+
+        with app.app_context():
+            Product.query.filter(Product.id.in_([single_id, sharded_id])).delete(synchronize_session=False)
+            db.session.commit()
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+if __name__ == "__main__":
+    main()
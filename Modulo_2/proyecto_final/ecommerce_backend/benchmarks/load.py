@@ -0,0 +1,341 @@
+# benchmarks/load.py
+"""
+Load-test and benchmark suite for the ecommerce API.
+
+Boots `create_app` against SQLite (default, temporary file) or a local
+PostgreSQL database, with fakeredis as the cache backend when installed
+(SimpleCache otherwise), seeds a deterministic dataset and drives the API
+in-process with the Flask test client from N concurrent workers.
+
+Scenarios: browse, product_detail, cart_add, checkout, admin_analytics.
+For each one it reports throughput, p50/p95/p99 latency and SQL statements
+per request, writes the results as JSON and compares them with a baseline.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --scenarios browse,checkout --concurrency 8 --requests 2000
+    python -m benchmarks.load --scenarios checkout --rate-limit  # measure the 429 path
+    python -m benchmarks.load --database-url postgresql://localhost/ecommerce_bench --reset
+    python -m benchmarks.load --save-baseline            # store benchmarks/results/baseline.json
+    python -m benchmarks.load --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+from app import create_app
+from app.extensions import db
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+PASSWORD = "benchmark-password"
+
+_local = threading.local()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _local.statements = getattr(_local, "statements", 0) + 1
+
+def fakeredis_cache(app, config, args, kwargs):
+    """Flask-Caching factory (CACHE_TYPE="benchmarks.load.fakeredis_cache") backed by fakeredis"""
+    import fakeredis
+    from flask_caching.backends import RedisCache
+    kwargs.update(host=fakeredis.FakeRedis(), key_prefix=config.get("CACHE_KEY_PREFIX") or "flask_cache_")
+    return RedisCache(*args, **kwargs)
+
+def cache_config(backend):
+    if backend == "fakeredis":
+        try:
+            import fakeredis  # noqa: F401
+        except ImportError:
+            print("fakeredis is not installed, falling back to SimpleCache (pip install fakeredis)")
+            backend = "simple"
+    if backend == "fakeredis":
+        return {"CACHE_TYPE": "benchmarks.load.fakeredis_cache"}, backend
+    if backend == "redis":
+        return {
+            "CACHE_TYPE": "RedisCache",
+            "CACHE_REDIS_HOST": os.getenv("REDIS_HOST", "localhost"),
+            "CACHE_REDIS_PORT": int(os.getenv("REDIS_PORT", 6379)),
+            "CACHE_REDIS_PASSWORD": os.getenv("REDIS_PASSWORD"),
+        }, backend
+    return {"CACHE_TYPE": "SimpleCache"}, "simple"
+
+def build_app(database_url, cache_backend, rate_limit=False):
+    config, cache_backend = cache_config(cache_backend)
+    config.update({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "JWT_SECRET_KEY": "benchmark-secret-key-not-for-production-use",
+        "CACHE_DEFAULT_TIMEOUT": 300,
+        # Off by default: every worker shares a handful of identities, so login/checkout/analytics
+        # would mostly measure 429s (10 and 30 requests per minute)
+        "RATELIMIT_ENABLED": rate_limit,
+    })
+    if database_url.startswith("sqlite"):
+        # Concurrent checkouts wait for the write lock instead of failing immediately
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 30}}
+    return create_app(config=config), cache_backend
+
+def seed_dataset(rng, users, products, sales):
+    """Deterministic dataset: customers with one address each, a catalog and past sales"""
+    from app.models.delivery_address import DeliveryAddress
+    from app.models.product import Product
+    from app.models.sale import Sale
+    from app.models.sale_product import SaleProduct
+    from app.models.user import User
+    from werkzeug.security import generate_password_hash
+
+    password_hash = generate_password_hash(PASSWORD)  # hashing once keeps seeding fast
+    now = datetime(2025, 1, 1)
+    db.session.execute(insert(User), [
+        {"id": 1, "email": "admin@bench.local", "name": "Bench Admin", "role": "admin", "is_active": True,
+         "password_hash": password_hash}
+    ] + [
+        {"id": i + 1, "email": f"customer{i}@bench.local", "name": f"Customer {i}", "role": "customer",
+         "is_active": True, "password_hash": password_hash}
+        for i in range(1, users + 1)
+    ])
+    db.session.execute(insert(DeliveryAddress), [
+        {"id": i, "user_id": i + 1, "address": f"{i} Bench Street", "city": "San Jose", "postal_code": "10101",
+         "country": "CR"}
+        for i in range(1, users + 1)
+    ])
+    db.session.execute(insert(Product), [
+        {"id": i, "name": f"Product {i:06d}", "description": f"Benchmark product {i}",
+         "price": Decimal(rng.randint(100, 50000)) / 100, "stock": 1_000_000}
+        for i in range(1, products + 1)
+    ])
+    sale_rows, item_rows = [], []
+    for sale_id in range(1, sales + 1):
+        items = rng.sample(range(1, products + 1), k=min(products, rng.randint(1, 4)))
+        total = Decimal(0)
+        for product_id in items:
+            quantity = rng.randint(1, 3)
+            price = Decimal(rng.randint(100, 50000)) / 100
+            total += price * quantity
+            item_rows.append({"sale_id": sale_id, "product_id": product_id, "quantity": quantity, "price": price})
+        sale_rows.append({"id": sale_id, "user_id": rng.randint(2, users + 1), "total": total,
+                          "sale_date": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))})
+    if sale_rows:
+        db.session.execute(insert(Sale), sale_rows)
+        db.session.execute(insert(SaleProduct), item_rows)
+    db.session.commit()
+
+def zipf_weights(n, s=1.1):
+    """Cumulative weights so low product ids are requested far more often (popular products)"""
+    cumulative, total = [], 0.0
+    for rank in range(1, n + 1):
+        total += 1 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+# ===== SCENARIOS =====
+# Each scenario performs any setup requests untimed and returns timed(...) of the measured request.
+
+def timed(call, *args, **kwargs):
+    _local.statements = 0
+    start = time.perf_counter()
+    response = call(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    return response.status_code, elapsed, _local.statements
+
+def scenario_browse(client, worker, rng):
+    return timed(client.get, "/products/", headers=worker["headers"])
+
+def scenario_product_detail(client, worker, rng):
+    product_id = rng.choices(worker["product_ids"], cum_weights=worker["popularity"])[0]
+    return timed(client.get, f"/products/{product_id}", headers=worker["headers"])
+
+def scenario_cart_add(client, worker, rng):
+    product_id = rng.choices(worker["product_ids"], cum_weights=worker["popularity"])[0]
+    return timed(client.post, "/sales/cart/add", json={"product_id": product_id, "quantity": 1},
+                 headers=worker["headers"])
+
+def scenario_checkout(client, worker, rng):
+    cart_id = None
+    for product_id in rng.sample(worker["product_ids"], k=min(3, len(worker["product_ids"]))):
+        response = client.post("/sales/cart/add", json={"product_id": product_id, "quantity": 1},
+                               headers=worker["headers"])
+        if response.status_code == 201:
+            cart_id = response.get_json()["cart_id"]
+    return timed(client.post, "/sales/checkout",
+                 json={"cart_id": cart_id, "delivery_address_id": worker["address_id"]},
+                 headers=worker["headers"])
+
+def scenario_admin_analytics(client, worker, rng):
+    return timed(client.get, "/sales/admin/sales?analytics=true", headers=worker["admin_headers"])
+
+SCENARIOS = {
+    "browse": scenario_browse,
+    "product_detail": scenario_product_detail,
+    "cart_add": scenario_cart_add,
+    "checkout": scenario_checkout,
+    "admin_analytics": scenario_admin_analytics,
+}
+
+# ===== RUNNER =====
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_scenario(app, name, workers, requests, seed):
+    scenario = SCENARIOS[name]
+    concurrency = len(workers)
+    results, lock = [], threading.Lock()
+
+    def work(index):
+        rng = random.Random(f"{seed}-{name}-{index}")
+        client = app.test_client()
+        count = requests // concurrency + (1 if index < requests % concurrency else 0)
+        local = [scenario(client, workers[index], rng) for _ in range(count)]
+        with lock:
+            results.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(work, range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed for _, elapsed, _ in results)
+    errors = sum(1 for status, _, _ in results if status >= 400)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(results) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "sql_per_request": round(sum(statements for _, _, statements in results) / len(results), 2) if results else 0.0,
+    }
+
+def build_workers(app, concurrency, users, products):
+    from flask_jwt_extended import create_access_token
+    popularity = zipf_weights(products)
+    product_ids = list(range(1, products + 1))
+    with app.app_context():
+        admin_headers = {"Authorization": f"Bearer {create_access_token(identity='1', additional_claims={'role': 'admin'})}"}
+        workers = []
+        for index in range(concurrency):
+            # Each worker is a different customer so carts and checkouts do not collide
+            customer = index % users + 1
+            token = create_access_token(identity=str(customer + 1), additional_claims={"role": "customer"})
+            workers.append({
+                "headers": {"Authorization": f"Bearer {token}"},
+                "admin_headers": admin_headers,
+                "address_id": customer,
+                "product_ids": product_ids,
+                "popularity": popularity,
+            })
+    return workers
+
+def compare(results, baseline):
+    print(f"\nComparison with baseline ({baseline.get('created_at', 'unknown date')})")
+    print(f"{'scenario':<18}{'throughput':>12}{'p95':>10}{'sql/req':>10}")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        def delta(key):
+            before = previous.get(key) or 0
+            return f"{(current[key] - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{name:<18}{delta('throughput_rps'):>12}{delta('p95_ms'):>10}{delta('sql_per_request'):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate tables before seeding")
+    parser.add_argument("--cache", choices=["fakeredis", "redis", "simple"], default="fakeredis")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the API rate limits on (mostly 429s under load)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenario names")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--sales", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write results to {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    temp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{temp_path}"
+
+    app, cache_backend = build_app(database_url, args.cache, args.rate_limit)
+    try:
+        with app.app_context():
+            if args.reset:
+                db.drop_all()
+            db.create_all()
+            from app.models.user import User
+            if User.query.count():
+                print("Database already has data, reusing it (use --reset to reseed)")
+            else:
+                started = time.perf_counter()
+                seed_dataset(random.Random(args.seed), args.users, args.products, args.sales)
+                print(f"Seeded {args.users} customers, {args.products} products, {args.sales} sales "
+                      f"in {time.perf_counter() - started:.1f}s")
+
+        workers = build_workers(app, args.concurrency, args.users, args.products)
+        results = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "database": database_url.split(":", 1)[0],
+                "cache": cache_backend,
+                "rate_limit": args.rate_limit,
+                "concurrency": args.concurrency,
+                "requests_per_scenario": args.requests,
+                "dataset": {"users": args.users, "products": args.products, "sales": args.sales, "seed": args.seed},
+            },
+            "scenarios": {},
+        }
+        print(f"{'scenario':<18}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sql/req':>9}")
+        for name in scenarios:
+            stats = run_scenario(app, name, workers, args.requests, args.seed)
+            results["scenarios"][name] = stats
+            print(f"{name:<18}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput_rps']:>9}"
+                  f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['sql_per_request']:>9}")
+
+        outputs = [args.output] + ([DEFAULT_BASELINE] if args.save_baseline else [])
+        for path in outputs:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+        baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) and not args.save_baseline else None)
+        if baseline_path:
+            with open(baseline_path, encoding="utf-8") as f:
+                compare(results, json.load(f))
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        if temp_path:
+            os.unlink(temp_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/serialization.py
+"""
+Micro-benchmark: marshmallow + stdlib JSON vs compiled dumpers + orjson.
+
+Builds 10k in-memory rows per list schema (no database needed) and times
+`Schema(many=True).dump` against `fast_dump`, then Flask's default JSON
+provider against the orjson provider on the dumped data.
+
+    python -m benchmarks.serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.schemas.fast import fast_dump
+from app.utils.json_provider import OrjsonProvider, orjson
+
+def build_rows(n):
+    from app.models.delivery_address import DeliveryAddress
+    from app.models.invoice import Invoice
+    from app.models.product import Product
+    from app.models.sale import Sale
+    from app.models.sale_product import SaleProduct
+    from app.models.user import User
+
+    now = datetime(2025, 1, 1)
+    users = [User(id=i, name=f"Customer {i}", email=f"customer{i}@example.com", role="customer") for i in range(1, 101)]
+    address = DeliveryAddress(id=1, user_id=1, address="123 Test Street", city="Test City", postal_code="12345", country="CR")
+    products, sales, invoices = [], [], []
+    for i in range(1, n + 1):
+        stamp = now + timedelta(minutes=i)
+        product = Product(id=i, name=f"Product {i}", description="Benchmark product", price=Decimal(i % 500) + Decimal("0.99"),
+                          stock=i % 100, created_at=stamp, updated_at=stamp)
+        sale = Sale(id=i, user_id=users[i % 100].id, user=users[i % 100], sale_date=stamp, total=Decimal(i % 900) + Decimal("0.5"))
+        sale.sale_products = [SaleProduct(product_id=i, quantity=1 + i % 3, price=product.price)]
+        invoice = Invoice(id=i, sale_id=i, sale=sale, delivery_address_id=1, delivery_address=address, issue_date=stamp)
+        products.append(product)
+        sales.append(sale)
+        invoices.append(invoice)
+    return {"ProductReadSchema": products, "SaleListSchema": sales, "InvoiceListSchema": invoices}
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "CACHE_TYPE": "SimpleCache", "JWT_SECRET_KEY": "benchmark"})
+    from app.schemas.invoice import InvoiceListSchema
+    from app.schemas.product import ProductReadSchema
+    from app.schemas.sale import SaleListSchema
+    schemas = {"ProductReadSchema": ProductReadSchema, "SaleListSchema": SaleListSchema, "InvoiceListSchema": InvoiceListSchema}
+
+    with app.app_context():
+        rows = build_rows(args.rows)
+        stdlib_json, fast_json = DefaultJSONProvider(app), OrjsonProvider(app) if orjson else None
+        print(f"{args.rows} rows, best of {args.repeat}")
+        print(f"{'schema':<20}{'marshmallow':>13}{'compiled':>11}{'speedup':>9}{'stdlib json':>13}{'orjson':>9}{'speedup':>9}")
+        for name, schema in schemas.items():
+            objs = rows[name]
+            assert schema(many=True).dump(objs) == fast_dump(schema, objs, many=True), f"{name}: outputs differ"
+            slow = best_of(args.repeat, lambda: schema(many=True).dump(objs))
+            fast = best_of(args.repeat, lambda: fast_dump(schema, objs, many=True))
+            data = fast_dump(schema, objs, many=True)
+            slow_json = best_of(args.repeat, lambda: stdlib_json.dumps(data))
+            line = f"{name:<20}{slow * 1000:>11.1f}ms{fast * 1000:>9.1f}ms{slow / fast:>8.1f}x{slow_json * 1000:>11.1f}ms"
+            if fast_json:
+                quick_json = best_of(args.repeat, lambda: fast_json.dumps(data))
+                line += f"{quick_json * 1000:>7.1f}ms{slow_json / quick_json:>8.1f}x"
+            print(line)
+
+if __name__ == "__main__":
+    main()
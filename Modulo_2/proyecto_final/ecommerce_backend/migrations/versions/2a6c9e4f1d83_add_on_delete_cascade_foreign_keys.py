@@ -0,0 +1,77 @@
+"""Use ON DELETE CASCADE foreign keys for users, products, carts and sales
+
+Revision ID: 2a6c9e4f1d83
+Revises: 7f3d1b8e2c56
+Create Date: 2026-10-19 11:26:54.918302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a6c9e4f1d83'
+down_revision = '7f3d1b8e2c56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Constraint names are the PostgreSQL defaults generated by the initial migration
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_constraint('carts_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('carts_user_id_fkey', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('delivery_addresses', schema=None) as batch_op:
+        batch_op.drop_constraint('delivery_addresses_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('delivery_addresses_user_id_fkey', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('sales', schema=None) as batch_op:
+        batch_op.drop_constraint('sales_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sales_user_id_fkey', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('cart_products', schema=None) as batch_op:
+        batch_op.drop_constraint('cart_products_cart_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('cart_products_cart_id_fkey', 'carts', ['cart_id'], ['id'], ondelete='CASCADE')
+        batch_op.drop_constraint('cart_products_product_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('cart_products_product_id_fkey', 'products', ['product_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_constraint('invoices_sale_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('invoices_sale_id_fkey', 'sales', ['sale_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('sale_products', schema=None) as batch_op:
+        batch_op.drop_constraint('sale_products_sale_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sale_products_sale_id_fkey', 'sales', ['sale_id'], ['id'], ondelete='CASCADE')
+        batch_op.drop_constraint('sale_products_product_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sale_products_product_id_fkey', 'products', ['product_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_constraint('carts_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('carts_user_id_fkey', 'users', ['user_id'], ['id'])
+
+    with op.batch_alter_table('delivery_addresses', schema=None) as batch_op:
+        batch_op.drop_constraint('delivery_addresses_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('delivery_addresses_user_id_fkey', 'users', ['user_id'], ['id'])
+
+    with op.batch_alter_table('sales', schema=None) as batch_op:
+        batch_op.drop_constraint('sales_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sales_user_id_fkey', 'users', ['user_id'], ['id'])
+
+    with op.batch_alter_table('cart_products', schema=None) as batch_op:
+        batch_op.drop_constraint('cart_products_cart_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('cart_products_cart_id_fkey', 'carts', ['cart_id'], ['id'])
+        batch_op.drop_constraint('cart_products_product_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('cart_products_product_id_fkey', 'products', ['product_id'], ['id'])
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_constraint('invoices_sale_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('invoices_sale_id_fkey', 'sales', ['sale_id'], ['id'])
+
+    with op.batch_alter_table('sale_products', schema=None) as batch_op:
+        batch_op.drop_constraint('sale_products_sale_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sale_products_sale_id_fkey', 'sales', ['sale_id'], ['id'])
+        batch_op.drop_constraint('sale_products_product_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('sale_products_product_id_fkey', 'products', ['product_id'], ['id'])
@@ -0,0 +1,192 @@
+"""Partition sales by sale_date and invoices by issue_date (monthly ranges, PostgreSQL only)
+
+Revision ID: d2f8a4c61e07
+Revises: b7e3c5a90d14
+Create Date: 2026-10-19 21:48:15.402731
+
+Each table is recreated as PARTITION BY RANGE with one partition per month
+(from the oldest row to PARTITION_MONTHS_AHEAD months ahead) plus a DEFAULT
+partition, and the rows are copied over. The primary key becomes
+(id, <date column>) because PostgreSQL requires the partition key in every
+unique constraint, so foreign keys can no longer reference sales.id or
+invoices.id: the ON DELETE CASCADE / SET NULL behaviour of sale_products,
+invoices and checkout_orders is kept with AFTER DELETE triggers instead, and
+AFTER INSERT/UPDATE triggers reject references to missing sales/invoices.
+The models keep declaring those ForeignKeys (they still exist on SQLite);
+migrations/env.py leaves them out of autogenerate on PostgreSQL.
+`flask partitions ensure` (cron) creates the following months.
+
+SQLite (tests, local runs) keeps the plain tables: nothing to do there.
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8a4c61e07'
+down_revision = 'b7e3c5a90d14'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# (table, partition key, foreign keys of the table itself, indexes)
+TABLES = (
+    ('sales', 'sale_date',
+     (('sales_user_id_fkey', 'user_id', 'users', 'CASCADE'),),
+     (('ix_sales_user_id', 'user_id'),)),
+    ('invoices', 'issue_date',
+     (('invoices_delivery_address_id_fkey', 'delivery_address_id', 'delivery_addresses', None),),
+     (('ix_invoices_delivery_address_id', 'delivery_address_id'), ('ix_invoices_sale_id', 'sale_id'))),
+)
+
+# Foreign keys pointing at sales.id / invoices.id, replaced by triggers while partitioned
+REFERENCING_FKS = (
+    ('sale_products', 'sale_products_sale_id_fkey', 'sale_id', 'sales', 'CASCADE'),
+    ('invoices', 'invoices_sale_id_fkey', 'sale_id', 'sales', 'CASCADE'),
+    ('checkout_orders', 'checkout_orders_sale_id_fkey', 'sale_id', 'sales', 'SET NULL'),
+    ('checkout_orders', 'checkout_orders_invoice_id_fkey', 'invoice_id', 'invoices', 'SET NULL'),
+)
+
+CASCADE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION sales_after_delete() RETURNS trigger AS $$
+BEGIN
+    -- Row moved, not deleted: out of the default partition (flask partitions ensure sets the
+    -- flag for its transaction) or to another month by a partition key update
+    IF current_setting('app.moving_partition_rows', true) = 'on' OR EXISTS (SELECT 1 FROM sales WHERE id = OLD.id) THEN
+        RETURN NULL;
+    END IF;
+    DELETE FROM sale_products WHERE sale_id = OLD.id;
+    DELETE FROM invoices WHERE sale_id = OLD.id;
+    UPDATE checkout_orders SET sale_id = NULL WHERE sale_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION invoices_after_delete() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('app.moving_partition_rows', true) = 'on' OR EXISTS (SELECT 1 FROM invoices WHERE id = OLD.id) THEN
+        RETURN NULL;
+    END IF;
+    UPDATE checkout_orders SET invoice_id = NULL WHERE invoice_id = OLD.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sales_after_delete AFTER DELETE ON sales FOR EACH ROW EXECUTE FUNCTION sales_after_delete();
+CREATE TRIGGER invoices_after_delete AFTER DELETE ON invoices FOR EACH ROW EXECUTE FUNCTION invoices_after_delete();
+"""
+
+# Insert/update side of the replaced foreign keys: the referenced row must exist, and is
+# key-share locked like a real foreign key does so a concurrent delete waits for us
+REFERENCE_CHECK = """
+CREATE OR REPLACE FUNCTION check_partitioned_reference() RETURNS trigger AS $$
+DECLARE
+    ref integer := (to_jsonb(NEW) ->> TG_ARGV[0])::integer;
+    found_id integer;
+BEGIN
+    IF ref IS NULL THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format('SELECT id FROM %I WHERE id = $1 LIMIT 1 FOR KEY SHARE', TG_ARGV[1]) INTO found_id USING ref;
+    IF found_id IS NULL THEN
+        RAISE foreign_key_violation USING MESSAGE = format(
+            'insert or update on table "%s" violates reference %s -> %s.id: key %s is not present',
+            TG_TABLE_NAME, TG_ARGV[0], TG_ARGV[1], ref);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _reference_trigger(table, column):
+    return f"{table}_{column}_check"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_table(bind, table, column, foreign_keys, indexes):
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+    op.execute(f"ALTER TABLE {table}_unpartitioned RENAME CONSTRAINT {table}_pkey TO {table}_unpartitioned_pkey")
+    for name, _ in indexes:
+        op.execute(f"DROP INDEX {name}")
+
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE ({column})")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    for name, local_column, referred, ondelete in foreign_keys:
+        on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({local_column}) "
+                   f"REFERENCES {referred} (id){on_delete}")
+    for name, local_column in indexes:
+        op.execute(f"CREATE INDEX {name} ON {table} ({local_column})")
+
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    oldest = bind.execute(sa.text(f"SELECT MIN({column}) FROM {table}_unpartitioned")).scalar()
+    this_month = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        following = _add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table} "
+                   f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')")
+        month = following
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+    op.execute(f"DROP TABLE {table}_unpartitioned")
+    op.execute(f"ANALYZE {table}")
+
+
+def _unpartition_table(table, column, foreign_keys, indexes):
+    op.execute(f"CREATE TABLE {table}_plain (LIKE {table} INCLUDING DEFAULTS)")
+    op.execute(f"ALTER TABLE {table}_plain ADD CONSTRAINT {table}_plain_pkey PRIMARY KEY (id)")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}_plain.id")
+    op.execute(f"INSERT INTO {table}_plain SELECT * FROM {table}")
+    op.execute(f"DROP TABLE {table}")  # drops every partition too
+    op.execute(f"ALTER TABLE {table}_plain RENAME TO {table}")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_plain_pkey TO {table}_pkey")
+    for name, local_column, referred, ondelete in foreign_keys:
+        on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({local_column}) "
+                   f"REFERENCES {referred} (id){on_delete}")
+    for name, local_column in indexes:
+        op.execute(f"CREATE INDEX {name} ON {table} ({local_column})")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, name, _, _, _ in REFERENCING_FKS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, column, foreign_keys, indexes in TABLES:
+        _partition_table(bind, table, column, foreign_keys, indexes)
+    op.execute(CASCADE_TRIGGERS)
+    op.execute(REFERENCE_CHECK)
+    for table, _, column, referred, _ in REFERENCING_FKS:
+        op.execute(f"CREATE TRIGGER {_reference_trigger(table, column)} AFTER INSERT OR UPDATE OF {column} ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION check_partitioned_reference('{column}', '{referred}')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, _, column, _, _ in REFERENCING_FKS:
+        op.execute(f"DROP TRIGGER IF EXISTS {_reference_trigger(table, column)} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS check_partitioned_reference()")
+    op.execute("DROP TRIGGER IF EXISTS invoices_after_delete ON invoices")
+    op.execute("DROP TRIGGER IF EXISTS sales_after_delete ON sales")
+    op.execute("DROP FUNCTION IF EXISTS invoices_after_delete()")
+    op.execute("DROP FUNCTION IF EXISTS sales_after_delete()")
+    for table, column, foreign_keys, indexes in reversed(TABLES):
+        _unpartition_table(table, column, foreign_keys, indexes)
+    for table, name, column, referred, ondelete in REFERENCING_FKS:
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
@@ -33,7 +33,8 @@ def app():
         'CACHE_REDIS_PORT': int(os.getenv('REDIS_PORT', 6379)),
         'CACHE_REDIS_PASSWORD': os.getenv('REDIS_PASSWORD'),
         'CACHE_REDIS_USERNAME': os.getenv('REDIS_USERNAME'),
-        'CACHE_DEFAULT_TIMEOUT': 300
+        'CACHE_DEFAULT_TIMEOUT': 300,
+        'RATELIMIT_ENABLED': False  # enabled per test in test_rate_limit.py
     }
     
     # Create app with test config
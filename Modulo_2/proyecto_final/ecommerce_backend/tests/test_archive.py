@@ -0,0 +1,126 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.user import User
+from app.models.user_order_history import UserOrderHistory
+from app.services import archive_service, invoice_service, order_history_service, sale_service
+
+
+def _add_sale(user_id, product, when, total, address_id=None):
+    sale = Sale(user_id=user_id, sale_date=when, total=Decimal(total))
+    sale.sale_products = [SaleProduct(product_id=product.id, quantity=1, price=Decimal(total))]
+    db.session.add(sale)
+    db.session.flush()
+    if address_id:
+        db.session.add(Invoice(sale_id=sale.id, delivery_address_id=address_id, issue_date=when.replace(hour=23)))
+    db.session.commit()
+
+
+def _rounded(analytics):
+    return {key: round(value, 2) if isinstance(value, float) else value for key, value in analytics.items()}
+
+
+@pytest.mark.sales
+class TestSalesArchive:
+    """Closed months moved to columnar files and merged back into analytics"""
+
+    @pytest.fixture(autouse=True)
+    def old_sales(self, app, tmp_path, monkeypatch, sample_invoice, sample_delivery_address):
+        monkeypatch.setitem(app.config, 'ARCHIVE_DIR', str(tmp_path))
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").one().id
+            product = Product.query.filter_by(name="Bird Cage Large").one()
+            _add_sale(user_id, product, datetime(2023, 3, 5, 10), '10.00', sample_delivery_address.id)
+            _add_sale(user_id, product, datetime(2023, 3, 20, 12), '20.50')
+            _add_sale(user_id, product, datetime(2023, 4, 2, 9), '5.25', sample_delivery_address.id)
+
+    def test_archive_moves_closed_months_and_keeps_analytics(self, app, runner):
+        with app.app_context():
+            sales_before = sale_service.get_sales_analytics()
+            invoices_before = invoice_service.get_invoices_analytics()
+
+        result = runner.invoke(args=['archive', 'run', '--older-than-months', '12'])
+
+        assert result.exit_code == 0
+        assert '2023-03: 2 sales, 2 sale products, 1 invoices' in result.output
+        assert 'Archive finished: 2 periods, 3 sales moved' in result.output
+        assert '2023-04: 1 sales' in runner.invoke(args=['archive', 'list']).output
+        with app.app_context():
+            assert Sale.query.count() == 1  # only the live sample sale
+            assert Invoice.query.count() == 1
+            assert _rounded(sale_service.get_sales_analytics()) == _rounded(sales_before)
+            assert sale_service.get_sales_analytics()['sales_by_day']['2023-03-20'] == {'count': 1, 'revenue': 20.5}
+            assert _rounded(invoice_service.get_invoices_analytics()) == _rounded(invoices_before)
+
+        rerun = runner.invoke(args=['archive', 'run', '--older-than-months', '12'])
+        assert 'Archive finished: 0 periods, 0 sales moved' in rerun.output
+
+    def test_partial_month_ranges_scan_archived_columns(self, app):
+        with app.app_context():
+            archive_service.archive_closed_periods(older_than_months=12)
+
+            sales = sale_service.get_sales_analytics(datetime(2023, 3, 10), datetime(2023, 4, 30))
+            invoices = invoice_service.get_invoices_analytics(datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+        assert (sales['total_sales'], sales['total_revenue']) == (2, 25.75)
+        assert set(sales['sales_by_day']) == {'2023-03-20', '2023-04-02'}
+        assert (invoices['total_invoices'], invoices['total_revenue']) == (1, 10.0)
+        assert invoices['monthly_breakdown'] == {'2023-03': {'count': 1, 'revenue': 10.0}}
+
+    def test_interrupted_period_is_recovered(self, app):
+        with app.app_context():
+            archive_service.archive_closed_periods(older_than_months=12)
+            period_dir, manifest = next(archive_service._manifests())
+            archive_service._write_json(f"{period_dir}/manifest.json", {**manifest, "status": "pending"})
+            assert sale_service.get_sales_analytics(datetime(2023, 3, 1), datetime(2023, 3, 31))['total_sales'] == 0
+
+            assert archive_service.archive_closed_periods(older_than_months=12) == []
+            assert sale_service.get_sales_analytics(datetime(2023, 3, 1), datetime(2023, 3, 31))['total_sales'] == 2
+
+    def test_backdated_sale_does_not_discard_a_pending_archive(self, app):
+        with app.app_context():
+            archive_service.archive_closed_periods(older_than_months=12)
+            period_dir, manifest = next(archive_service._manifests())
+            archive_service._write_json(f"{period_dir}/manifest.json", {**manifest, "status": "pending"})
+            user_id = User.query.filter_by(email="customer@test.com").one().id
+            _add_sale(user_id, Product.query.filter_by(name="Bird Cage Large").one(), datetime(2023, 3, 28, 18), '4.00')
+
+            assert archive_service.archive_closed_periods(older_than_months=12) == []
+
+            assert archive_service.list_periods()[0] == {**manifest, "status": "complete"}
+            sales = sale_service.get_sales_analytics(datetime(2023, 3, 1), datetime(2023, 3, 31))
+            assert (sales['total_sales'], sales['total_revenue']) == (3, 34.5)  # archived pair + the live one
+
+    def test_order_history_keeps_archived_orders(self, app, runner):
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").one().id
+            products = Product.query.order_by(Product.id.desc()).limit(2).all()
+            sale = Sale(user_id=user_id, sale_date=datetime(2023, 3, 9, 8), total=Decimal('15.00'))
+            sale.sale_products = [SaleProduct(product_id=product.id, quantity=2, price=Decimal('3.75'))
+                                  for product in products]  # highest product id first
+            archived_only = User(email="archived@test.com", name="Archived Customer", phone="+1234567890", role="customer")
+            archived_only.set_password("testpassword123")
+            db.session.add_all([sale, archived_only])
+            db.session.commit()
+            _add_sale(archived_only.id, products[0], datetime(2023, 4, 11, 16), '7.00')
+            archived_only_id = archived_only.id
+            users = (user_id, archived_only_id)
+            before = {uid: order_history_service.get_order_history(uid)['orders'] for uid in users}
+
+        runner.invoke(args=['archive', 'run', '--older-than-months', '12'])
+
+        check = runner.invoke(args=['order-history', 'check'])
+        assert check.exit_code == 0
+        assert 'Order history check: 2 users, 0 missing, 0 stale, 0 repaired' in check.output
+        with app.app_context():
+            assert Sale.query.filter_by(user_id=archived_only_id).count() == 0
+            db.session.query(UserOrderHistory).delete()
+            db.session.commit()
+            assert [order_history_service.get_order_history(uid)['orders'] for uid in users] == [before[uid] for uid in users]
+            assert [order['total'] for order in before[user_id]] == ['99.99', '5.25', '20.50', '15.00', '10.00']
+        assert 'Order history rebuilt for 2 users' in runner.invoke(args=['order-history', 'rebuild']).output
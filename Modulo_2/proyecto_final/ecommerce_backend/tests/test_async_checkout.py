@@ -0,0 +1,92 @@
+import pytest
+from app.extensions import cache, db
+from app.models.cart import Cart
+from app.models.cart_product import CartProduct
+from app.models.checkout_order import CheckoutOrder
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+from app.services import checkout_queue_service
+
+
+@pytest.mark.sales
+class TestAsyncCheckout:
+    """Queued checkout (CHECKOUT_ASYNC_ENABLED) and the batch worker"""
+
+    @pytest.fixture(autouse=True)
+    def async_mode(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'CHECKOUT_ASYNC_ENABLED', True)
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def _checkout(self, client, token, cart_id, address_id, **extra):
+        return client.post('/sales/checkout', json={'cart_id': cart_id, 'delivery_address_id': address_id, **extra},
+                           headers={'Authorization': token})
+
+    def test_checkout_is_queued_then_applied_by_worker(self, client, app, customer_token,
+                                                        sample_cart_with_products, sample_delivery_address):
+        response = self._checkout(client, customer_token, sample_cart_with_products.id, sample_delivery_address.id,
+                                  generate_invoice=True)
+        assert response.status_code == 202
+        status_url = response.headers['Location']
+        assert response.get_json()['status_url'] == status_url
+        assert response.get_json()['order']['status'] == 'queued'
+
+        pending = client.get(status_url, headers={'Authorization': customer_token})
+        assert pending.get_json()['order']['status'] == 'queued'
+        assert pending.headers['Retry-After'] == '1'
+        with app.app_context():
+            assert db.session.query(Sale).count() == 0
+
+        with app.app_context():
+            assert checkout_queue_service.process_batch(10) == {'claimed': 1, 'completed': 1, 'failed': 0}
+
+        done = client.get(status_url, headers={'Authorization': customer_token}).get_json()
+        assert done['order']['status'] == 'completed'
+        assert done['sale']['total'] == '54.99'  # 29.99 x1 + 12.50 x2
+        assert done['invoice']['sale_id'] == done['sale']['id']
+        with app.app_context():
+            assert db.session.get(Cart, sample_cart_with_products.id).status == 'converted'
+            assert Product.query.filter_by(name="Premium Dog Food").one().stock == 99
+
+    def test_same_cart_is_queued_once(self, client, customer_token, sample_cart_with_products, sample_delivery_address):
+        first = self._checkout(client, customer_token, sample_cart_with_products.id, sample_delivery_address.id)
+        second = self._checkout(client, customer_token, sample_cart_with_products.id, sample_delivery_address.id)
+        assert first.get_json()['order']['id'] == second.get_json()['order']['id']
+
+    def test_stock_conflicts_resolve_in_queue_order(self, app, sample_user, sample_products, sample_delivery_address):
+        """Orders competing for the last units: the older ones win, the rest fail whole"""
+        with app.app_context():
+            user = User.query.filter_by(email="customer@test.com").first()
+            product = Product.query.filter_by(name="Bird Cage Large").one()
+            product.stock = 5
+            carts = [Cart(user_id=user.id, status='active') for _ in range(3)]
+            db.session.add_all(carts)
+            db.session.commit()
+            for cart in carts:
+                db.session.add(CartProduct(cart_id=cart.id, product_id=product.id, quantity=2))
+            db.session.commit()
+
+            orders = [checkout_queue_service.enqueue_checkout(user.id, cart.id, sample_delivery_address.id).id
+                      for cart in carts]
+            result = checkout_queue_service.process_batch(10)
+
+            assert result == {'claimed': 3, 'completed': 2, 'failed': 1}
+            statuses = [db.session.get(CheckoutOrder, order_id) for order_id in orders]
+            assert [o.status for o in statuses] == ['completed', 'completed', 'failed']
+            assert 'Insufficient stock for Bird Cage Large' in statuses[2].error
+            assert db.session.get(Product, product.id).stock == 1
+            assert db.session.get(Cart, carts[2].id).status == 'active'
+
+    def test_worker_command_drains_queue(self, app, runner, sample_user, sample_cart_with_products,
+                                         sample_delivery_address):
+        with app.app_context():
+            user = User.query.filter_by(email="customer@test.com").first()
+            checkout_queue_service.enqueue_checkout(user.id, sample_cart_with_products.id, sample_delivery_address.id)
+
+        result = runner.invoke(args=['checkout', 'worker', '--once'])
+
+        assert result.exit_code == 0
+        assert 'Checkout worker finished: 1 completed, 0 failed (1 batches)' in result.output
@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.cart import Cart
+from app.models.cart_product import CartProduct
+from app.services import cart_service
+import app.repos.cart_repo as cart_repo
+from app.extensions import db
+
+
+@pytest.mark.sales
+class TestCartSweeper:
+    """Test the batched stale cart sweeper"""
+    
+    @pytest.fixture
+    def stale_carts(self, app, sample_user, sample_products):
+        """Create carts with different statuses and idle times"""
+        with app.app_context():
+            user = User.query.filter_by(email="customer@test.com").first()
+            now = datetime.now()
+            carts = {
+                'fresh_active': Cart(user_id=user.id, status='active', updated_at=now),
+                'old_active_1': Cart(user_id=user.id, status='active', updated_at=now - timedelta(days=10)),
+                'old_active_2': Cart(user_id=user.id, status='active', updated_at=now - timedelta(days=10)),
+                'old_abandoned': Cart(user_id=user.id, status='abandoned', updated_at=now - timedelta(days=40)),
+                'old_converted': Cart(user_id=user.id, status='converted', updated_at=now - timedelta(days=40)),
+            }
+            db.session.add_all(carts.values())
+            db.session.commit()
+            
+            db.session.add(CartProduct(cart_id=carts['old_abandoned'].id, product_id=sample_products[0].id, quantity=1))
+            db.session.add(CartProduct(cart_id=carts['old_converted'].id, product_id=sample_products[0].id, quantity=1))
+            db.session.commit()
+            return {name: cart.id for name, cart in carts.items()}
+    
+    def _status(self, cart_id):
+        return db.session.get(Cart, cart_id).status
+    
+    def test_sweep_abandons_and_expires_stale_carts(self, app, stale_carts):
+        """Test idle active carts are abandoned and idle abandoned carts expire"""
+        with app.app_context():
+            result = cart_service.sweep_stale_carts(abandon_after_days=7, expire_after_days=30)
+            db.session.expire_all()
+            
+            assert result['abandoned'] == 2
+            assert result['expired'] == 1
+            assert result['purged_cart_products'] == 0
+            assert self._status(stale_carts['fresh_active']) == 'active'
+            assert self._status(stale_carts['old_active_1']) == 'abandoned'
+            assert self._status(stale_carts['old_abandoned']) == 'expired'
+            assert self._status(stale_carts['old_converted']) == 'converted'
+    
+    def test_item_changes_keep_an_old_cart_active(self, app, stale_carts, sample_products):
+        """A cart created long ago that is still being filled is not stale"""
+        with app.app_context():
+            product_id = sample_products[1].id
+            cart_repo.add_product_to_cart(stale_carts['old_active_1'], product_id, 2)
+            cart_repo.update_product_quantity(stale_carts['old_active_1'], product_id, 1)
+            
+            result = cart_service.sweep_stale_carts(abandon_after_days=7, expire_after_days=None)
+            db.session.expire_all()
+            
+            assert result['abandoned'] == 1
+            assert self._status(stale_carts['old_active_1']) == 'active'
+            assert self._status(stale_carts['old_active_2']) == 'abandoned'
+    
+    def test_sweep_runs_in_bounded_batches(self, app, stale_carts):
+        """Test batch size and max_batches bound the work of a single run"""
+        with app.app_context():
+            calls = []
+            result = cart_service.sweep_stale_carts(
+                abandon_after_days=7, expire_after_days=None, batch_size=1, max_batches=1,
+                progress=lambda stage, affected, total: calls.append((stage, affected, total))
+            )
+            
+            assert result['abandoned'] == 1
+            assert result['batches'] == 1
+            assert calls == [('abandoned', 1, 1)]
+    
+    def test_sweep_purges_only_abandoned_and_expired_cart_products(self, app, stale_carts):
+        """Test purge never touches products of converted carts"""
+        with app.app_context():
+            result = cart_service.sweep_stale_carts(
+                abandon_after_days=None, expire_after_days=None, purge_after_days=30
+            )
+            
+            assert result['purged_cart_products'] == 1
+            assert CartProduct.query.filter_by(cart_id=stale_carts['old_abandoned']).count() == 0
+            assert CartProduct.query.filter_by(cart_id=stale_carts['old_converted']).count() == 1
+    
+    def test_abandon_old_carts(self, app, stale_carts):
+        """Test abandon_old_carts returns the number of carts abandoned"""
+        with app.app_context():
+            assert cart_service.abandon_old_carts(days_old=7) == 2
+            assert cart_service.abandon_old_carts(days_old=7) == 0
+    
+    def test_sweep_cli_command(self, app, runner, stale_carts):
+        """Test flask carts sweep command reports progress and totals"""
+        result = runner.invoke(args=['carts', 'sweep', '--pause', '0', '--abandon-after', '7', '--expire-after', '30'])
+        
+        assert result.exit_code == 0
+        assert '2 abandoned, 1 expired' in result.output
@@ -0,0 +1,84 @@
+import gzip
+import pytest
+from flask import Response, stream_with_context
+from app import create_app
+from app.extensions import cache
+
+
+@pytest.fixture
+def compress_app(app):
+    """Separate app with extra routes (the session app cannot get new routes after serving requests)"""
+    config = {key: value for key, value in app.config.items() if key.startswith(("CACHE_", "JWT_"))}
+    config.update({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite://", "COMPRESS_MIN_SIZE": 500})
+    compress_app = create_app(config=config)
+
+    @compress_app.get("/test/large")
+    def large():
+        return {"items": [{"id": i, "name": f"Item {i}"} for i in range(200)]}
+
+    @compress_app.get("/test/small")
+    def small():
+        return {"status": "ok"}
+
+    @compress_app.get("/test/stream")
+    def stream():
+        def generate():
+            yield "["
+            for i in range(500):
+                yield ("," if i else "") + f'{{"id": {i}}}'
+            yield "]"
+        return Response(stream_with_context(generate()), mimetype="application/json")
+
+    with compress_app.app_context():
+        cache.clear()
+    return compress_app
+
+
+class TestResponseCompression:
+    """gzip/brotli negotiation in the after_request hook"""
+
+    def test_large_json_is_gzipped(self, compress_app):
+        """Bodies over COMPRESS_MIN_SIZE are compressed when the client accepts gzip"""
+        client = compress_app.test_client()
+        plain = client.get("/test/large")
+        response = client.get("/test/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert int(response.headers["Content-Length"]) < len(plain.data)
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self, compress_app):
+        """Small bodies and clients without Accept-Encoding get the identity encoding"""
+        client = compress_app.test_client()
+        assert "Content-Encoding" not in client.get("/test/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "Content-Encoding" not in client.get("/test/large").headers
+
+    def test_streamed_response_is_compressed_incrementally(self, compress_app):
+        """Generator responses are compressed chunk by chunk without a Content-Length"""
+        client = compress_app.test_client()
+        response = client.get("/test/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert gzip.decompress(response.data).decode() == client.get("/test/stream").get_data(as_text=True)
+
+    def test_compressed_variant_is_cached(self, compress_app, monkeypatch):
+        """A second request reuses the cached compressed body"""
+        from app.utils import compression
+        client = compress_app.test_client()
+        first = client.get("/test/large", headers={"Accept-Encoding": "gzip"})
+
+        def fail(*args, **kwargs):
+            raise AssertionError("body should come from the compressed cache")
+        monkeypatch.setattr(compression, "_compressor", fail)
+        second = client.get("/test/large", headers={"Accept-Encoding": "gzip"})
+        assert second.data == first.data
+
+    def test_etag_becomes_weak_and_still_matches(self, app, client, admin_token, sample_products, monkeypatch):
+        """Compressed catalog responses keep working with If-None-Match"""
+        monkeypatch.setitem(app.config, "COMPRESS_MIN_SIZE", 1)  # the three sample products fit under 1 KB
+        headers = {"Authorization": admin_token, "Accept-Encoding": "gzip"}
+        response = client.get("/products/", headers=headers)
+        etag = response.headers["ETag"]
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert etag.startswith("W/")
+        assert client.get("/products/", headers={**headers, "If-None-Match": etag}).status_code == 304
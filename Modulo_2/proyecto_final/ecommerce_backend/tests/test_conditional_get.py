@@ -0,0 +1,97 @@
+import pytest
+from app.extensions import cache, db
+from app.models.product import Product
+
+
+@pytest.mark.cache
+class TestConditionalGet:
+    """ETag / Last-Modified handling for products, sales and invoices"""
+
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, app):
+        """Start every test with an empty cache"""
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def test_product_list_returns_validators_and_304(self, client, admin_token, sample_products):
+        """A matching If-None-Match returns 304 with no body"""
+        headers = {'Authorization': admin_token}
+        response = client.get('/products/', headers=headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+        assert 'no-cache' in response.headers['Cache-Control']
+
+        response = client.get('/products/', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_product_list_304_skips_view(self, client, admin_token, sample_products, monkeypatch):
+        """The view (and serialization) does not run when the client copy is fresh"""
+        from app.services import product_service
+        headers = {'Authorization': admin_token}
+        etag = client.get('/products/', headers=headers).headers['ETag']
+
+        def fail():
+            raise AssertionError("list should not be loaded for a 304")
+        monkeypatch.setattr(product_service, 'get_all_products', fail)
+        response = client.get('/products/', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_product_list_etag_changes_after_update(self, client, admin_token, sample_products):
+        """Writes through the service bump the product namespace version"""
+        headers = {'Authorization': admin_token}
+        etag = client.get('/products/', headers=headers).headers['ETag']
+
+        update = client.put(f'/products/{sample_products[0].id}', json={"stock": 7}, headers=headers)
+        assert update.status_code == 200
+
+        response = client.get('/products/', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_product_detail_if_modified_since(self, client, customer_token, sample_products):
+        """If-Modified-Since with the returned Last-Modified gives 304"""
+        headers = {'Authorization': customer_token}
+        product_id = sample_products[0].id
+        response = client.get(f'/products/{product_id}', headers=headers)
+        assert response.status_code == 200
+
+        response = client.get(f'/products/{product_id}',
+                              headers={**headers, 'If-Modified-Since': response.headers['Last-Modified']})
+        assert response.status_code == 304
+
+    def test_missing_product_still_404(self, client, customer_token):
+        """Resources without a validator fall through to the normal response"""
+        response = client.get('/products/999999', headers={'Authorization': customer_token, 'If-None-Match': '"x"'})
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+
+    def test_sale_and_invoice_detail_304(self, client, customer_token, sample_invoice):
+        """Sale and invoice details support conditional GET for their owner"""
+        headers = {'Authorization': customer_token}
+        for url in (f'/sales/sales/{sample_invoice.sale_id}', f'/sales/invoices/{sample_invoice.id}'):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            etag = response.headers['ETag']
+            assert client.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 304
+            # Different query args render a different body, so the tag does not match
+            response = client.get(f'{url}?include_summary=true', headers={**headers, 'If-None-Match': etag})
+            assert response.status_code == 200
+
+    def test_sale_detail_other_user_gets_403(self, client, admin_token, sample_sale, app):
+        """Ownership is checked before any 304 is produced"""
+        from flask_jwt_extended import create_access_token
+        from app.models.user import User
+        with app.app_context():
+            other = User(email="other@test.com", name="Other", role="customer")
+            other.set_password("otherpassword123")
+            db.session.add(other)
+            db.session.commit()
+            token = create_access_token(identity=str(other.id), additional_claims={"role": "customer"})
+        response = client.get(f'/sales/sales/{sample_sale.id}',
+                              headers={'Authorization': f'Bearer {token}', 'If-None-Match': '*'})
+        assert response.status_code == 403
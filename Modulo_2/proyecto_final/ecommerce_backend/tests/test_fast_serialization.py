@@ -0,0 +1,64 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from app.extensions import db
+from app.models.sale import Sale
+from app.models.invoice import Invoice
+from app.models.product import Product
+from app.schemas.fast import fast_dump, compile_schema
+from app.schemas.product import ProductReadSchema
+from app.schemas.sale import SaleListSchema
+from app.schemas.invoice import InvoiceListSchema
+from app.utils.json_provider import OrjsonProvider
+
+
+class TestFastSerialization:
+    """Compiled dumpers and the orjson JSON provider"""
+
+    def test_compiled_dumpers_match_marshmallow(self, app, sample_invoice):
+        """fast_dump returns exactly what Schema(many=True).dump returns"""
+        with app.app_context():
+            cases = [
+                (ProductReadSchema, Product.query.all()),
+                (SaleListSchema, Sale.query.all()),
+                (InvoiceListSchema, Invoice.query.all()),
+            ]
+            for schema, objs in cases:
+                assert objs
+                assert fast_dump(schema, objs, many=True) == schema(many=True).dump(objs)
+
+    def test_compiled_dumper_handles_none_values(self, app):
+        """Nullable columns dump as None like marshmallow"""
+        product = Product(id=1, name="No description", description=None, price=Decimal("1.50"), stock=0)
+        assert compile_schema(ProductReadSchema)(product) == ProductReadSchema().dump(product)
+
+    def test_orjson_provider_installed(self, app):
+        """The app uses the orjson provider and keeps Decimals as strings"""
+        assert isinstance(app.json, OrjsonProvider)
+        with app.app_context():
+            assert app.json.loads(app.json.dumps({"total": Decimal("20.00"), 1: "a"})) == {"1": "a", "total": "20.00"}
+
+    def test_dates_match_the_default_provider(self, app, client, customer_token,
+                                              sample_cart_with_products, sample_delivery_address):
+        """Raw datetimes in jsonify'd dicts (sale summaries) keep Flask's HTTP-date format"""
+        value = {"at": datetime(2026, 10, 19, 7, 0), "day": date(2026, 10, 19)}
+        with app.app_context():
+            assert app.json.loads(app.json.dumps(value)) == app.json.loads(DefaultJSONProvider(app).dumps(value))
+
+        response = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id},
+                               headers={'Authorization': customer_token})
+
+        assert response.status_code == 201
+        sale_date = response.get_json()['summary']['sale_date']
+        assert datetime.strptime(sale_date, "%a, %d %b %Y %H:%M:%S GMT")
+
+    def test_list_endpoint_response_format(self, client, admin_token, sample_products):
+        """Product prices are still serialized as strings in list responses"""
+        response = client.get('/products/', headers={'Authorization': admin_token})
+        assert response.status_code == 200
+        products = response.get_json()
+        assert {p['name'] for p in products} >= {"Premium Dog Food", "Cat Toy Mouse"}
+        assert all(isinstance(p['price'], str) for p in products)
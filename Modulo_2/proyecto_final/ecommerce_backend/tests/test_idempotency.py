@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+import time
+import pytest
+from app.extensions import cache, db
+from app.models.sale import Sale
+from app.models.user import User
+
+
+@pytest.mark.cache
+class TestIdempotencyKey:
+    """Idempotency-Key handling on POST /sales/checkout and POST /sales/invoices"""
+
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, app):
+        """Start every test with an empty cache"""
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    @pytest.fixture
+    def checkout_body(self, app, sample_cart_with_products, sample_delivery_address):
+        with app.app_context():
+            return json.dumps({
+                "cart_id": sample_cart_with_products.id,
+                "delivery_address_id": sample_delivery_address.id
+            }).encode()
+
+    def _post(self, client, token, body, key):
+        return client.post('/sales/checkout', data=body, content_type='application/json',
+                           headers={'Authorization': token, 'Idempotency-Key': key})
+
+    def test_retry_replays_first_response(self, client, app, customer_token, checkout_body):
+        """The second request with the same key returns the stored sale and creates nothing"""
+        first = self._post(client, customer_token, checkout_body, 'order-1')
+        assert first.status_code == 201
+        assert 'Idempotent-Replayed' not in first.headers
+
+        retry = self._post(client, customer_token, checkout_body, 'order-1')
+        assert retry.status_code == 201
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert retry.get_json()['sale']['id'] == first.get_json()['sale']['id']
+        with app.app_context():
+            assert db.session.query(Sale).count() == 1
+
+    def test_same_key_different_body_is_rejected(self, client, customer_token, checkout_body):
+        """Reusing a key for another payload is a client error"""
+        assert self._post(client, customer_token, checkout_body, 'order-2').status_code == 201
+        response = self._post(client, customer_token, b'{"cart_id": 999, "delivery_address_id": 1}', 'order-2')
+        assert response.status_code == 422
+
+    def test_concurrent_duplicate_waits_for_result(self, client, app, customer_token, checkout_body):
+        """A duplicate that arrives while the first is running replays its result"""
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").first().id
+        fingerprint = hashlib.sha256(b'POST' + b'/sales/checkout' + checkout_body).hexdigest()
+        cache_key = f"idempotency.checkout.{user_id}.order-3"
+        with app.app_context():
+            cache.set(cache_key, {"state": "in_progress", "fingerprint": fingerprint}, timeout=30)
+
+        def finish_first_request():
+            time.sleep(0.2)
+            with app.app_context():
+                cache.set(cache_key, {"state": "completed", "fingerprint": fingerprint, "status": 201,
+                                      "mimetype": "application/json", "body": b'{"sale": {"id": 42}}'})
+        worker = threading.Thread(target=finish_first_request)
+        worker.start()
+        response = self._post(client, customer_token, checkout_body, 'order-3')
+        worker.join()
+
+        assert response.status_code == 201
+        assert response.headers['Idempotent-Replayed'] == 'true'
+        assert response.get_json() == {"sale": {"id": 42}}
+        with app.app_context():
+            assert db.session.query(Sale).count() == 0
+
+    def test_in_progress_duplicate_times_out_with_409(self, client, app, customer_token, checkout_body, monkeypatch):
+        """If the first request does not finish within the wait timeout the duplicate gets 409"""
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").first().id
+        fingerprint = hashlib.sha256(b'POST' + b'/sales/checkout' + checkout_body).hexdigest()
+        monkeypatch.setitem(app.config, 'IDEMPOTENCY_WAIT_TIMEOUT', 0.1)
+        with app.app_context():
+            cache.set(f"idempotency.checkout.{user_id}.order-4",
+                      {"state": "in_progress", "fingerprint": fingerprint}, timeout=30)
+        response = self._post(client, customer_token, checkout_body, 'order-4')
+        assert response.status_code == 409
+        assert response.headers['Retry-After'] == '1'
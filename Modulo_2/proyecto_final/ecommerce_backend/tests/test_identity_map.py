@@ -0,0 +1,58 @@
+import pytest
+import app.repos.cart_repo as cart_repo
+import app.repos.delivery_address_repo as delivery_address_repo
+from app.utils import identity_map
+
+
+class TestRequestIdentityMap:
+    """Objects authorized by the security layer are reused by services within one request"""
+
+    @pytest.fixture
+    def load_counter(self, monkeypatch):
+        calls = {"cart": 0, "delivery_address": 0}
+        get_cart, get_address = cart_repo.get_by_id, delivery_address_repo.get_delivery_address_by_id
+
+        def counting_cart(cart_id):
+            calls["cart"] += 1
+            return get_cart(cart_id)
+
+        def counting_address(address_id):
+            calls["delivery_address"] += 1
+            return get_address(address_id)
+        monkeypatch.setattr(cart_repo, "get_by_id", counting_cart)
+        monkeypatch.setattr(delivery_address_repo, "get_delivery_address_by_id", counting_address)
+        return calls
+
+    def test_checkout_loads_address_once(self, client, app, customer_token, sample_cart_with_products,
+                                         sample_delivery_address, load_counter):
+        """Checkout with invoice generation validates the address in two services but loads it once"""
+        with app.app_context():
+            cart_id, address_id = sample_cart_with_products.id, sample_delivery_address.id
+        response = client.post('/sales/checkout', json={
+            "cart_id": cart_id, "delivery_address_id": address_id, "generate_invoice": True
+        }, headers={'Authorization': customer_token})
+        assert response.status_code == 201
+        assert 'invoice' in response.get_json()
+        assert load_counter["delivery_address"] == 1
+        # get_cart_by_id, validate_cart_for_checkout and the ownership check share one load;
+        # the conversion reuses that row from the session when the sale is committed
+        assert load_counter["cart"] == 1
+
+    def test_map_is_cleared_between_requests(self, client, app, customer_token, sample_cart, load_counter):
+        """Every request starts with an empty map"""
+        with app.app_context():
+            cart_id = sample_cart.id
+        for _ in range(2):
+            assert client.get(f'/sales/cart/{cart_id}', headers={'Authorization': customer_token}).status_code == 200
+        assert load_counter["cart"] == 2
+
+    def test_get_or_load_reuses_instance(self, app, sample_cart, load_counter):
+        """Within one request context a second lookup does not call the loader"""
+        with app.test_request_context():
+            first = identity_map.get_or_load("cart", sample_cart.id, cart_repo.get_by_id)
+            second = identity_map.get_or_load("cart", sample_cart.id, cart_repo.get_by_id)
+            assert first is second
+            assert identity_map.size() == 1
+            identity_map.forget("cart", sample_cart.id)
+            assert identity_map.size() == 0
+        assert load_counter["cart"] == 1
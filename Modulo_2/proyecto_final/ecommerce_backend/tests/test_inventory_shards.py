@@ -0,0 +1,114 @@
+import pytest
+from app.extensions import cache, db
+from app.models.product import Product
+from app.models.cart import Cart
+from app.models.product_stock_shard import ProductStockShard
+from app.models.sale import Sale
+import app.repos.inventory_repo as inventory_repo
+from app.services import inventory_service
+from app.utils.exceptions import InsufficientStockError
+
+
+def _shard_stocks(product_id):
+    return [s.stock for s in ProductStockShard.query.filter_by(product_id=product_id).order_by(ProductStockShard.shard)]
+
+
+@pytest.mark.products
+class TestInventoryShards:
+    """Hot products with stock split across product_stock_shards"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self, app):
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def test_shard_command_splits_stock_and_stock_reads_sum(self, app, runner, sample_products):
+        with app.app_context():
+            product_id = Product.query.filter_by(name="Premium Dog Food").one().id
+
+        result = runner.invoke(args=['inventory', 'shard', str(product_id), '--shards', '8'])
+
+        assert result.exit_code == 0
+        assert 'Product %d: 100 units across 8 shards' % product_id in result.output
+        with app.app_context():
+            assert _shard_stocks(product_id) == [13, 13, 13, 13, 12, 12, 12, 12]
+            ProductStockShard.query.filter_by(product_id=product_id, shard=0).update({"stock": 3})
+            db.session.commit()
+            assert db.session.get(Product, product_id).stock == 90
+
+    def test_checkout_decrements_a_single_shard(self, client, app, customer_token,
+                                                sample_cart_with_products, sample_delivery_address):
+        with app.app_context():
+            product_id = Product.query.filter_by(name="Premium Dog Food").one().id
+            inventory_service.shard_product(product_id, 4)
+
+        response = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id},
+                               headers={'Authorization': customer_token})
+
+        assert response.status_code == 201
+        with app.app_context():
+            assert sorted(_shard_stocks(product_id)) == [24, 25, 25, 25]
+            assert db.session.get(Product, product_id).stock == 99
+
+    def test_checkout_losing_a_stock_race_leaves_nothing_behind(self, client, app, monkeypatch, customer_token,
+                                                                 sample_cart_with_products, sample_delivery_address):
+        with app.app_context():
+            dog_id, cat_id = (Product.query.filter_by(name=name).one().id for name in ("Premium Dog Food", "Cat Toy Mouse"))
+        decrement = inventory_repo.decrement_product_stock
+        # Dog Food is taken, then another buyer empties Cat Toy Mouse between the stock check and its decrement
+        monkeypatch.setattr(inventory_repo, "decrement_product_stock",
+                            lambda product_id, quantity: product_id != cat_id and decrement(product_id, quantity))
+
+        response = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id},
+                               headers={'Authorization': customer_token})
+
+        assert response.status_code == 400
+        assert 'Insufficient stock' in response.get_json()['message']
+        with app.app_context():
+            assert Sale.query.count() == 0
+            assert db.session.get(Product, dog_id).stock == 100
+            assert db.session.get(Cart, sample_cart_with_products.id).status == "active"
+
+    def test_decrement_spans_shards_or_fails_whole(self, app, sample_products):
+        with app.app_context():
+            product_id = Product.query.filter_by(name="Bird Cage Large").one().id
+            inventory_service.shard_product(product_id, 4)  # 7, 6, 6, 6
+
+            inventory_service.decrement_stock(product_id, 20)  # no shard covers it: fullest first
+            assert sum(_shard_stocks(product_id)) == 5
+
+            with pytest.raises(InsufficientStockError):
+                inventory_service.decrement_stock(product_id, 6)
+            assert sum(_shard_stocks(product_id)) == 5
+
+    def test_rebalance_and_admin_update_spread_evenly(self, app, client, runner, admin_token, sample_products):
+        with app.app_context():
+            product_id = Product.query.filter_by(name="Cat Toy Mouse").one().id
+            inventory_service.shard_product(product_id, 5)  # 10 each
+            ProductStockShard.query.filter_by(product_id=product_id, shard=2).update({"stock": 0})
+            db.session.commit()
+
+        result = runner.invoke(args=['inventory', 'rebalance'])
+
+        assert 'product %d: 40 units over 5 shards (spread was 10)' % product_id in result.output
+        with app.app_context():
+            assert _shard_stocks(product_id) == [8, 8, 8, 8, 8]
+            assert db.session.query(Product.stock).filter_by(id=product_id).scalar() == 40  # snapshot refreshed
+
+        response = client.put(f'/products/{product_id}', json={'stock': 12}, headers={'Authorization': admin_token})
+
+        assert response.status_code == 200
+        assert response.get_json()['stock'] == 12
+        with app.app_context():
+            assert _shard_stocks(product_id) == [3, 3, 2, 2, 2]
+
+        runner.invoke(args=['inventory', 'unshard', str(product_id)])
+        with app.app_context():
+            assert _shard_stocks(product_id) == []
+            assert db.session.get(Product, product_id).stock == 12
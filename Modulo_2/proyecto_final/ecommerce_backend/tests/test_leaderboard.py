@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import cache
+from app.services import leaderboard_service
+
+
+@pytest.mark.products
+class TestBestSellerLeaderboard:
+    """Per-period sorted sets updated at checkout (in-process store without Redis)"""
+
+    @pytest.fixture(autouse=True)
+    def clean_leaderboards(self, app):
+        leaderboard_service.memory_leaderboards.reset()
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+        leaderboard_service.memory_leaderboards.reset()
+
+    def _checkout(self, client, token, cart, address):
+        response = client.post('/sales/checkout', json={'cart_id': cart.id, 'delivery_address_id': address.id},
+                               headers={'Authorization': token})
+        assert response.status_code == 201
+
+    def test_checkout_updates_units_and_revenue_rankings(self, client, customer_token,
+                                                         sample_cart_with_products, sample_delivery_address):
+        self._checkout(client, customer_token, sample_cart_with_products, sample_delivery_address)
+
+        by_units = client.get('/products/best-sellers', headers={'Authorization': customer_token}).get_json()
+        by_revenue = client.get('/products/best-sellers?period=week&by=revenue',
+                                headers={'Authorization': customer_token}).get_json()
+
+        assert [(e['rank'], e['product']['name'], e['units']) for e in by_units['products']] == [
+            (1, 'Cat Toy Mouse', 2), (2, 'Premium Dog Food', 1)]
+        assert [(e['product']['name'], e['revenue']) for e in by_revenue['products']] == [
+            ('Premium Dog Food', '29.99'), ('Cat Toy Mouse', '25.00')]
+
+    def test_rebuild_restores_rankings_from_sale_products(self, app, client, runner, customer_token,
+                                                          sample_cart_with_products, sample_delivery_address):
+        self._checkout(client, customer_token, sample_cart_with_products, sample_delivery_address)
+        with app.app_context():
+            before = leaderboard_service.top_products("week", "revenue")
+        leaderboard_service.memory_leaderboards.reset()
+
+        result = runner.invoke(args=['leaderboard', 'rebuild'])
+
+        assert 'day: 2 products ranked' in result.output
+        with app.app_context():
+            assert leaderboard_service.top_products("week", "revenue") == before
+            assert leaderboard_service.top_products("day", "units") == [
+                (before[1][0], 2), (before[0][0], 1)]
+
+    def test_old_periods_expire(self, app):
+        with app.app_context():
+            three_days_ago = datetime.now() - timedelta(days=3)
+            leaderboard_service.record_sale([{'product_id': 1, 'quantity': 4, 'price': 1}], when=three_days_ago)
+            leaderboard_service.record_sale([{'product_id': 2, 'quantity': 1, 'price': 1}],
+                                            when=datetime.now() - timedelta(hours=1))
+
+            assert leaderboard_service.top_products("day", "units", when=three_days_ago) == []
+            assert leaderboard_service.top_products("day", "units", when=datetime.now() - timedelta(hours=1)) == [(2, 1)]
+
+    def test_invalid_period_is_rejected(self, client, customer_token):
+        response = client.get('/products/best-sellers?period=year', headers={'Authorization': customer_token})
+        assert response.status_code == 400
@@ -0,0 +1,69 @@
+import pytest
+from app.utils.memory import MemoryStats
+
+
+class TestMemoryDiagnostics:
+    """Admin memory report, tracemalloc diffs and the recycle hook"""
+
+    @pytest.fixture(autouse=True)
+    def stats(self, app, monkeypatch):
+        stats = MemoryStats()
+        monkeypatch.setitem(app.extensions, "memory_stats", stats)
+        yield stats
+        stats.stop_tracing()
+
+    def test_report_tracks_identity_map_sizes(self, client, admin_token, sample_products, stats):
+        headers = {'Authorization': admin_token}
+        client.get('/products/', headers=headers)
+        response = client.get('/admin/memory?objects=5', headers=headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['rss_mb'] > 0
+        assert data['peak_rss_mb'] > 0
+        assert data['requests_served'] >= 1
+        assert set(data['session_identity_map']) == {'last', 'max', 'mean'}
+        assert len(data['objects']) == 5
+        assert 'objects' not in client.get('/admin/memory', headers=headers).get_json()
+
+    def test_session_identity_map_high_water_mark(self, stats):
+        stats.record(3, 1)
+        stats.record(10, 0)
+        stats.record(2, 0)
+        report = stats.report()
+        assert report['session_identity_map'] == {'last': 2, 'max': 10, 'mean': 5.0}
+        assert report['request_identity_map'] == {'last': 0, 'max': 1}
+
+    def test_tracemalloc_snapshot_diff(self, client, admin_token):
+        headers = {'Authorization': admin_token}
+        baseline = client.post('/admin/memory/snapshots', headers=headers).get_json()
+        assert baseline['baseline'] is True
+        leak = [bytearray(1024) for _ in range(2000)]
+        diff = client.post('/admin/memory/snapshots?limit=5', headers=headers).get_json()
+        assert diff['baseline'] is False
+        assert 0 < len(diff['top']) <= 5
+        assert any(entry['size_diff_kb'] > 1000 for entry in diff['top'])
+        assert client.delete('/admin/memory/snapshots', headers=headers).status_code == 200
+        del leak
+
+    def test_memory_endpoints_are_admin_only(self, client, customer_token):
+        assert client.get('/admin/memory', headers={'Authorization': customer_token}).status_code == 403
+
+    def test_recycle_after_max_requests(self, monkeypatch):
+        """A worker past MEMORY_MAX_REQUESTS signals itself once the response is closed"""
+        import app.utils.memory as memory
+        from app import create_app
+        sent = []
+        monkeypatch.setattr(memory, "_recycle", lambda sig: sent.append(sig))
+        recycle_app = create_app(config={
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+            'JWT_SECRET_KEY': 'test-secret-key-for-testing-only',
+            'CACHE_TYPE': 'SimpleCache',
+            'MEMORY_MAX_REQUESTS': 2
+        })
+        client = recycle_app.test_client()
+        client.get('/health').close()
+        assert sent == []
+        client.get('/health').close()
+        client.get('/health').close()
+        assert len(sent) == 1
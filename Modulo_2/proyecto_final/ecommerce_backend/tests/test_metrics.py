@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.extensions import cache
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _samples(body):
+    return [sample for family in text_string_to_metric_families(body) for sample in family.samples]
+
+
+def _value(samples, name, **labels):
+    return sum(s.value for s in samples if s.name == name and all(s.labels.get(k) == v for k, v in labels.items()))
+
+
+class TestMetricsEndpoint:
+    """Prometheus exposition of request latency, in-flight requests, AppErrors and pool gauges"""
+
+    def test_latency_histogram_by_endpoint(self, client, app, admin_token, sample_products):
+        with app.app_context():
+            cache.clear()  # a cached validator could answer 304
+        before = _value(_samples(client.get('/metrics').get_data(as_text=True)),
+                        'http_request_duration_seconds_count', endpoint='products.get_products',
+                        method='GET', status='200')
+        client.get('/products/', headers={'Authorization': admin_token})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        samples = _samples(response.get_data(as_text=True))
+        assert _value(samples, 'http_request_duration_seconds_count',
+                      endpoint='products.get_products', method='GET', status='200') == before + 1
+        assert any(s.name == 'http_request_duration_seconds_bucket' and s.labels['le'] == '0.1' for s in samples)
+        # the scrape itself is in flight while metrics are rendered
+        assert _value(samples, 'http_requests_in_progress', endpoint='metrics') == 1
+
+    def test_app_errors_counted_by_subclass(self, client, admin_token):
+        samples = _samples(client.get('/metrics').get_data(as_text=True))
+        before = _value(samples, 'app_errors_total', error='ProductNotFoundError')
+        assert any(s.name == 'app_errors_total' and s.labels['error'] == 'CartNotFoundError' for s in samples)
+
+        assert client.get('/products/999999', headers={'Authorization': admin_token}).status_code == 404
+        samples = _samples(client.get('/metrics').get_data(as_text=True))
+        assert _value(samples, 'app_errors_total', error='ProductNotFoundError', status='404') == before + 1
+
+    def test_pool_gauges(self, client, sample_products):
+        samples = _samples(client.get('/metrics').get_data(as_text=True))
+        assert any(s.name == 'db_pool_checked_out' and s.labels['bind'] == 'primary' for s in samples)
+        assert _value(samples, 'db_pool_wait_seconds_count', bind='primary') > 0
+
+    def test_metrics_token(self, client, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'METRICS_AUTH_TOKEN', 'scrape-secret')
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+
+WORKER = """
+from app import create_app
+app = create_app(config={'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'CACHE_TYPE': 'SimpleCache',
+                         'JWT_SECRET_KEY': 'test-secret-key-for-testing-only'})
+client = app.test_client()
+{body}
+"""
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """Workers write to PROMETHEUS_MULTIPROC_DIR and any of them serves the combined counts"""
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    run = lambda body: subprocess.run([sys.executable, '-c', WORKER.replace('{body}', body)], cwd=root, env=env,
+                                      capture_output=True, text=True, check=True).stdout
+    for _ in range(2):
+        run("client.get('/health')")
+    body = run("print(client.get('/metrics').get_data(as_text=True))")
+    assert _value(_samples(body), 'http_request_duration_seconds_count', endpoint='health') == 2
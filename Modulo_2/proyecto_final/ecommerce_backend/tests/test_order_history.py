@@ -0,0 +1,69 @@
+import pytest
+from app.extensions import cache, db
+from app.models.user_order_history import UserOrderHistory
+from app.models.user import User
+
+
+@pytest.mark.sales
+class TestOrderHistoryReadModel:
+    """Per-user order history document kept in sync by checkout and invoice changes"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self, app):
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def _history(self, client, token):
+        response = client.get('/sales/order-history', headers={'Authorization': token})
+        assert response.status_code == 200
+        return response.get_json()
+
+    def test_checkout_and_invoice_changes_update_document(self, client, customer_token,
+                                                          sample_cart_with_products, sample_delivery_address):
+        checkout = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id,
+                                     'generate_invoice': True},
+                               headers={'Authorization': customer_token}).get_json()
+
+        history = self._history(client, customer_token)
+        assert history['count'] == 1
+        order = history['orders'][0]
+        assert (order['id'], order['total'], order['total_items']) == (checkout['sale']['id'], '54.99', 3)
+        assert [(item['name'], item['quantity'], item['subtotal']) for item in order['items']] == [
+            ('Premium Dog Food', 1, '29.99'), ('Cat Toy Mouse', 2, '25.00')]
+        invoice_id = checkout['invoice']['id']
+        assert order['invoices'][0]['invoice_number'] == f"INV-{invoice_id:06d}"
+        assert order['invoices'][0]['delivery_address']['city'] == sample_delivery_address.city
+
+        response = client.delete(f'/sales/invoices/{invoice_id}', headers={'Authorization': customer_token})
+
+        assert response.status_code == 200
+        assert self._history(client, customer_token)['orders'][0]['invoices'] == []
+
+    def test_first_read_builds_document(self, client, app, customer_token, sample_invoice):
+        history = self._history(client, customer_token)
+
+        assert [order['total'] for order in history['orders']] == ['99.99']
+        assert len(history['orders'][0]['invoices']) == 1
+        with app.app_context():
+            assert db.session.query(UserOrderHistory).count() == 1
+
+    def test_check_detects_and_repairs_drift(self, app, client, runner, customer_token, sample_sale):
+        self._history(client, customer_token)
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").one().id
+            history = db.session.get(UserOrderHistory, user_id)
+            history.orders = [{**history.orders[0], 'total': '1.00'}]
+            db.session.commit()
+
+        check = runner.invoke(args=['order-history', 'check'])
+        assert check.exit_code == 1
+        assert f'user {user_id}: stale' in check.output
+
+        repair = runner.invoke(args=['order-history', 'check', '--repair'])
+        assert repair.exit_code == 0
+        assert 'Order history check: 1 users, 0 missing, 1 stale, 1 repaired' in repair.output
+        assert self._history(client, customer_token)['orders'][0]['total'] == '99.99'
@@ -0,0 +1,148 @@
+import importlib.util
+import os
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.extensions import db
+from app.models.cart import Cart
+from app.models.checkout_order import CheckoutOrder
+from app.models.delivery_address import DeliveryAddress
+from app.models.invoice import Invoice
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.user import User
+from app.services import partition_service
+
+# Scratch PostgreSQL database for the partitioning tests (its tables are dropped and recreated)
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+MIGRATION = os.path.join(os.path.dirname(__file__), "..", "migrations", "versions",
+                         "d2f8a4c61e07_partition_sales_and_invoices_by_month.py")
+
+
+def _run_migration(step):
+    spec = importlib.util.spec_from_file_location("partition_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with db.engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            getattr(migration, step)()
+
+
+def _partition_of(table, row_id):
+    return db.session.execute(text(f"SELECT tableoid::regclass::text FROM {table} WHERE id = :id"), {"id": row_id}).scalar()
+
+
+def _add_order(sale_date):
+    """A sale with one product, an invoice and the checkout order that produced them; returns their ids"""
+    user = User(email="partitions@test.com", name="Partition Customer", phone="+1234567890", role="customer")
+    user.set_password("testpassword123")
+    product = Product(name="Partitioned Dog Food", description="Food", price=Decimal("29.99"), stock=10)
+    db.session.add_all([user, product])
+    db.session.flush()
+    address = DeliveryAddress(user_id=user.id, address="1 Test St", city="Test City", postal_code="12345", country="Test")
+    cart = Cart(user_id=user.id, status="converted")
+    sale = Sale(user_id=user.id, total=Decimal("29.99"), sale_date=sale_date)
+    sale.sale_products = [SaleProduct(product_id=product.id, quantity=1, price=Decimal("29.99"))]
+    db.session.add_all([address, cart, sale])
+    db.session.flush()
+    invoice = Invoice(sale_id=sale.id, delivery_address_id=address.id, issue_date=sale_date)
+    db.session.add(invoice)
+    db.session.flush()
+    order = CheckoutOrder(user_id=user.id, cart_id=cart.id, delivery_address_id=address.id, status="completed",
+                          items=[{"product_id": product.id, "quantity": 1}], sale_id=sale.id, invoice_id=invoice.id)
+    db.session.add(order)
+    db.session.commit()
+    return sale.id, invoice.id, order.id
+
+
+@pytest.mark.sales
+class TestMonthlyPartitions:
+    """Monthly partitions of sales/invoices: PostgreSQL only, no-op on SQLite"""
+
+    def test_month_arithmetic_and_names(self):
+        assert partition_service.month_start(date(2025, 3, 17)) == date(2025, 3, 1)
+        assert partition_service.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+        assert partition_service.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+        assert partition_service.partition_name("sales", date(2025, 3, 1)) == "sales_y2025m03"
+
+    def test_sqlite_keeps_plain_tables(self, app, runner):
+        with app.app_context():
+            assert partition_service.ensure_partitions(months_ahead=3) == []
+            assert partition_service.get_partitions() == {"sales": [], "invoices": []}
+
+        result = runner.invoke(args=['partitions', 'ensure'])
+
+        assert result.exit_code == 0
+        assert 'Partitions ensured: 0 created' in result.output
+        assert 'sales: not partitioned' in runner.invoke(args=['partitions', 'list']).output
+
+
+@pytest.mark.sales
+@pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database")
+class TestPostgresPartitions:
+    """The d2f8a4c61e07 migration and partition maintenance against a real PostgreSQL"""
+
+    @pytest.fixture
+    def pg_app(self):
+        app = create_app(config={
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': POSTGRES_URL,
+            'CACHE_TYPE': 'SimpleCache',
+            'RATELIMIT_ENABLED': False
+        })
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            _run_migration("upgrade")
+            yield app
+            db.session.remove()
+            _run_migration("downgrade")
+            db.drop_all()
+
+    def test_new_month_moves_rows_out_of_default_partition_with_their_children(self, pg_app):
+        future = partition_service.add_months(partition_service.month_start(date.today()), 12)
+        with pg_app.app_context():
+            sale_id, invoice_id, order_id = _add_order(datetime(future.year, future.month, 15, 10))
+            assert _partition_of("sales", sale_id) == "sales_default"
+
+            created = partition_service.ensure_partitions(months_ahead=0, today=future)
+
+            assert created == [partition_service.partition_name("sales", future),
+                               partition_service.partition_name("invoices", future)]
+            assert _partition_of("sales", sale_id) == created[0]
+            assert _partition_of("invoices", invoice_id) == created[1]
+            assert SaleProduct.query.filter_by(sale_id=sale_id).count() == 1
+            order = db.session.get(CheckoutOrder, order_id)
+            assert (order.sale_id, order.invoice_id) == (sale_id, invoice_id)
+
+    def test_deleting_a_sale_cascades_through_triggers(self, pg_app):
+        with pg_app.app_context():
+            sale_id, invoice_id, order_id = _add_order(datetime.now())
+
+            db.session.execute(text("DELETE FROM sales WHERE id = :id"), {"id": sale_id})
+            db.session.commit()
+            db.session.expunge_all()
+
+            assert SaleProduct.query.filter_by(sale_id=sale_id).count() == 0
+            assert db.session.get(Invoice, invoice_id) is None
+            order = db.session.get(CheckoutOrder, order_id)
+            assert (order.sale_id, order.invoice_id) == (None, None)
+
+    def test_references_to_missing_sales_are_rejected(self, pg_app):
+        with pg_app.app_context():
+            sale_id, _, order_id = _add_order(datetime.now())
+            product_id = SaleProduct.query.filter_by(sale_id=sale_id).one().product_id
+
+            with pytest.raises(IntegrityError):
+                db.session.execute(text("INSERT INTO sale_products (sale_id, product_id, quantity, price) "
+                                        "VALUES (:sale_id, :product_id, 1, 1)"), {"sale_id": sale_id + 1000, "product_id": product_id})
+            db.session.rollback()
+            with pytest.raises(IntegrityError):
+                db.session.execute(text("UPDATE checkout_orders SET invoice_id = invoice_id + 1000 WHERE id = :id"), {"id": order_id})
+            db.session.rollback()
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import cache, db
+
+
+@pytest.mark.cache
+class TestProductsMultiGet:
+    """GET /products?ids=... served from the per-product cache"""
+
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, app):
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    @pytest.fixture
+    def product_selects(self, app):
+        """SELECT statements that load product rows (conditional GET validators excluded)"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and "products.name" in statement:
+                statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        yield statements
+        event.remove(engine, "before_cursor_execute", record)
+
+    def test_returns_products_in_request_order(self, client, customer_token, sample_products):
+        ids = [sample_products[2].id, sample_products[0].id, 9999, sample_products[2].id]
+        response = client.get(f'/products/?ids={",".join(map(str, ids))}',
+                              headers={'Authorization': customer_token})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [p['id'] for p in data['products']] == [sample_products[2].id, sample_products[0].id]
+        assert data['missing'] == [9999]
+
+    def test_misses_use_one_query_and_backfill_cache(self, client, customer_token, sample_products, product_selects):
+        ids = ",".join(str(p.id) for p in sample_products)
+
+        first = client.get(f'/products/?ids={ids}', headers={'Authorization': customer_token})
+        assert first.status_code == 200
+        assert len(product_selects) == 1
+        assert " IN " in product_selects[0]
+
+        # Every product is now cached, also for the single-product endpoint
+        product_selects.clear()
+        second = client.get(f'/products/?ids={ids}', headers={'Authorization': customer_token})
+        assert second.get_json() == first.get_json()
+        assert product_selects == []
+        single = client.get(f'/products/{sample_products[1].id}', headers={'Authorization': customer_token})
+        assert single.get_json()['id'] == sample_products[1].id
+        assert product_selects == []
+
+    def test_rejects_invalid_or_oversized_id_lists(self, client, customer_token):
+        headers = {'Authorization': customer_token}
+        assert client.get('/products/?ids=1,abc', headers=headers).status_code == 400
+        assert client.get('/products/?ids=', headers=headers).status_code == 400
+        too_many = ",".join(str(i) for i in range(1, 102))
+        assert client.get(f'/products/?ids={too_many}', headers=headers).status_code == 400
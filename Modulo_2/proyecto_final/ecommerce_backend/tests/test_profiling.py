@@ -0,0 +1,52 @@
+import pstats
+import pytest
+from app.utils.profiling import ProfileStore
+
+
+class TestRequestProfiling:
+    """Admin requests with the profiling header are run under cProfile and stored"""
+
+    @pytest.fixture(autouse=True)
+    def store(self, app, tmp_path, monkeypatch):
+        store = ProfileStore(str(tmp_path), max_entries=2)
+        monkeypatch.setitem(app.extensions, "profile_store", store)
+        return store
+
+    def test_admin_request_is_profiled_and_downloadable(self, client, admin_token, sample_products, tmp_path):
+        headers = {'Authorization': admin_token}
+        response = client.get('/products/', headers={**headers, 'X-Profile': '1'})
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+
+        listing = client.get('/admin/profiles', headers=headers).get_json()['profiles']
+        assert listing[0]['id'] == profile_id
+        assert listing[0]['endpoint'] == 'products.get_products'
+        assert listing[0]['status'] == 200
+
+        download = client.get(f'/admin/profiles/{profile_id}', headers=headers)
+        assert download.status_code == 200
+        dump = tmp_path / 'download.prof'
+        dump.write_bytes(download.data)
+        assert pstats.Stats(str(dump)).total_calls > 0
+
+        text = client.get(f'/admin/profiles/{profile_id}?format=text&limit=5', headers=headers)
+        assert text.status_code == 200
+        assert 'function calls' in text.get_data(as_text=True)
+
+    def test_requests_without_header_or_admin_are_not_profiled(self, client, admin_token, customer_token,
+                                                                sample_products, store):
+        assert 'X-Profile-Id' not in client.get('/products/', headers={'Authorization': admin_token}).headers
+        response = client.get('/products/', headers={'Authorization': customer_token, 'X-Profile': '1'})
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
+        assert store.list() == []
+
+    def test_store_is_bounded(self, client, admin_token, sample_products, store):
+        headers = {'Authorization': admin_token, 'X-Profile': '1'}
+        ids = [client.get('/products/', headers=headers).headers['X-Profile-Id'] for _ in range(3)]
+        assert [entry['id'] for entry in store.list()] == ids[:0:-1]
+
+    def test_profile_endpoints_are_admin_only(self, client, customer_token, admin_token):
+        assert client.get('/admin/profiles', headers={'Authorization': customer_token}).status_code == 403
+        missing = client.get('/admin/profiles/..%2Fetc%2Fpasswd', headers={'Authorization': admin_token})
+        assert missing.status_code == 404
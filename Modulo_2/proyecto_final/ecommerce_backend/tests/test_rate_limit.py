@@ -0,0 +1,128 @@
+import pytest
+from types import SimpleNamespace
+from app import create_app
+from app.extensions import db
+import app.security.rate_limit as rate_limit
+from app.security.rate_limit import memory_buckets
+
+
+class TestRateLimit:
+    """Token-bucket rate limiting on login, checkout and admin analytics (in-memory buckets)"""
+
+    @pytest.fixture(autouse=True)
+    def enable_rate_limit(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'RATELIMIT_ENABLED', True)
+        monkeypatch.setitem(app.config, 'RATELIMIT_STORAGE', 'memory')
+        memory_buckets.reset()
+        yield
+        memory_buckets.reset()
+
+    def _login(self, client, password="wrong-password"):
+        return client.post('/users/login', json={"email": "customer@test.com", "password": password})
+
+    def test_login_headers_count_down(self, client, sample_user):
+        """Every response carries the RateLimit-* headers"""
+        first = self._login(client, "testpassword123")
+        assert first.status_code == 200
+        assert first.headers['RateLimit-Limit'] == '10'
+        assert first.headers['RateLimit-Remaining'] == '9'
+        assert first.headers['RateLimit-Policy'] == '10;w=60'
+        assert int(first.headers['RateLimit-Reset']) >= 1
+
+        second = self._login(client)
+        assert second.headers['RateLimit-Remaining'] == '8'
+
+    def test_login_burst_is_rejected_with_429(self, client, sample_user):
+        """Once the bucket is empty the endpoint answers 429 with Retry-After"""
+        for _ in range(10):
+            assert self._login(client).status_code == 401
+        response = self._login(client, "testpassword123")
+        assert response.status_code == 429
+        assert response.headers['RateLimit-Remaining'] == '0'
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_buckets_refill_over_time(self, client, sample_user, monkeypatch):
+        """Tokens come back at limit/period per second"""
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, 'time', lambda: now[0])
+        for _ in range(10):
+            self._login(client)
+        assert self._login(client).status_code == 429
+        now[0] += 6  # 10 tokens per 60s -> one token
+        assert self._login(client).status_code == 401
+        assert self._login(client).status_code == 429
+
+    def test_analytics_limit_only_applies_to_analytics(self, client, admin_token):
+        """Plain admin listings are not limited, analytics requests are"""
+        headers = {'Authorization': admin_token}
+        plain = client.get('/sales/admin/sales', headers=headers)
+        assert 'RateLimit-Limit' not in plain.headers
+        analytics = client.get('/sales/admin/sales?analytics=true', headers=headers)
+        assert analytics.status_code == 200
+        assert analytics.headers['RateLimit-Limit'] == '30'
+
+    def test_disabled_by_config(self, client, sample_user, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'RATELIMIT_ENABLED', False)
+        response = self._login(client)
+        assert 'RateLimit-Limit' not in response.headers
+
+    def test_idempotent_checkout_retry_is_replayed_past_the_limit(self, client, customer_token,
+                                                                  sample_cart_with_products, sample_delivery_address):
+        """A retry with the same Idempotency-Key replays the stored sale instead of answering 429"""
+        body = {'cart_id': sample_cart_with_products.id, 'delivery_address_id': sample_delivery_address.id}
+        keyed = {'Authorization': customer_token, 'Idempotency-Key': 'rate-limited-order'}
+        first = client.post('/sales/checkout', json=body, headers=keyed)
+        assert first.status_code == 201
+        for _ in range(9):  # the cart is converted now: these fail, but spend the rest of the bucket
+            client.post('/sales/checkout', json=body, headers={'Authorization': customer_token})
+        limited = client.post('/sales/checkout', json=body,
+                              headers={'Authorization': customer_token, 'Idempotency-Key': 'another-order'})
+        assert limited.status_code == 429
+
+        retry = client.post('/sales/checkout', json=body, headers=keyed)
+
+        assert retry.status_code == 201
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert retry.get_json() == first.get_json()
+
+    def test_forwarded_for_is_only_trusted_behind_a_proxy(self, client, app, tmp_path):
+        """Anonymous clients are keyed by X-Forwarded-For only when TRUSTED_PROXY_COUNT is set"""
+        for _ in range(10):
+            self._login(client)
+        spoofed = client.post('/users/login', json={"email": "customer@test.com", "password": "wrong-password"},
+                              headers={'X-Forwarded-For': '203.0.113.7'})
+        assert spoofed.status_code == 429
+
+        proxied = create_app(config={**app.config, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'proxied.db'}",
+                                     'TRUSTED_PROXY_COUNT': 1})
+        with proxied.app_context():
+            db.create_all()
+        proxied_client = proxied.test_client()
+        for address, expected in (('203.0.113.7', 401), ('203.0.113.7', 401), ('203.0.113.8', 401)):
+            response = proxied_client.post('/users/login', json={"email": "nobody@test.com", "password": "x"},
+                                           headers={'X-Forwarded-For': address})
+            assert response.status_code == expected
+        assert response.headers['RateLimit-Remaining'] == '9'  # a fresh bucket for the second address
+
+    def test_redis_lua_bucket(self, client, sample_user, monkeypatch):
+        """The Redis path: one Lua script per check, shared by every worker"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # fakeredis needs it to run Lua scripts
+        redis_client = fakeredis.FakeRedis()
+        monkeypatch.setattr(rate_limit, "cache", SimpleNamespace(cache=SimpleNamespace(
+            _write_client=redis_client, _get_prefix=lambda: "test_")))
+        monkeypatch.setitem(client.application.config, 'RATELIMIT_STORAGE', 'auto')
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, 'time', lambda: now[0])
+
+        assert [self._login(client).status_code for _ in range(11)] == [401] * 10 + [429]
+        key = "test_ratelimit.users.login.ip:127.0.0.1"
+        assert float(redis_client.hget(key, 'tokens')) == 0
+        assert 0 < redis_client.pttl(key) <= 60000
+        assert memory_buckets._buckets == {}
+
+        now[0] += 6  # 10 tokens per 60s -> one token
+        response = self._login(client)
+        assert response.status_code == 401
+        assert response.headers['RateLimit-Remaining'] == '0'
+        assert self._login(client).status_code == 429
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import pytest
+from decimal import Decimal
+from app import create_app
+from app.extensions import db, use_replica, PRIMARY_STICKY_PREFIX, cache
+from app.models.product import Product
+from app.repos import product_repo
+
+
+@pytest.fixture
+def replica_app(app):
+    """App with two SQLite files: the default bind is the primary, 'replica' the replica"""
+    primary_fd, primary_path = tempfile.mkstemp()
+    replica_fd, replica_path = tempfile.mkstemp()
+    
+    config = {key: value for key, value in app.config.items() if key.startswith(("CACHE_", "JWT_"))}
+    config.update({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary_path}',
+        'SQLALCHEMY_BINDS': {'replica': f'sqlite:///{replica_path}'},
+        'REPLICA_STICKY_SECONDS': 5
+    })
+    replica_app = create_app(config=config)
+    
+    with replica_app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        # Same id on both databases, different names, so we can tell where a read went
+        db.session.add(Product(id=1, name="Primary Product", price=Decimal("1.00"), stock=1))
+        db.session.commit()
+        with db.engines['replica'].begin() as conn:
+            conn.execute(Product.__table__.insert(), {"id": 1, "name": "Replica Product", "price": Decimal("1.00"), "stock": 1})
+    
+    yield replica_app
+    
+    with replica_app.app_context():
+        db.drop_all()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registers a metadata per bind on the shared db object; drop it so the
+    # session-wide test app (which has no replica bind) can still drop_all()
+    db.metadatas.pop('replica', None)
+    for fd, path in ((primary_fd, primary_path), (replica_fd, replica_path)):
+        os.close(fd)
+        os.unlink(path)
+
+
+class TestReadReplicaRouting:
+    """Test read replica routing in RoutingSession"""
+    
+    def test_marked_repo_reads_use_replica(self, replica_app):
+        """Test read_replica repo functions read from the replica bind"""
+        with replica_app.test_request_context():
+            assert [p.name for p in product_repo.get_all()] == ["Replica Product"]
+    
+    def test_unmarked_reads_use_primary(self, replica_app):
+        """Test reads outside a replica block read from the primary"""
+        with replica_app.test_request_context():
+            assert product_repo.get_by_name("Primary Product") is not None
+            assert product_repo.get_by_name("Replica Product") is None
+    
+    def test_reads_after_write_stick_to_primary(self, replica_app):
+        """Test a write in the current request pins later reads to the primary"""
+        with replica_app.test_request_context():
+            product_repo.create_product({"name": "New Product", "price": Decimal("2.00"), "stock": 3})
+            names = {p.name for p in product_repo.get_all()}
+            assert names == {"Primary Product", "New Product"}
+    
+    def test_user_with_recent_write_reads_primary(self, replica_app, monkeypatch):
+        """Test reads right after a user's own write (previous request) use the primary"""
+        monkeypatch.setattr("app.extensions._current_user_id", lambda: "42")
+        with replica_app.test_request_context():
+            cache.set(f"{PRIMARY_STICKY_PREFIX}42", "1", timeout=5)
+        with replica_app.test_request_context():
+            with use_replica():
+                assert db.session.get(Product, 1).name == "Primary Product"
+        with replica_app.test_request_context():
+            cache.delete(f"{PRIMARY_STICKY_PREFIX}42")
+    
+    def test_no_replica_configured_uses_primary(self, app, sample_products):
+        """Test read_replica is a no-op when no replica bind is configured"""
+        with app.test_request_context():
+            assert len(product_repo.get_all()) == 3
@@ -0,0 +1,91 @@
+import pytest
+from decimal import Decimal
+from app.extensions import cache, db
+from app.models.product import Product
+from app.models.product_cooccurrence import ProductCooccurrence
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.user import User
+import app.repos.recommendation_repo as recommendation_repo
+from app.services import recommendation_service
+
+
+def _add_sale(user_id, products):
+    sale = Sale(user_id=user_id, total=Decimal('1.00'))
+    sale.sale_products = [SaleProduct(product_id=p.id, quantity=1, price=p.price) for p in products]
+    db.session.add(sale)
+    db.session.commit()
+    return sale
+
+
+@pytest.mark.products
+class TestFrequentlyBoughtTogether:
+    """Co-occurrence index built from sale_products and updated at checkout"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self, app):
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def _related(self, client, token, product_id):
+        response = client.get(f'/products/{product_id}/related', headers={'Authorization': token})
+        assert response.status_code == 200
+        return [(entry['product']['name'], entry['count']) for entry in response.get_json()['related']]
+
+    def test_checkout_updates_index_incrementally(self, client, app, customer_token,
+                                                  sample_cart_with_products, sample_delivery_address):
+        with app.app_context():
+            dog_food = Product.query.filter_by(name="Premium Dog Food").one().id
+        assert self._related(client, customer_token, dog_food) == []
+
+        response = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id},
+                               headers={'Authorization': customer_token})
+
+        assert response.status_code == 201
+        assert self._related(client, customer_token, dog_food) == [('Cat Toy Mouse', 1)]
+
+    def test_rebuild_counts_pairs_from_history(self, client, app, runner, customer_token, sample_user, sample_products):
+        with app.app_context():
+            user = User.query.filter_by(email="customer@test.com").one()
+            dog, cat, bird = (Product.query.filter_by(name=name).one() for name in
+                              ("Premium Dog Food", "Cat Toy Mouse", "Bird Cage Large"))
+            _add_sale(user.id, [dog, cat])
+            _add_sale(user.id, [dog, cat, bird])
+            _add_sale(user.id, [dog, bird])
+            _add_sale(user.id, [cat])
+            dog_id, cat_id = dog.id, cat.id
+
+        result = runner.invoke(args=['recommendations', 'rebuild', '--chunk-size', '2'])
+
+        assert 'Co-occurrence index rebuilt: 6 pairs from 4 sales' in result.output
+        assert self._related(client, customer_token, dog_id) == [('Cat Toy Mouse', 2), ('Bird Cage Large', 2)]
+        assert self._related(client, customer_token, cat_id) == [('Premium Dog Food', 2), ('Bird Cage Large', 1)]
+        with app.app_context():
+            assert ProductCooccurrence.query.count() == 6
+
+    def test_checkout_during_rebuild_is_not_lost(self, app, monkeypatch, sample_user, sample_products):
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").one().id
+            dog, cat = (Product.query.filter_by(name=name).one() for name in ("Premium Dog Food", "Cat Toy Mouse"))
+            _add_sale(user_id, [dog, cat])
+            stream = recommendation_repo.iter_sale_baskets
+
+            def stream_then_checkout(chunk_size, after_sale_id=0, up_to_sale_id=None):
+                yield from stream(chunk_size, after_sale_id, up_to_sale_id)
+                if up_to_sale_id is not None:  # a checkout commits while the rebuild is counting
+                    sale = _add_sale(user_id, [dog, cat])
+                    recommendation_service.record_sales([[sp.product_id for sp in sale.sale_products]])
+
+            monkeypatch.setattr(recommendation_repo, "iter_sale_baskets", stream_then_checkout)
+            result = recommendation_service.rebuild_index(chunk_size=2)
+
+            assert result["sales"] == 2
+            assert recommendation_repo.get_top_related(dog.id, 10) == [(cat.id, 2)]
+
+    def test_unknown_product_returns_404(self, client, customer_token):
+        response = client.get('/products/99999/related', headers={'Authorization': customer_token})
+        assert response.status_code == 404
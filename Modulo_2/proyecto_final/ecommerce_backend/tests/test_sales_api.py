@@ -79,6 +79,57 @@ class TestCartManagement:
         data = response.get_json()
         assert isinstance(data, list)
     
+    def test_get_user_carts_status_filter_only_returns_own_carts(self, client, customer_token, sample_user, sample_admin, app):
+        """Test status filter never returns carts from other users or other statuses"""
+        with app.app_context():
+            customer = User.query.filter_by(email="customer@test.com").first()
+            admin = User.query.filter_by(email="admin@test.com").first()
+            db.session.add_all([
+                Cart(user_id=customer.id, status='abandoned'),
+                Cart(user_id=customer.id, status='converted'),
+                Cart(user_id=admin.id, status='abandoned')
+            ])
+            db.session.commit()
+            customer_id = customer.id
+        
+        response = client.get('/sales/carts?status=abandoned',
+                            headers={'Authorization': customer_token})
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data) == 1
+        assert data[0]['user_id'] == customer_id
+        assert data[0]['status'] == 'abandoned'
+    
+    def test_get_user_carts_pagination(self, client, customer_token, sample_user, app):
+        """Test user carts are paginated"""
+        with app.app_context():
+            customer = User.query.filter_by(email="customer@test.com").first()
+            db.session.add_all([Cart(user_id=customer.id, status='abandoned') for _ in range(3)])
+            db.session.commit()
+        
+        first_page = client.get('/sales/carts?per_page=2&page=1',
+                              headers={'Authorization': customer_token})
+        second_page = client.get('/sales/carts?per_page=2&page=2',
+                               headers={'Authorization': customer_token})
+        
+        assert first_page.status_code == 200
+        assert second_page.status_code == 200
+        first_ids = {cart['id'] for cart in first_page.get_json()}
+        second_ids = {cart['id'] for cart in second_page.get_json()}
+        assert len(first_ids) == 2
+        assert len(second_ids) == 1
+        assert first_ids.isdisjoint(second_ids)
+    
+    def test_get_user_carts_invalid_filters_fail(self, client, customer_token):
+        """Test invalid status, date and pagination parameters are rejected"""
+        headers = {'Authorization': customer_token}
+        
+        assert client.get('/sales/carts?status=unknown', headers=headers).status_code == 400
+        assert client.get('/sales/carts?start_date=2024/01/01', headers=headers).status_code == 400
+        assert client.get('/sales/carts?per_page=500', headers=headers).status_code == 400
+        assert client.get('/sales/carts?page=abc', headers=headers).status_code == 400
+    
     def test_add_to_cart_success(self, client, customer_token, sample_products, app):
         """Test successful add product to cart"""
         with app.app_context():
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func
+from app.extensions import db
+from app.models.user import User
+from app.models.product import Product
+from app.models.cart import Cart
+from app.models.cart_product import CartProduct
+from app.models.sale import Sale
+from app.models.sale_product import SaleProduct
+from app.models.invoice import Invoice
+from app.models.delivery_address import DeliveryAddress
+
+
+def _clear():
+    for model in (Invoice, SaleProduct, Sale, CartProduct, Cart, DeliveryAddress, Product, User):
+        db.session.query(model).delete()
+    db.session.commit()
+
+
+class TestSeedCommand:
+    """flask seed synthetic data generator"""
+
+    ARGS = ["seed", "--users", "40", "--products", "30", "--sales", "120", "--carts", "50", "--chunk-size", "25"]
+
+    def test_seed_creates_consistent_rows(self, app, runner):
+        """Requested row counts are created and reference valid parents"""
+        result = runner.invoke(args=self.ARGS)
+        assert result.exit_code == 0, result.output
+        assert "Seed finished" in result.output
+
+        with app.app_context():
+            assert User.query.count() == 40
+            assert Product.query.count() == 30
+            assert Sale.query.count() == 120
+            assert Cart.query.count() == 50
+            assert SaleProduct.query.count() >= 120
+            assert 0 < Invoice.query.count() <= 120
+            # Invoices ship to an address of the customer who bought
+            invoice = Invoice.query.first()
+            assert invoice.delivery_address.user_id == invoice.sale.user_id
+            # Sale totals match their line items
+            sale = Sale.query.first()
+            assert sale.total == sum(sp.price * sp.quantity for sp in sale.sale_products)
+            # At most one active cart per user
+            active = db.session.query(Cart.user_id, func.count()).filter(Cart.status == "active").group_by(Cart.user_id).all()
+            assert all(count == 1 for _, count in active)
+            # The seeded password works with the model
+            assert User.query.first().check_password("seed-password")
+
+    def test_seed_is_deterministic(self, app, runner):
+        """Same seed and arguments produce the same data"""
+        def snapshot():
+            return (
+                [(s.id, s.user_id, s.total, s.sale_date) for s in Sale.query.order_by(Sale.id)],
+                [(p.name, p.price) for p in Product.query.order_by(Product.id)],
+            )
+
+        assert runner.invoke(args=self.ARGS).exit_code == 0
+        with app.app_context():
+            first = snapshot()
+            _clear()
+        assert runner.invoke(args=self.ARGS).exit_code == 0
+        with app.app_context():
+            assert snapshot() == first
+
+    def test_seed_appends_after_existing_ids(self, app, runner, sample_products):
+        """Existing rows are kept and new ids continue after them"""
+        assert runner.invoke(args=["seed", "--users", "5", "--products", "5", "--sales", "5", "--carts", "0"]).exit_code == 0
+        with app.app_context():
+            assert Product.query.count() == len(sample_products) + 5
+            assert Product.query.filter_by(name="Premium Dog Food").first() is not None
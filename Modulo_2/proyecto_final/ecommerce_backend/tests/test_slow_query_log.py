@@ -0,0 +1,92 @@
+import logging
+import pytest
+from app.extensions import db
+from app.repos import invoice_repo
+from app.models.sale import Sale
+from app.utils.query_log import SlowQueryLog, fingerprint, parameter_shapes
+
+
+class TestSlowQueryLog:
+    """Statement timing, slow-query logging with EXPLAIN and the admin fingerprint report"""
+
+    @pytest.fixture
+    def query_log(self, app, monkeypatch):
+        query_log = app.extensions["slow_query_log"]
+        query_log.stats.reset()
+        monkeypatch.setattr(query_log, "threshold_ms", 0)  # every statement counts as slow
+        monkeypatch.setattr(query_log, "_explained_at", {})
+        monkeypatch.setattr(query_log, "_logged_in_window", 0)
+        yield query_log
+        query_log.stats.reset()
+
+    def test_fingerprint_collapses_values(self):
+        assert fingerprint("SELECT * FROM products WHERE id = 5 AND name = 'x'") == \
+            fingerprint("SELECT *  FROM products WHERE id = 7 AND name = 'y'")
+        assert fingerprint("SELECT id FROM sales WHERE id IN (?, ?, ?)") == "SELECT id FROM sales WHERE id IN (...)"
+
+    def test_parameter_shapes_hide_values(self):
+        assert parameter_shapes(("secret", 3, [1, 2])) == ["str", "int", "list[2]"]
+        assert parameter_shapes({"email": "a@b.c"}) == {"email": "str"}
+
+    def test_slow_query_logged_with_caller_and_plan(self, app, sample_invoice, query_log, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            invoice_repo.get_invoices_by_date_range()
+        messages = [record.getMessage() for record in caplog.records]
+        entry = next(message for message in messages if "invoices" in message)
+        assert "invoice_repo.get_invoices_by_date_range" in entry
+        assert "plan:" in entry
+
+        report = query_log.stats.top(50)
+        invoice_row = next(row for row in report if "FROM invoices" in row["fingerprint"])
+        assert invoice_row["caller"] == "invoice_repo.get_invoices_by_date_range"
+        assert invoice_row["slow_calls"] >= 1
+        assert "plan" in invoice_row
+
+    def test_failed_explain_does_not_break_the_request(self, client, app, query_log, monkeypatch, customer_token,
+                                                       sample_cart_with_products, sample_delivery_address):
+        monkeypatch.setattr(query_log, "logs_per_minute", 1000)
+        monkeypatch.setattr(SlowQueryLog, "_explain_statement",
+                            staticmethod(lambda conn, statement: "EXPLAIN QUERY PLAN SELECT * FROM missing_table"))
+
+        response = client.post('/sales/checkout',
+                               json={'cart_id': sample_cart_with_products.id,
+                                     'delivery_address_id': sample_delivery_address.id},
+                               headers={'Authorization': customer_token})
+
+        assert response.status_code == 201
+        assert any(row.get("plan", "").startswith("EXPLAIN failed") for row in query_log.stats.top(500))
+        with app.app_context():
+            assert db.session.get(Sale, response.get_json()['sale']['id']) is not None
+
+    def test_failed_statements_leave_nothing_on_the_connection(self, app, query_log):
+        for _ in range(3):
+            with pytest.raises(Exception):
+                db.session.execute(db.text("SELECT * FROM missing_table")).all()
+            db.session.rollback()
+        connection = db.session.connection()
+        db.session.execute(db.text("SELECT 1")).all()
+
+        assert "query_start" not in connection.info
+        assert any(row["fingerprint"] == "SELECT ?" for row in query_log.stats.top(500))
+
+    def test_log_rate_limit(self, app, query_log, monkeypatch, caplog):
+        monkeypatch.setattr(query_log, "logs_per_minute", 2)
+        monkeypatch.setattr(query_log, "_logged_in_window", 0)
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            for _ in range(5):
+                db.session.execute(db.text("SELECT 1")).all()
+        assert len(caplog.records) == 2
+
+    def test_admin_report_endpoint(self, client, admin_token, customer_token, sample_products, query_log):
+        invoice_repo.get_invoices_by_date_range()
+        db.session.execute(db.text("SELECT 1")).all()
+        response = client.get('/admin/slow-queries?limit=5', headers={'Authorization': admin_token})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["enabled"] is True
+        assert 0 < len(data["queries"]) <= 5
+        totals = [row["total_ms"] for row in data["queries"]]
+        assert totals == sorted(totals, reverse=True)
+
+        assert client.get('/admin/slow-queries', headers={'Authorization': customer_token}).status_code == 403
+        assert client.delete('/admin/slow-queries', headers={'Authorization': admin_token}).status_code == 200
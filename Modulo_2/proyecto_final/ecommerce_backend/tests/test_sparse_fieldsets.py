@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app.extensions import cache, db
+from app.schemas.fieldsets import sparse_fieldset
+from app.schemas.invoice import InvoiceListSchema
+from app.schemas.sale import SaleListSchema
+
+
+@contextmanager
+def captured_statements(app):
+    """SELECT statements sent to the database while the block runs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class TestSparseFieldsets:
+    """?fields= / ?include= on the sales and invoice read endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, app):
+        with app.app_context():
+            cache.clear()
+            yield
+            cache.clear()
+
+    def test_fields_prune_response_and_relationship_queries(self, client, app, customer_token, sample_sale):
+        """Only the requested fields are returned and unrequested relationships are not loaded"""
+        with app.app_context():
+            db.session.expunge_all()
+        with captured_statements(app) as statements:
+            response = client.get('/sales/sales?fields=id,total', headers={'Authorization': customer_token})
+
+        assert response.status_code == 200
+        assert response.get_json()['sales'] == [{'id': sample_sale.id, 'total': '99.99'}]
+        assert not any('sale_products' in s or 'invoices' in s for s in statements)
+
+    def test_include_adds_relationship_to_plain_fields(self, client, customer_token, sample_sale):
+        response = client.get(f'/sales/sales/{sample_sale.id}?include=user',
+                              headers={'Authorization': customer_token})
+
+        assert response.status_code == 200
+        sale = response.get_json()['sale']
+        assert sale['user']['email'] == 'customer@test.com'
+        assert sale['product_count'] == 2
+        assert 'sale_products' not in sale and 'invoices' not in sale
+
+    def test_dotted_fields_select_inside_nested_objects(self, client, customer_token, sample_invoice):
+        response = client.get('/sales/invoices?fields=id,sale.total,customer_name',
+                              headers={'Authorization': customer_token})
+
+        assert response.status_code == 200
+        assert response.get_json()['invoices'] == [
+            {'id': sample_invoice.id, 'sale': {'total': '99.99'}, 'customer_name': 'Test Customer'}
+        ]
+
+    def test_unknown_field_is_rejected(self, client, customer_token, sample_sale):
+        response = client.get('/sales/sales?fields=id,password', headers={'Authorization': customer_token})
+        assert response.status_code == 400
+        assert 'password' in response.get_json()['message']
+
+    def test_default_fieldset_loads_every_relationship_the_schema_reads(self, app):
+        with app.test_request_context('/sales/sales'):
+            assert sparse_fieldset(SaleListSchema).only is None
+            assert sparse_fieldset(SaleListSchema).paths == ('invoices', 'sale_products', 'user')
+        with app.test_request_context('/sales/invoices?fields=customer_name'):
+            assert sparse_fieldset(InvoiceListSchema).paths == ('sale.user',)
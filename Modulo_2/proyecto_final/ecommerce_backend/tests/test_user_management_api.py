@@ -249,6 +249,43 @@ class TestUserDeletion:
             # Note: endpoint now requires JWT authentication, so it returns 401 when no token
             assert response.status_code == 401
     
+    def test_delete_user_cascades_in_database(self, client, admin_token, sample_user, sample_invoice, sample_cart_with_products, app):
+        """Test deleting a user removes related rows through ON DELETE CASCADE without loading them"""
+        from sqlalchemy import event
+        from app.models.cart import Cart
+        from app.models.cart_product import CartProduct
+        from app.models.sale import Sale
+        from app.models.sale_product import SaleProduct
+        from app.models.invoice import Invoice
+        from app.models.delivery_address import DeliveryAddress
+        
+        with app.app_context():
+            user_id = User.query.filter_by(email="customer@test.com").first().id
+            statements = []
+            
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            
+            event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                response = client.delete(f'/users/{user_id}',
+                                       headers={'Authorization': admin_token})
+            finally:
+                event.remove(db.engine, "before_cursor_execute", record)
+            
+            assert response.status_code == 200
+            # Children are deleted by the database, not loaded and deleted one by one
+            assert not any(s.lstrip().upper().startswith("DELETE FROM CART") for s in statements)
+            assert not any(s.lstrip().upper().startswith("DELETE FROM SALE") for s in statements)
+            
+            db.session.expire_all()
+            assert Cart.query.filter_by(user_id=user_id).count() == 0
+            assert CartProduct.query.count() == 0
+            assert Sale.query.filter_by(user_id=user_id).count() == 0
+            assert SaleProduct.query.count() == 0
+            assert Invoice.query.count() == 0
+            assert DeliveryAddress.query.filter_by(user_id=user_id).count() == 0
+    
     def test_delete_nonexistent_user_fails(self, client, admin_token):
         """Test delete nonexistent user fails"""
         response = client.delete('/users/99999',